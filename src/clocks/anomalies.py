@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Max, Q, RowRange, Window
+from django.utils import timezone
+
+from .models import Clock, ClockAnomaly
+
+Kind = ClockAnomaly.Kind
+
+
+def _anomalous_clocks(user_ids, today):
+    """
+    Pointages anormaux d'un lot d'utilisateurs. Le chevauchement est détecté
+    par fonction de fenêtre : plus grande sortie des pointages précédents
+    de la même journée, comparée à l'entrée courante.
+    """
+    latest_previous_out = Window(
+        Max("clock_out"),
+        partition_by=[F("user_id"), F("work_date")],
+        order_by=[F("clock_in").asc(), F("id").asc()],
+        frame=RowRange(start=None, end=-1),
+    )
+    return (
+        Clock.objects.filter(user_id__in=user_ids)
+        .annotate(latest_previous_out=latest_previous_out)
+        .filter(
+            Q(clock_out__isnull=True, work_date__lt=today)
+            | Q(clock_out__lt=F("clock_in"))
+            | Q(latest_previous_out__gt=F("clock_in"))
+        )
+        .values_list(
+            "id",
+            "user_id",
+            "work_date",
+            "clock_in",
+            "clock_out",
+            "latest_previous_out",
+        )
+    )
+
+
+def _kinds(clock_in, clock_out, latest_previous_out, work_date, today):
+    if clock_out is None and work_date < today:
+        yield Kind.OPEN
+    if clock_out is not None and clock_out < clock_in:
+        yield Kind.NEGATIVE
+    if latest_previous_out is not None and latest_previous_out > clock_in:
+        yield Kind.OVERLAP
+
+
+@transaction.atomic
+def scan_users(user_ids, today=None):
+    """
+    Remplace les anomalies enregistrées d'un lot d'utilisateurs par celles
+    détectées maintenant. Renvoie le nombre d'anomalies trouvées.
+    """
+    today = today or timezone.localdate()
+    findings = [
+        ClockAnomaly(clock_id=clock_id, user_id=user_id, work_date=work_date, kind=kind)
+        for clock_id, user_id, work_date, clock_in, clock_out, previous_out in (
+            _anomalous_clocks(user_ids, today)
+        )
+        for kind in _kinds(clock_in, clock_out, previous_out, work_date, today)
+    ]
+
+    ClockAnomaly.objects.filter(user_id__in=user_ids).delete()
+    ClockAnomaly.objects.bulk_create(findings)
+    return len(findings)
+
+
+def scan_anomalies(chunk_size=500, today=None):
+    """
+    Scanne toute la table des pointages par lots d'utilisateurs (mémoire
+    bornée par lot). Renvoie le nombre total d'anomalies.
+    """
+    return sum(
+        scan_users(user_ids, today=today)
+        for user_ids in get_user_model().objects.id_chunks(chunk_size)
+    )
+
+
+def flag_open_shift(clock):
+    """
+    Signale immédiatement un pointage resté ouvert (sans attendre le scan).
+    """
+    ClockAnomaly.objects.get_or_create(
+        clock=clock,
+        kind=Kind.OPEN,
+        defaults={"user_id": clock.user_id, "work_date": clock.work_date},
+    )
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+
+from .models import Clock, ClockArchive
+
+ARCHIVED_FIELDS = [
+    "id",
+    "user_id",
+    "work_date",
+    "clock_in",
+    "clock_out",
+    "status",
+    "idempotency_key",
+    "created_at",
+    "updated_at",
+]
+
+_archiving = ContextVar("clock_archiving", default=False)
+
+
+def is_archiving():
+    """
+    Vrai pendant la suppression des pointages archivés : les receivers de
+    suppression (rollups, tombstones) l'ignorent, les rollups couvrant aussi
+    les archives et un archivage n'étant pas une suppression à synchroniser.
+    """
+    return _archiving.get()
+
+
+@contextmanager
+def archiving():
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def archivable(before):
+    """
+    Pointages des périodes closes : antérieurs à `before`, fermés et
+    validés ou refusés. Les pointages en attente restent dans `Clock`.
+    """
+    return Clock.objects.filter(
+        work_date__lt=before,
+        clock_out__isnull=False,
+        status__in=["approved", "rejected"],
+    )
+
+
+@transaction.atomic
+def archive_batch(before, batch_size):
+    """
+    Déplace un lot de pointages vers `ClockArchive`. Renvoie le nombre de
+    pointages déplacés (0 quand il n'y a plus rien à archiver).
+    """
+    rows = list(
+        archivable(before)
+        .select_for_update()
+        .order_by("id")
+        .values(*ARCHIVED_FIELDS)[:batch_size]
+    )
+    if not rows:
+        return 0
+
+    ClockArchive.objects.bulk_create(ClockArchive(**row) for row in rows)
+
+    # Les anomalies liées partent en cascade
+    with archiving():
+        Clock.objects.filter(id__in=[row["id"] for row in rows]).delete()
+    return len(rows)
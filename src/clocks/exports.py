@@ -0,0 +1,69 @@
+import csv
+import json
+
+EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("user_id", "user_id"),
+    ("email", "user__email"),
+    ("first_name", "user__first_name"),
+    ("last_name", "user__last_name"),
+    ("work_date", "work_date"),
+    ("clock_in", "clock_in"),
+    ("clock_out", "clock_out"),
+    ("status", "status"),
+    ("duration_hours", "duration"),
+]
+
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """
+    Pseudo-fichier : csv.writer renvoie directement la ligne écrite.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _format(value):
+    if value is None:
+        return None
+    if hasattr(value, "total_seconds"):
+        return round(value.total_seconds() / 3600, 2)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def export_rows(queryset):
+    """
+    Lignes d'export (tuples) lues par curseur serveur, utilisateur joint et
+    durée calculée en base : aucune requête par ligne.
+    """
+    rows = (
+        queryset.with_duration()
+        .order_by("work_date", "id")
+        .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+    )
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield tuple(_format(value) for value in row)
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row))) + "\n"
+
+
+STREAMS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import Clock, ClockArchive
+from .rollups import refresh_rollups
+from .serializers import OPEN_SHIFT_ERROR, ClockBulkItemSerializer
+
+MAX_ITEMS = 5000
+BATCH_SIZE = 500
+
+
+def _error(index, errors):
+    return {"index": index, "status": "error", "errors": errors}
+
+
+def _validate_items(items, results):
+    """
+    Validation champ par champ de chaque pointage, sans requête.
+    """
+    child = ClockBulkItemSerializer()
+    valid = []
+
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, child.run_validation(item)))
+        except serializers.ValidationError as exc:
+            results[index] = _error(index, exc.detail)
+
+    return valid
+
+
+def ingest_clocks(items):
+    """
+    Enregistre un lot de pointages et renvoie un résultat par élément
+    (created / duplicate / error), dans l'ordre de la requête.
+
+    Les utilisateurs, les clés d'idempotence (pointages courants et archivés)
+    et les pointages ouverts sont vérifiés pour tout le lot à la fois, puis
+    les pointages sont insérés par bulk_create.
+    """
+    results = [None] * len(items)
+    valid = _validate_items(items, results)
+
+    user_ids = {data["user"] for _, data in valid}
+    known_users = set(
+        get_user_model().objects.filter(id__in=user_ids).values_list("id", flat=True)
+    )
+    keys = {data.get("idempotency_key") for _, data in valid} - {None}
+    # Pointages courants et archivés : un rejeu tardif reste un doublon
+    existing = {}
+    for model in (Clock, ClockArchive):
+        existing.update(
+            model.objects.filter(idempotency_key__in=keys).values_list(
+                "idempotency_key", "id"
+            )
+        )
+    open_users = set(
+        Clock.objects.filter(user_id__in=user_ids, clock_out__isnull=True).values_list(
+            "user_id", flat=True
+        )
+    )
+
+    pending = {}
+    to_create = []
+    repeated = []
+    for index, data in valid:
+        key = data.get("idempotency_key")
+        if data["user"] not in known_users:
+            results[index] = _error(index, {"user": ["Utilisateur inconnu."]})
+        elif key in existing:
+            results[index] = {
+                "index": index,
+                "status": "duplicate",
+                "id": existing[key],
+            }
+        elif key in pending:
+            repeated.append((index, pending[key]))
+        elif data.get("clock_out") is None and data["user"] in open_users:
+            results[index] = _error(index, {"clock_out": [OPEN_SHIFT_ERROR]})
+        else:
+            if data.get("clock_out") is None:
+                open_users.add(data["user"])
+            clock = Clock(user_id=data.pop("user"), **data)
+            to_create.append((index, clock))
+            if key:
+                pending[key] = clock
+
+    with transaction.atomic():
+        Clock.objects.bulk_create(
+            [clock for _, clock in to_create], batch_size=BATCH_SIZE
+        )
+        refresh_rollups({clock.rollup_key for _, clock in to_create})
+
+    for index, clock in to_create:
+        results[index] = {"index": index, "status": "created", "id": clock.pk}
+    for index, clock in repeated:
+        results[index] = {"index": index, "status": "duplicate", "id": clock.pk}
+
+    return results
@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from plannings.models import Planning, PlanningType
+from teams.models import Teams
+
+from .models import ClockDailyRollup, KpiSnapshot
+from .reconciliation import DEFAULT_TOLERANCE, by_user, load_punches, sweep, window
+
+SNAPSHOT_TTL = timedelta(minutes=15)
+
+COUNTERS = ["planned_shifts", "attended_shifts", "late_shifts", "absences"]
+DURATIONS = ["worked_seconds", "worked_days", "overtime_seconds"]
+
+
+def _load_team_shifts(date_from, date_to):
+    """
+    Créneaux SHIFT rattachés à une équipe, en colonnes (user_id, début, fin,
+    équipe) triées par utilisateur puis début.
+    """
+    window_start, window_end = window(date_from, date_to)
+    return (
+        Planning.objects.filter(
+            planning_type=PlanningType.SHIFT,
+            user__isnull=False,
+            team__isnull=False,
+            start_datetime__lt=window_end,
+            end_datetime__gt=window_start,
+        )
+        .order_by("user_id", "start_datetime")
+        .values_list("user_id", "start_datetime", "end_datetime", "team_id")
+    )
+
+
+def _load_worked_seconds(date_from, date_to, user_ids):
+    return {
+        (user_id, work_date): worked
+        for user_id, work_date, worked in ClockDailyRollup.objects.filter(
+            user_id__in=user_ids, work_date__range=(date_from, date_to)
+        ).values_list("user_id", "work_date", "worked_seconds")
+    }
+
+
+def _team_totals(date_from, date_to, tolerance):
+    """
+    Compteurs bruts par équipe : un seul passage sur les créneaux, les
+    pointages et les rollups préchargés en colonnes.
+    """
+    shifts = by_user(_load_team_shifts(date_from, date_to))
+    punches = by_user(load_punches(date_from, date_to, list(shifts)))
+    worked = _load_worked_seconds(date_from, date_to, list(shifts))
+
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS + DURATIONS, 0))
+    planned_per_day = defaultdict(float)
+
+    for user_id, user_shifts in shifts.items():
+        matches, _, _ = sweep(user_shifts, punches.get(user_id, []))
+        for (start, end, team_id), matched in zip(user_shifts, matches):
+            team = totals[team_id]
+            team["planned_shifts"] += 1
+            day = timezone.localtime(start).date()
+            planned_per_day[(user_id, day, team_id)] += (end - start).total_seconds()
+
+            if not matched:
+                team["absences"] += 1
+                continue
+
+            team["attended_shifts"] += 1
+            first_in = min(punch_start for punch_start, _ in matched)
+            if first_in - start > tolerance:
+                team["late_shifts"] += 1
+
+    for (user_id, day, team_id), planned in planned_per_day.items():
+        seconds = worked.get((user_id, day), 0)
+        team = totals[team_id]
+        team["worked_seconds"] += seconds
+        team["worked_days"] += 1
+        team["overtime_seconds"] += max(0, seconds - planned)
+
+    return totals
+
+
+def _indicators(totals):
+    attended = totals["attended_shifts"]
+    days = totals["worked_days"]
+    return {
+        "planned_shifts": totals["planned_shifts"],
+        "absences": totals["absences"],
+        "late_shifts": totals["late_shifts"],
+        "lateness_rate": round(totals["late_shifts"] / attended, 3) if attended else 0,
+        "average_daily_hours": (
+            round(totals["worked_seconds"] / days / 3600, 2) if days else 0
+        ),
+        "overtime_hours": round(totals["overtime_seconds"] / 3600, 2),
+    }
+
+
+def compute_kpis(date_from, date_to, tolerance=DEFAULT_TOLERANCE):
+    """
+    KPI de présence par équipe et par département sur une période.
+    Renvoie {scope: [ligne par équipe / département]}.
+    """
+    totals = _team_totals(date_from, date_to, tolerance)
+    teams = Teams.objects.select_related("department").in_bulk(list(totals))
+
+    departments = {}
+    department_totals = defaultdict(lambda: dict.fromkeys(COUNTERS + DURATIONS, 0))
+    team_rows = []
+    for team_id, team_totals in sorted(totals.items()):
+        team = teams[team_id]
+        team_rows.append(
+            {
+                "id": team_id,
+                "name": team.name,
+                "department": team.department_id,
+                **_indicators(team_totals),
+            }
+        )
+        if team.department_id:
+            departments[team.department_id] = team.department.name
+            for key, value in team_totals.items():
+                department_totals[team.department_id][key] += value
+
+    department_rows = [
+        {
+            "id": department_id,
+            "name": departments[department_id],
+            **_indicators(counters),
+        }
+        for department_id, counters in sorted(department_totals.items())
+    ]
+    return {
+        KpiSnapshot.Scope.TEAM: team_rows,
+        KpiSnapshot.Scope.DEPARTMENT: department_rows,
+    }
+
+
+@transaction.atomic
+def refresh_snapshots(date_from, date_to):
+    """
+    Recalcule les KPI de la période et enregistre un snapshot par périmètre.
+    """
+    now = timezone.now()
+    snapshots = {}
+    for scope, rows in compute_kpis(date_from, date_to).items():
+        snapshots[scope], _ = KpiSnapshot.objects.update_or_create(
+            scope=scope,
+            date_from=date_from,
+            date_to=date_to,
+            defaults={
+                "data": rows,
+                "computed_at": now,
+                "expires_at": now + SNAPSHOT_TTL,
+            },
+        )
+    return snapshots
+
+
+def get_snapshot(scope, date_from, date_to, refresh=False):
+    """
+    Snapshot encore valide de la période, recalculé s'il a expiré.
+    """
+    if not refresh:
+        snapshot = KpiSnapshot.objects.filter(
+            scope=scope,
+            date_from=date_from,
+            date_to=date_to,
+            expires_at__gt=timezone.now(),
+        ).first()
+        if snapshot:
+            return snapshot
+
+    return refresh_snapshots(date_from, date_to)[scope]
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from clocks.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace par lots les pointages des périodes closes (antérieurs à "
+        "la date donnée) vers la table d'archive."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "before",
+            type=date.fromisoformat,
+            help="Archiver les pointages strictement antérieurs à cette date.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Nombre de pointages déplacés par transaction.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while moved := archive_batch(options["before"], options["batch_size"]):
+            total += moved
+            self.stdout.write(f"{total} pointages archivés")
+
+        self.stdout.write(self.style.SUCCESS(f"Archivage terminé ({total})."))
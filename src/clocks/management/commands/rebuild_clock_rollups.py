@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from clocks.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les rollups journaliers des pointages, par lots d'utilisateurs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Nombre d'utilisateurs traités par transaction.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        for user_ids in get_user_model().objects.id_chunks(options["chunk_size"]):
+            rebuild_rollups(user_ids)
+            processed += len(user_ids)
+            self.stdout.write(f"{processed} utilisateurs traités")
+
+        self.stdout.write(self.style.SUCCESS("Rollups des pointages reconstruits."))
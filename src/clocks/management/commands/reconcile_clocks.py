@@ -0,0 +1,43 @@
+import csv
+from dataclasses import fields
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from clocks.reconciliation import UserReconciliation, reconcile
+
+
+class Command(BaseCommand):
+    help = "Rapproche pointages et créneaux planifiés sur une période (CSV)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("date_from", type=date.fromisoformat)
+        parser.add_argument("date_to", type=date.fromisoformat)
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Limiter à un utilisateur (option répétable).",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=int,
+            default=5,
+            help="Tolérance en minutes pour retards et départs anticipés.",
+        )
+
+    def handle(self, *args, **options):
+        results = reconcile(
+            options["date_from"],
+            options["date_to"],
+            user_ids=options["users"],
+            tolerance=timedelta(minutes=options["tolerance"]),
+        )
+
+        writer = csv.DictWriter(
+            self.stdout, fieldnames=[field.name for field in fields(UserReconciliation)]
+        )
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result.as_dict())
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from clocks.anomalies import scan_anomalies
+
+
+class Command(BaseCommand):
+    help = "Détecte les pointages anormaux (non fermés, chevauchements, négatifs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Nombre d'utilisateurs analysés par transaction.",
+        )
+
+    def handle(self, *args, **options):
+        total = scan_anomalies(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} anomalies enregistrées."))
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClockDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("work_date", models.DateField()),
+                ("week_start", models.DateField()),
+                ("worked_seconds", models.PositiveIntegerField(default=0)),
+                ("clock_count", models.PositiveIntegerField(default=0)),
+                ("closed_count", models.PositiveIntegerField(default=0)),
+                ("pending_count", models.PositiveIntegerField(default=0)),
+                ("approved_count", models.PositiveIntegerField(default=0)),
+                ("rejected_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="clock_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "clocks_daily_rollup",
+                "ordering": ["work_date", "user"],
+                "indexes": [
+                    models.Index(
+                        fields=["work_date"], name="clocks_dail_work_da_037cd3_idx"
+                    ),
+                    models.Index(
+                        fields=["week_start", "user"],
+                        name="clocks_dail_week_st_4c8c82_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "work_date"),
+                        name="clock_rollup_unique_user_day",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0002_clockdailyrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clock",
+            index=models.Index(
+                fields=["user", "work_date", "id"], name="clock_user_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clock",
+            index=models.Index(fields=["work_date", "id"], name="clock_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="clock",
+            index=models.Index(
+                fields=["status", "work_date"], name="clock_status_date_idx"
+            ),
+        ),
+    ]
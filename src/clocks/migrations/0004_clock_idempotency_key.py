@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0003_clock_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clock",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def close_duplicate_open_shifts(apps, schema_editor):
+    """
+    Des pointages ouverts en double existent déjà (appuis concurrents) :
+    seul le plus récent reste ouvert par utilisateur. Les autres sont fermés
+    à leur heure d'entrée (durée nulle, donc exclus des heures travaillées)
+    et restent en attente pour qu'un manager les corrige.
+    """
+    Clock = apps.get_model("clocks", "Clock")
+    kept = set()
+    duplicates = []
+    for clock in Clock.objects.filter(clock_out__isnull=True).order_by(
+        "user_id", "-work_date", "-clock_in", "-id"
+    ):
+        if clock.user_id in kept:
+            clock.clock_out = clock.clock_in
+            duplicates.append(clock)
+        else:
+            kept.add(clock.user_id)
+    Clock.objects.bulk_update(duplicates, ["clock_out"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0004_clock_idempotency_key"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_shifts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="clock",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("clock_out__isnull", True)),
+                fields=("user",),
+                name="clock_one_open_shift_per_user",
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0005_clock_one_open_shift_per_user"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClockAnomaly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("work_date", models.DateField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("OPEN", "Pointage non fermé"),
+                            ("OVERLAP", "Chevauchement"),
+                            ("NEGATIVE", "Sortie avant l'entrée"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("detected_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "clock",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="anomalies",
+                        to="clocks.clock",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="clock_anomalies",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "clocks_anomaly",
+                "indexes": [
+                    models.Index(
+                        fields=["work_date", "id"], name="clock_anomaly_date_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "work_date"], name="clock_anomaly_user_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("clock", "kind"), name="clock_anomaly_unique_kind"
+                    )
+                ],
+            },
+        ),
+    ]
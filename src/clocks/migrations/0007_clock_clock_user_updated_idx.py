@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0006_clockanomaly"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clock",
+            index=models.Index(
+                fields=["user", "updated_at", "id"], name="clock_user_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0008_clockarchive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KpiSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[("team", "Équipe"), ("department", "Département")],
+                        max_length=20,
+                    ),
+                ),
+                ("date_from", models.DateField()),
+                ("date_to", models.DateField()),
+                ("data", models.JSONField(default=list)),
+                ("computed_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "clocks_kpi_snapshot",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("scope", "date_from", "date_to"),
+                        name="kpi_snapshot_unique_period",
+                    )
+                ],
+            },
+        ),
+    ]
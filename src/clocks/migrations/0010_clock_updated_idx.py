@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0009_kpisnapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clock",
+            index=models.Index(fields=["updated_at"], name="clock_updated_idx"),
+        ),
+    ]
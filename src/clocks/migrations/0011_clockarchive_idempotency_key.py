@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clocks", "0010_clock_updated_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clockarchive",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
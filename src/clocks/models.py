@@ -1,5 +1,25 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import DurationField, ExpressionWrapper, F
+
+
+class ClockQuerySet(models.QuerySet):
+    def closed(self):
+        """
+        Pointages terminés dont la durée est exploitable (sortie après entrée).
+        """
+        return self.filter(clock_out__isnull=False, clock_out__gt=F("clock_in"))
+
+    def with_duration(self):
+        """
+        Annote `duration` (clock_out - clock_in), calculée par la base.
+        """
+        return self.annotate(
+            duration=ExpressionWrapper(
+                F("clock_out") - F("clock_in"),
+                output_field=DurationField(),
+            )
+        )
 
 
 class Clock(models.Model):
@@ -16,8 +36,198 @@ class Clock(models.Model):
     clock_in = models.TimeField()
     clock_out = models.TimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    # Clé fournie par les badgeuses pour rejouer un envoi sans doublon
+    idempotency_key = models.CharField(
+        max_length=64, unique=True, null=True, blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ClockQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Index partiel : au plus un pointage ouvert (sans sortie) par user
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(clock_out__isnull=True),
+                name="clock_one_open_shift_per_user",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "work_date", "id"], name="clock_user_date_idx"
+            ),
+            models.Index(fields=["work_date", "id"], name="clock_date_idx"),
+            models.Index(fields=["status", "work_date"], name="clock_status_date_idx"),
+            models.Index(
+                fields=["user", "updated_at", "id"], name="clock_user_updated_idx"
+            ),
+            models.Index(fields=["updated_at"], name="clock_updated_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.user.email} - {self.work_date}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Clé de rollup d'origine, pour recalculer l'ancien jour si elle change
+        instance._loaded_rollup_key = (
+            instance.__dict__.get("user_id"),
+            instance.__dict__.get("work_date"),
+        )
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    @property
+    def rollup_key(self):
+        return (self.user_id, self.work_date)
+
+
+class ClockDailyRollup(models.Model):
+    """
+    Agrégat journalier des pointages d'un utilisateur, maintenu à chaque
+    écriture de `Clock` (voir clocks.rollups).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="clock_rollups",
+    )
+    work_date = models.DateField()
+    week_start = models.DateField()
+
+    worked_seconds = models.PositiveIntegerField(default=0)
+    clock_count = models.PositiveIntegerField(default=0)
+    closed_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    approved_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "clocks_daily_rollup"
+        ordering = ["work_date", "user"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "work_date"],
+                name="clock_rollup_unique_user_day",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["work_date"]),
+            models.Index(fields=["week_start", "user"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.work_date}"
+
+
+class ClockAnomaly(models.Model):
+    """
+    Anomalie détectée sur un pointage par le scan (voir clocks.anomalies).
+    """
+
+    class Kind(models.TextChoices):
+        OPEN = "OPEN", "Pointage non fermé"
+        OVERLAP = "OVERLAP", "Chevauchement"
+        NEGATIVE = "NEGATIVE", "Sortie avant l'entrée"
+
+    clock = models.ForeignKey(Clock, on_delete=models.CASCADE, related_name="anomalies")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="clock_anomalies",
+    )
+    work_date = models.DateField()
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "clocks_anomaly"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["clock", "kind"], name="clock_anomaly_unique_kind"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["work_date", "id"], name="clock_anomaly_date_idx"),
+            models.Index(fields=["user", "work_date"], name="clock_anomaly_user_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} - {self.clock_id}"
+
+
+class ClockArchive(models.Model):
+    """
+    Pointage archivé : périodes closes déplacées hors de `Clock` par
+    `archive_clocks`, pour que les requêtes courantes ne parcourent que
+    l'historique récent. L'id d'origine est conservé.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_clocks",
+    )
+    work_date = models.DateField()
+    clock_in = models.TimeField()
+    clock_out = models.TimeField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Clock.STATUS_CHOICES)
+    # Conservée pour qu'une badgeuse qui rejoue un envoi archivé soit
+    # reconnue comme doublon
+    idempotency_key = models.CharField(
+        max_length=64, unique=True, null=True, blank=True
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ClockQuerySet.as_manager()
+
+    class Meta:
+        db_table = "clocks_clock_archive"
+        indexes = [
+            models.Index(
+                fields=["user", "work_date", "id"], name="clock_archive_user_idx"
+            ),
+            models.Index(fields=["work_date", "id"], name="clock_archive_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.work_date} (archive)"
+
+
+class KpiSnapshot(models.Model):
+    """
+    KPI de présence pré-calculés pour une période et un périmètre (équipes
+    ou départements), servis tant qu'ils n'ont pas expiré.
+    """
+
+    class Scope(models.TextChoices):
+        TEAM = "team", "Équipe"
+        DEPARTMENT = "department", "Département"
+
+    scope = models.CharField(max_length=20, choices=Scope.choices)
+    date_from = models.DateField()
+    date_to = models.DateField()
+    data = models.JSONField(default=list)
+    computed_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "clocks_kpi_snapshot"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "date_from", "date_to"],
+                name="kpi_snapshot_unique_period",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.date_from} → {self.date_to}"
@@ -0,0 +1,9 @@
+from primeBank.pagination import KeysetPagination
+
+
+class ClockPagination(KeysetPagination):
+    ordering_field = "work_date"
+
+
+class ClockAnomalyPagination(KeysetPagination):
+    ordering_field = "work_date"
@@ -0,0 +1,36 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from .ingest import MAX_ITEMS
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse un flux NDJSON (un objet JSON par ligne) en liste d'objets.
+    """
+
+    media_type = "application/x-ndjson"
+    # Le flux n'est pas borné par DATA_UPLOAD_MAX_MEMORY_SIZE : la lecture
+    # s'arrête dès que la limite du lot est dépassée.
+    max_items = MAX_ITEMS
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            if len(items) == self.max_items:
+                raise ParseError(f"{self.max_items} pointages maximum par envoi.")
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON invalide (ligne {number}) : {exc}")
+
+        return items
@@ -0,0 +1,16 @@
+from rest_framework.permissions import BasePermission
+
+from users.constants import UserRole
+
+
+class IsAdmin(BasePermission):
+    """
+    Réservé aux ADMIN.
+    """
+
+    def has_permission(self, request, view):
+        return (
+            request.user
+            and request.user.is_authenticated
+            and request.user.role == UserRole.ADMIN
+        )
@@ -0,0 +1,207 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.utils import timezone
+
+from plannings.models import Planning, PlanningType
+
+from .models import Clock, ClockArchive
+
+DEFAULT_TOLERANCE = timedelta(minutes=5)
+
+
+@dataclass
+class UserReconciliation:
+    user: int
+    planned_shifts: int = 0
+    late_count: int = 0
+    late_minutes: float = 0.0
+    early_leave_count: int = 0
+    early_leave_minutes: float = 0.0
+    missing_shifts: int = 0
+    missing_clock_outs: int = 0
+    unplanned_punches: int = 0
+    overtime_minutes: float = 0.0
+
+    def as_dict(self):
+        data = asdict(self)
+        for key in ("late_minutes", "early_leave_minutes", "overtime_minutes"):
+            data[key] = round(data[key], 1)
+        return data
+
+
+def _minutes(delta):
+    return delta.total_seconds() / 60
+
+
+def window(date_from, date_to):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(date_from, time.min), tz)
+    end = timezone.make_aware(
+        datetime.combine(date_to + timedelta(days=1), time.min), tz
+    )
+    return start, end
+
+
+def load_punches(date_from, date_to, user_ids):
+    """
+    Pointages du lot (courants et archivés), en (user_id, début, fin) triés
+    par utilisateur puis début. Un pointage ouvert a une fin à None.
+    """
+    tz = timezone.get_current_timezone()
+    rows = []
+    for model in (Clock, ClockArchive):
+        queryset = model.objects.filter(work_date__range=(date_from, date_to))
+        if user_ids:
+            queryset = queryset.filter(user_id__in=user_ids)
+        rows.extend(
+            queryset.values_list("user_id", "work_date", "clock_in", "clock_out")
+        )
+
+    punches = []
+    for user_id, work_date, clock_in, clock_out in rows:
+        start = timezone.make_aware(datetime.combine(work_date, clock_in), tz)
+        end = None
+        if clock_out is not None:
+            end = timezone.make_aware(datetime.combine(work_date, clock_out), tz)
+        punches.append((user_id, start, end))
+
+    punches.sort(key=itemgetter(0, 1))
+    return punches
+
+
+def _load_shifts(date_from, date_to, user_ids):
+    window_start, window_end = window(date_from, date_to)
+    queryset = Planning.objects.filter(
+        planning_type=PlanningType.SHIFT,
+        user__isnull=False,
+        start_datetime__lt=window_end,
+        end_datetime__gt=window_start,
+    )
+    if user_ids:
+        queryset = queryset.filter(user_id__in=user_ids)
+
+    return list(
+        queryset.order_by("user_id", "start_datetime").values_list(
+            "user_id", "start_datetime", "end_datetime"
+        )
+    )
+
+
+def by_user(rows):
+    """
+    Regroupe des lignes (user_id, ...) triées par utilisateur en
+    {user_id: [(...), ...]}.
+    """
+    return {
+        user_id: [row[1:] for row in user_rows]
+        for user_id, user_rows in groupby(rows, key=itemgetter(0))
+    }
+
+
+def _match_shift(result, shift_start, shift_end, matched, tolerance):
+    result.planned_shifts += 1
+    if not matched:
+        result.missing_shifts += 1
+        return
+
+    first_in = min(start for start, _ in matched)
+    if first_in - shift_start > tolerance:
+        result.late_count += 1
+        result.late_minutes += _minutes(first_in - shift_start)
+
+    ends = [end for _, end in matched]
+    if None in ends:
+        result.missing_clock_outs += 1
+        return
+
+    last_out = max(ends)
+    if shift_end - last_out > tolerance:
+        result.early_leave_count += 1
+        result.early_leave_minutes += _minutes(shift_end - last_out)
+
+
+def _day_end(moment):
+    local = timezone.localtime(moment)
+    return timezone.make_aware(
+        datetime.combine(local.date() + timedelta(days=1), time.min), local.tzinfo
+    )
+
+
+def sweep(shifts, punches):
+    """
+    Balayage des créneaux planifiés et des pointages d'un utilisateur, tous
+    deux triés par début : chaque liste n'est parcourue qu'une fois (hors
+    chevauchements). Seuls les deux premiers éléments d'un créneau (début,
+    fin) sont lus.
+
+    Renvoie les pointages recouvrant chaque créneau, et pour chaque pointage
+    s'il recouvre un créneau et la durée ainsi couverte.
+    """
+    matches = []
+    covered = [timedelta()] * len(punches)
+    matched_any = [False] * len(punches)
+    # Fin effective : un pointage ouvert court jusqu'à la fin de sa journée,
+    # pour couvrir le créneau dans lequel il a été ouvert (même en avance).
+    reach = [end or _day_end(start) for start, end in punches]
+
+    first = 0
+    for shift in shifts:
+        shift_start, shift_end = shift[0], shift[1]
+        # Les pointages terminés avant ce créneau ne serviront plus
+        while first < len(punches) and reach[first] < shift_start:
+            first += 1
+
+        matched = []
+        index = first
+        while index < len(punches) and punches[index][0] < shift_end:
+            start, end = punches[index]
+            if reach[index] >= shift_start:
+                matched.append((start, end))
+                matched_any[index] = True
+                if end is not None:
+                    covered[index] += min(end, shift_end) - max(start, shift_start)
+            index += 1
+
+        matches.append(matched)
+
+    return matches, matched_any, covered
+
+
+def reconcile_user(user_id, shifts, punches, tolerance=DEFAULT_TOLERANCE):
+    result = UserReconciliation(user=user_id)
+    matches, matched_any, covered = sweep(shifts, punches)
+
+    for (shift_start, shift_end), matched in zip(shifts, matches):
+        _match_shift(result, shift_start, shift_end, matched, tolerance)
+
+    for index, (start, end) in enumerate(punches):
+        if not matched_any[index]:
+            result.unplanned_punches += 1
+            if end is None:
+                result.missing_clock_outs += 1
+        if end is not None and end > start:
+            overtime = (end - start) - covered[index]
+            if overtime > tolerance:
+                result.overtime_minutes += _minutes(overtime)
+
+    return result
+
+
+def reconcile(date_from, date_to, user_ids=None, tolerance=DEFAULT_TOLERANCE):
+    """
+    Rapproche pointages et créneaux SHIFT planifiés sur une période, en un
+    nombre fixe de requêtes pour tout le lot d'utilisateurs. Renvoie un
+    bilan par utilisateur, trié par id.
+    """
+    punches = by_user(load_punches(date_from, date_to, user_ids))
+    shifts = by_user(_load_shifts(date_from, date_to, user_ids))
+
+    return [
+        reconcile_user(
+            user_id, shifts.get(user_id, []), punches.get(user_id, []), tolerance
+        )
+        for user_id in sorted(punches.keys() | shifts.keys())
+    ]
@@ -0,0 +1,80 @@
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncMonth
+
+from teams.models import TeamMembership
+
+# Regroupements organisationnels : champ lu sur l'appartenance du jour
+GROUPS = {
+    "team": "team_id",
+    "department": "team__department_id",
+}
+
+PERIODS = {
+    "day": F("work_date"),
+    "week": F("week_start"),
+    "month": TruncMonth("work_date"),
+}
+
+GROUP_BY_CHOICES = ["user", *GROUPS, *PERIODS]
+
+
+def _hours(seconds):
+    return round(seconds / 3600, 2)
+
+
+def _membership_on_day(field):
+    """
+    Équipe (ou son département) de l'utilisateur le jour du rollup. Une
+    personne membre de plusieurs équipes compte pour la première par id,
+    comme pour la planification automatique : pas de double comptage.
+    """
+    return Subquery(
+        TeamMembership.objects.filter(
+            Q(left_at__isnull=True) | Q(left_at__gt=OuterRef("work_date")),
+            user_id=OuterRef("user_id"),
+            joined_at__lte=OuterRef("work_date"),
+        )
+        .order_by("team_id")
+        .values(field)[:1]
+    )
+
+
+def worked_hours_summary(rollups, group_by):
+    """
+    Agrège les heures travaillées à partir des rollups journaliers
+    (ClockDailyRollup) selon `group_by` (sous-ensemble de GROUP_BY_CHOICES,
+    au plus une période). Équipe et département suivent les appartenances
+    datées (TeamMembership).
+    """
+    fields = ["user"] if "user" in group_by else []
+    groups = {
+        group: _membership_on_day(field)
+        for group, field in GROUPS.items()
+        if group in group_by
+    }
+    periods = {
+        "period": expression
+        for period, expression in PERIODS.items()
+        if period in group_by
+    }
+    dimensions = [*fields, *groups, *periods]
+
+    rows = (
+        rollups.values(*fields, **groups, **periods)
+        .annotate(
+            total=Sum("worked_seconds"),
+            clock_count=Sum("closed_count"),
+        )
+        .filter(clock_count__gt=0)
+        .order_by(*dimensions)
+    )
+
+    return [
+        {
+            **{key: row[key] for key in dimensions},
+            "total_hours": _hours(row["total"]),
+            "average_hours": _hours(row["total"] / row["clock_count"]),
+            "clock_count": row["clock_count"],
+        }
+        for row in rows
+    ]
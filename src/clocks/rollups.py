@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Clock, ClockArchive, ClockDailyRollup
+
+# Nombre de journées recalculées par requête (borne la taille du WHERE)
+REFRESH_CHUNK_SIZE = 200
+
+CLOSED = Q(clock_out__isnull=False, clock_out__gt=F("clock_in"))
+
+AGGREGATES = {
+    "worked": Sum("duration", filter=CLOSED),
+    "clock_count": Count("id"),
+    "closed_count": Count("id", filter=CLOSED),
+    "pending_count": Count("id", filter=Q(status="pending")),
+    "approved_count": Count("id", filter=Q(status="approved")),
+    "rejected_count": Count("id", filter=Q(status="rejected")),
+}
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _daily_rows(condition):
+    """
+    Agrégats par (user, work_date) des pointages courants et archivés
+    correspondant à `condition` (une journée peut être dans les deux tables).
+    """
+    merged = {}
+    for model in (Clock, ClockArchive):
+        rows = (
+            model.objects.filter(condition)
+            .with_duration()
+            .values("user", "work_date")
+            .annotate(**AGGREGATES)
+            .order_by()
+        )
+        for row in rows.iterator():
+            key = (row["user"], row["work_date"])
+            if key not in merged:
+                merged[key] = row
+                continue
+            for name in AGGREGATES:
+                if merged[key][name] is None:
+                    merged[key][name] = row[name]
+                elif row[name] is not None:
+                    merged[key][name] += row[name]
+
+    return merged.values()
+
+
+def _build_rollup(row):
+    worked = row.pop("worked") or timedelta()
+    return ClockDailyRollup(
+        user_id=row.pop("user"),
+        week_start=week_start(row["work_date"]),
+        # Arrondi : une nuit coupée à minuit (23:59:59.999999) compte pleine
+        worked_seconds=round(worked.total_seconds()),
+        **row,
+    )
+
+
+def _keys_condition(keys):
+    condition = Q()
+    for user_id, work_date in keys:
+        condition |= Q(user_id=user_id, work_date=work_date)
+    return condition
+
+
+@transaction.atomic
+def refresh_rollups(keys):
+    """
+    Recalcule les rollups des couples (user_id, work_date) donnés à partir
+    des seuls pointages (courants et archivés) de ces journées.
+    """
+    keys = list({key for key in keys if None not in key})
+
+    for start in range(0, len(keys), REFRESH_CHUNK_SIZE):
+        condition = _keys_condition(keys[start : start + REFRESH_CHUNK_SIZE])
+        rollups = [_build_rollup(row) for row in _daily_rows(condition)]
+
+        ClockDailyRollup.objects.filter(condition).delete()
+        ClockDailyRollup.objects.bulk_create(rollups)
+
+
+@transaction.atomic
+def update_status(queryset, status):
+    """
+    Passe en `status` les pointages en attente de `queryset` en un seul
+    UPDATE, puis recalcule les journées concernées. Renvoie le nombre de
+    pointages modifiés.
+    """
+    pending = queryset.filter(status="pending")
+    keys = set(pending.values_list("user_id", "work_date").distinct())
+    updated = pending.update(status=status, updated_at=timezone.now())
+    refresh_rollups(keys)
+    return updated
+
+
+@transaction.atomic
+def rebuild_rollups(user_ids, batch_size=1000):
+    """
+    Reconstruit entièrement les rollups d'un lot d'utilisateurs.
+    """
+    ClockDailyRollup.objects.filter(user_id__in=user_ids).delete()
+    rows = _daily_rows(Q(user_id__in=user_ids))
+    ClockDailyRollup.objects.bulk_create(
+        [_build_rollup(row) for row in rows],
+        batch_size=batch_size,
+    )
@@ -1,6 +1,19 @@
+from datetime import timedelta
+
 from rest_framework import serializers
 
-from .models import Clock
+from teams.membership import member_ids_query
+from teams.models import Teams
+
+from .exports import STREAMS
+from .models import Clock, ClockAnomaly, ClockArchive, KpiSnapshot
+from .reports import GROUP_BY_CHOICES, PERIODS
+
+OPEN_SHIFT_ERROR = "Un pointage est déjà en cours pour cet utilisateur."
+STALE_SHIFT_ERROR = (
+    "Un pointage du {work_date} n'a jamais été fermé : il doit être corrigé "
+    "par un manager."
+)
 
 
 class ClockSerializer(serializers.ModelSerializer):
@@ -8,3 +21,222 @@ class ClockSerializer(serializers.ModelSerializer):
         model = Clock
         fields = "__all__"
         read_only_fields = ("id", "created_at", "updated_at")
+
+    def validate(self, attrs):
+        user = attrs.get("user") or getattr(self.instance, "user", None)
+        if "clock_out" in attrs:
+            clock_out = attrs["clock_out"]
+        else:
+            clock_out = getattr(self.instance, "clock_out", None)
+
+        if user and clock_out is None:
+            open_shifts = Clock.objects.filter(user=user, clock_out__isnull=True)
+            if self.instance:
+                open_shifts = open_shifts.exclude(pk=self.instance.pk)
+            if open_shifts.exists():
+                raise serializers.ValidationError({"clock_out": OPEN_SHIFT_ERROR})
+
+        return attrs
+
+
+class ClockArchiveSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClockArchive
+        fields = "__all__"
+        read_only_fields = [field.name for field in ClockArchive._meta.fields]
+
+
+class ClockAnomalySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClockAnomaly
+        fields = ["id", "clock", "user", "work_date", "kind", "detected_at"]
+        read_only_fields = fields
+
+
+class ClockAnomalyFilterSerializer(serializers.Serializer):
+    user = serializers.IntegerField(required=False)
+    kind = serializers.ChoiceField(choices=ClockAnomaly.Kind.choices, required=False)
+    work_date__gte = serializers.DateField(required=False)
+    work_date__lte = serializers.DateField(required=False)
+
+
+class ClockBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Pointage envoyé par une badgeuse. L'utilisateur et la clé d'idempotence
+    sont vérifiés pour tout le lot à la fois (voir clocks.ingest). Le statut
+    n'est pas accepté : un pointage importé est toujours en attente.
+    """
+
+    user = serializers.IntegerField()
+    idempotency_key = serializers.CharField(
+        max_length=64, required=False, allow_null=True
+    )
+
+    class Meta:
+        model = Clock
+        fields = [
+            "user",
+            "work_date",
+            "clock_in",
+            "clock_out",
+            "idempotency_key",
+        ]
+
+
+class ClockFilterSerializer(serializers.Serializer):
+    """
+    Filtres de la liste des pointages (clés = lookups ORM, sauf `archived`
+    qui choisit la table lue).
+    """
+
+    user = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Clock.STATUS_CHOICES, required=False)
+    work_date__gte = serializers.DateField(required=False)
+    work_date__lte = serializers.DateField(required=False)
+    archived = serializers.BooleanField(required=False, default=False)
+
+    def get_source(self, filters):
+        """
+        Retire `archived` des filtres et renvoie le modèle à interroger.
+        """
+        return ClockArchive if filters.pop("archived", False) else Clock
+
+
+class ClockBulkStatusSerializer(serializers.Serializer):
+    """
+    Validation / refus groupé des pointages en attente, par ids ou filtres.
+    """
+
+    status = serializers.ChoiceField(choices=["approved", "rejected"])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    user = serializers.IntegerField(required=False)
+    team = serializers.IntegerField(required=False)
+    work_date__gte = serializers.DateField(required=False)
+    work_date__lte = serializers.DateField(required=False)
+
+    def validate_team(self, value):
+        if not Teams.objects.filter(pk=value).exists():
+            raise serializers.ValidationError("Équipe introuvable.")
+        return value
+
+    def validate(self, attrs):
+        if set(attrs) == {"status"}:
+            raise serializers.ValidationError(
+                "Indiquez des ids ou au moins un filtre (user, team, dates)."
+            )
+
+        return attrs
+
+    def get_filters(self):
+        filters = dict(self.validated_data)
+        filters.pop("status")
+        if "ids" in filters:
+            filters["id__in"] = filters.pop("ids")
+        if "team" in filters:
+            filters["user_id__in"] = member_ids_query(filters.pop("team"))
+        return filters
+
+
+class ClockExportQuerySerializer(ClockFilterSerializer):
+    """
+    Paramètres de l'export paie (par défaut : pointages approuvés).
+    """
+
+    status = serializers.ChoiceField(
+        choices=Clock.STATUS_CHOICES, required=False, default="approved"
+    )
+    output = serializers.ChoiceField(choices=sorted(STREAMS), default="csv")
+
+
+class PeriodQuerySerializer(serializers.Serializer):
+    """
+    Période bornée (au plus 62 jours) des rapports calculés à la demande.
+    """
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs["date_to"] < attrs["date_from"]:
+            raise serializers.ValidationError(
+                {"date_to": "date_to doit être postérieure ou égale à date_from."}
+            )
+
+        if attrs["date_to"] - attrs["date_from"] > timedelta(days=62):
+            raise serializers.ValidationError(
+                {"date_to": "La période est limitée à 62 jours."}
+            )
+
+        return attrs
+
+
+class ReconciliationQuerySerializer(PeriodQuerySerializer):
+    """
+    Paramètres du rapprochement pointages / plannings.
+    """
+
+    user = serializers.ListField(child=serializers.IntegerField(), required=False)
+    tolerance = serializers.IntegerField(min_value=0, max_value=120, default=5)
+
+
+class KpiQuerySerializer(PeriodQuerySerializer):
+    """
+    Paramètres des KPI de présence (refresh=true force le recalcul).
+    """
+
+    scope = serializers.ChoiceField(
+        choices=KpiSnapshot.Scope.choices, default=KpiSnapshot.Scope.TEAM
+    )
+    refresh = serializers.BooleanField(required=False, default=False)
+
+
+class KpiSnapshotSerializer(serializers.ModelSerializer):
+    results = serializers.JSONField(source="data")
+
+    class Meta:
+        model = KpiSnapshot
+        fields = [
+            "scope",
+            "date_from",
+            "date_to",
+            "computed_at",
+            "expires_at",
+            "results",
+        ]
+        read_only_fields = fields
+
+
+class ClockSummaryQuerySerializer(serializers.Serializer):
+    """
+    Paramètres de la synthèse des heures travaillées.
+    """
+
+    group_by = serializers.MultipleChoiceField(choices=GROUP_BY_CHOICES)
+    user = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate_group_by(self, value):
+        # Sans regroupement explicite : synthèse par utilisateur
+        if not value:
+            return {"user"}
+
+        if len(value & set(PERIODS)) > 1:
+            raise serializers.ValidationError(
+                "Une seule période (day, week ou month) peut être choisie."
+            )
+
+        return value
+
+    def validate(self, attrs):
+        date_from = attrs.get("date_from")
+        date_to = attrs.get("date_to")
+
+        if date_from and date_to and date_to < date_from:
+            raise serializers.ValidationError(
+                {"date_to": "date_to doit être postérieure ou égale à date_from."}
+            )
+
+        return attrs
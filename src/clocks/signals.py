@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .archive import is_archiving
+from .models import Clock
+from .rollups import refresh_rollups
+
+
+@receiver(post_save, sender=Clock)
+def refresh_rollup_on_save(sender, instance, **kwargs):
+    keys = {instance.rollup_key}
+
+    # Changement d'utilisateur ou de date : l'ancienne journée est aussi à jour
+    loaded_key = getattr(instance, "_loaded_rollup_key", None)
+    if loaded_key:
+        keys.add(loaded_key)
+
+    refresh_rollups(keys)
+    instance._loaded_rollup_key = instance.rollup_key
+
+
+@receiver(post_delete, sender=Clock)
+def refresh_rollup_on_delete(sender, instance, **kwargs):
+    # Pointage archivé : les rollups comptent aussi les archives
+    if is_archiving():
+        return
+
+    refresh_rollups({instance.rollup_key})
@@ -0,0 +1,82 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from clocks.anomalies import scan_anomalies
+from clocks.models import Clock, ClockAnomaly
+
+
+@pytest.fixture
+def anomalous_clocks(user, clock):
+    return {
+        "nested": Clock.objects.create(
+            user=user, work_date="2026-02-09", clock_in="10:00:00", clock_out="11:00:00"
+        ),
+        "after_nested": Clock.objects.create(
+            user=user, work_date="2026-02-09", clock_in="12:00:00", clock_out="13:00:00"
+        ),
+        "negative": Clock.objects.create(
+            user=user, work_date="2026-02-10", clock_in="17:00:00", clock_out="08:00:00"
+        ),
+        "open": Clock.objects.create(
+            user=user, work_date="2026-02-11", clock_in="08:00:00"
+        ),
+    }
+
+
+@pytest.mark.django_db
+def test_scan_detects_each_kind(clock, anomalous_clocks):
+    total = scan_anomalies(chunk_size=1, today=date(2026, 2, 12))
+
+    found = set(ClockAnomaly.objects.values_list("clock_id", "kind"))
+    assert total == 4
+    assert found == {
+        (anomalous_clocks["nested"].id, ClockAnomaly.Kind.OVERLAP),
+        (anomalous_clocks["after_nested"].id, ClockAnomaly.Kind.OVERLAP),
+        (anomalous_clocks["negative"].id, ClockAnomaly.Kind.NEGATIVE),
+        (anomalous_clocks["open"].id, ClockAnomaly.Kind.OPEN),
+    }
+
+
+@pytest.mark.django_db
+def test_scan_ignores_todays_open_clock_and_replaces_findings(anomalous_clocks):
+    scan_anomalies(today=date(2026, 2, 12))
+    anomalous_clocks["negative"].delete()
+
+    scan_anomalies(today=date(2026, 2, 11))
+
+    kinds = set(ClockAnomaly.objects.values_list("kind", flat=True))
+    assert kinds == {ClockAnomaly.Kind.OVERLAP}
+
+
+@pytest.mark.django_db
+def test_anomalies_endpoint_admin_only(api_client, admin_user, user, anomalous_clocks):
+    call_command("scan_clock_anomalies", stdout=StringIO())
+
+    api_client.force_authenticate(user=user)
+    assert (
+        api_client.get(reverse("clock-anomalies-list")).status_code
+        == status.HTTP_403_FORBIDDEN
+    )
+
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(reverse("clock-anomalies-list"), {"kind": "NEGATIVE"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["clock"] for item in response.data["results"]] == [
+        anomalous_clocks["negative"].id
+    ]
+
+
+@pytest.mark.django_db
+def test_scan_endpoint(api_client, admin_user, anomalous_clocks):
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(reverse("clock-anomalies-scan"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["anomalies"] == ClockAnomaly.objects.count()
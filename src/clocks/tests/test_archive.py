@@ -0,0 +1,91 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from clocks.models import Clock, ClockArchive, ClockDailyRollup
+from sync.models import Tombstone
+
+
+@pytest.fixture
+def old_clocks(user, clock):
+    Clock.objects.filter(pk=clock.pk).update(status="approved")
+    pending = Clock.objects.create(
+        user=user, work_date="2026-01-05", clock_in="08:00:00", clock_out="12:00:00"
+    )
+    recent = Clock.objects.create(
+        user=user,
+        work_date="2026-03-02",
+        clock_in="08:00:00",
+        clock_out="12:00:00",
+        status="approved",
+    )
+    return {"approved": clock, "pending": pending, "recent": recent}
+
+
+@pytest.mark.django_db
+def test_archive_moves_closed_periods_only(old_clocks):
+    call_command("archive_clocks", "2026-03-01", batch_size=1, stdout=StringIO())
+
+    archived = ClockArchive.objects.get()
+    assert archived.id == old_clocks["approved"].id
+    assert archived.status == "approved"
+    assert set(Clock.objects.values_list("id", flat=True)) == {
+        old_clocks["pending"].id,
+        old_clocks["recent"].id,
+    }
+
+
+@pytest.mark.django_db
+def test_rollups_keep_archived_days(old_clocks, user):
+    call_command("archive_clocks", "2026-03-01", stdout=StringIO())
+    rollup = ClockDailyRollup.objects.get(work_date="2026-02-09")
+    assert rollup.worked_seconds == 9 * 3600
+
+    Clock.objects.create(
+        user=user, work_date="2026-02-09", clock_in="18:00:00", clock_out="19:00:00"
+    )
+    call_command("rebuild_clock_rollups", stdout=StringIO())
+
+    rollup = ClockDailyRollup.objects.get(work_date="2026-02-09")
+    assert rollup.worked_seconds == 10 * 3600
+    assert rollup.clock_count == 2
+
+
+@pytest.mark.django_db
+def test_list_archived_clocks(api_client, user, old_clocks):
+    call_command("archive_clocks", "2026-03-01", stdout=StringIO())
+    api_client.force_authenticate(user=user)
+
+    live = api_client.get(reverse("clocks-list"))
+    archived = api_client.get(reverse("clocks-list"), {"archived": "true"})
+
+    assert status.HTTP_200_OK == live.status_code == archived.status_code
+    assert old_clocks["approved"].id not in [c["id"] for c in live.data["results"]]
+    assert [c["id"] for c in archived.data["results"]] == [old_clocks["approved"].id]
+
+
+@pytest.mark.django_db
+def test_archived_punch_replay_is_a_duplicate(api_client, admin_user, user):
+    item = {
+        "user": user.id,
+        "work_date": "2026-01-05",
+        "clock_in": "08:00:00",
+        "clock_out": "12:00:00",
+        "idempotency_key": "badge-42",
+    }
+    api_client.force_authenticate(user=admin_user)
+    created = api_client.post(reverse("clocks-bulk"), [item], format="json")
+    Clock.objects.update(status="approved")
+    call_command("archive_clocks", "2026-03-01", stdout=StringIO())
+
+    replay = api_client.post(reverse("clocks-bulk"), [item], format="json")
+
+    (result,) = replay.data["results"]
+    assert result["status"] == "duplicate"
+    assert result["id"] == created.data["results"][0]["id"]
+    assert not Clock.objects.exists()
+    assert ClockArchive.objects.get().idempotency_key == "badge-42"
+    assert not Tombstone.objects.exists()
@@ -0,0 +1,92 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from clocks.kpis import compute_kpis
+from clocks.models import Clock, KpiSnapshot
+from departments.models import Department
+from plannings.models import Planning
+from teams.models import Teams
+
+
+@pytest.fixture
+def team(db):
+    department = Department.objects.create(name="Operations")
+    return Teams.objects.create(name="Alpha", description="", department=department)
+
+
+@pytest.fixture
+def team_week(user, team, aware):
+    for day in (9, 10, 11):
+        Planning.objects.create(
+            title="Shift",
+            start_datetime=aware(2026, 2, day, 9),
+            end_datetime=aware(2026, 2, day, 17),
+            user=user,
+            team=team,
+        )
+    Clock.objects.create(
+        user=user, work_date="2026-02-09", clock_in="09:00:00", clock_out="19:00:00"
+    )
+    Clock.objects.create(
+        user=user, work_date="2026-02-10", clock_in="09:30:00", clock_out="17:00:00"
+    )
+
+
+@pytest.mark.django_db
+def test_compute_team_and_department_kpis(team, team_week):
+    kpis = compute_kpis(date(2026, 2, 9), date(2026, 2, 15))
+
+    expected = {
+        "planned_shifts": 3,
+        "absences": 1,
+        "late_shifts": 1,
+        "lateness_rate": 0.5,
+        "average_daily_hours": 5.83,
+        "overtime_hours": 2.0,
+    }
+    assert kpis[KpiSnapshot.Scope.TEAM] == [
+        {"id": team.id, "name": "Alpha", "department": team.department_id, **expected}
+    ]
+    assert kpis[KpiSnapshot.Scope.DEPARTMENT] == [
+        {"id": team.department_id, "name": "Operations", **expected}
+    ]
+
+
+@pytest.mark.django_db
+def test_early_open_punch_is_not_an_absence(team, team_week, user):
+    Clock.objects.create(user=user, work_date="2026-02-11", clock_in="08:50:00")
+
+    (row,) = compute_kpis(date(2026, 2, 9), date(2026, 2, 15))[KpiSnapshot.Scope.TEAM]
+
+    assert row["absences"] == 0
+    assert row["late_shifts"] == 1
+
+
+@pytest.mark.django_db
+def test_kpis_endpoint_serves_snapshot(api_client, admin_user, team_week):
+    api_client.force_authenticate(user=admin_user)
+    params = {"date_from": "2026-02-09", "date_to": "2026-02-15"}
+
+    first = api_client.get(reverse("clocks-kpis"), params)
+    Clock.objects.all().delete()
+    second = api_client.get(reverse("clocks-kpis"), params)
+    refreshed = api_client.get(reverse("clocks-kpis"), {**params, "refresh": "true"})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.data["results"] == first.data["results"]
+    assert second.data["computed_at"] == first.data["computed_at"]
+    assert refreshed.data["results"][0]["absences"] == 3
+
+
+@pytest.mark.django_db
+def test_kpis_endpoint_forbidden_for_user(api_client, user):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(
+        reverse("clocks-kpis"), {"date_from": "2026-02-09", "date_to": "2026-02-15"}
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
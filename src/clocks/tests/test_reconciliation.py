@@ -0,0 +1,110 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from clocks.models import Clock
+from clocks.reconciliation import reconcile
+from plannings.models import Planning
+
+
+@pytest.fixture
+def planned_week(user, aware):
+    for day in (9, 10):
+        Planning.objects.create(
+            title="Shift",
+            start_datetime=aware(2026, 2, day, 9),
+            end_datetime=aware(2026, 2, day, 17),
+            user=user,
+        )
+    Clock.objects.create(
+        user=user, work_date="2026-02-09", clock_in="09:20:00", clock_out="18:30:00"
+    )
+    Clock.objects.create(
+        user=user, work_date="2026-02-11", clock_in="10:00:00", clock_out="12:00:00"
+    )
+
+
+@pytest.mark.django_db
+def test_reconcile_detects_lateness_absence_and_overtime(user, planned_week):
+    (result,) = reconcile(date(2026, 2, 9), date(2026, 2, 15))
+
+    assert result.as_dict() == {
+        "user": user.id,
+        "planned_shifts": 2,
+        "late_count": 1,
+        "late_minutes": 20.0,
+        "early_leave_count": 0,
+        "early_leave_minutes": 0.0,
+        "missing_shifts": 1,
+        "missing_clock_outs": 0,
+        "unplanned_punches": 1,
+        "overtime_minutes": 210.0,
+    }
+
+
+@pytest.mark.django_db
+def test_reconcile_early_leave_and_open_punch(user, aware):
+    Planning.objects.create(
+        title="Shift",
+        start_datetime=aware(2026, 2, 9, 9),
+        end_datetime=aware(2026, 2, 9, 17),
+        user=user,
+    )
+    Clock.objects.create(
+        user=user, work_date="2026-02-09", clock_in="09:00:00", clock_out="16:00:00"
+    )
+    Clock.objects.create(user=user, work_date="2026-02-10", clock_in="09:00:00")
+
+    (result,) = reconcile(date(2026, 2, 9), date(2026, 2, 10))
+
+    assert result.early_leave_count == 1
+    assert result.early_leave_minutes == 60
+    assert result.missing_clock_outs == 1
+    assert result.unplanned_punches == 1
+
+
+@pytest.mark.django_db
+def test_reconcile_early_open_punch_attends_shift(user, aware):
+    Planning.objects.create(
+        title="Shift",
+        start_datetime=aware(2026, 2, 9, 9),
+        end_datetime=aware(2026, 2, 9, 17),
+        user=user,
+    )
+    Clock.objects.create(user=user, work_date="2026-02-09", clock_in="08:55:00")
+
+    (result,) = reconcile(date(2026, 2, 9), date(2026, 2, 9))
+
+    assert result.planned_shifts == 1
+    assert result.missing_shifts == 0
+    assert result.unplanned_punches == 0
+    assert result.missing_clock_outs == 1
+    assert result.late_count == 0
+
+
+@pytest.mark.django_db
+def test_reconciliation_endpoint(api_client, admin_user, user, planned_week):
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.get(
+        reverse("clocks-reconciliation"),
+        {"date_from": "2026-02-09", "date_to": "2026-02-15", "user": [user.id]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]["missing_shifts"] == 1
+
+
+@pytest.mark.django_db
+def test_reconcile_command(user, planned_week):
+    out = StringIO()
+
+    call_command("reconcile_clocks", "2026-02-09", "2026-02-15", stdout=out)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("user,planned_shifts,late_count")
+    assert lines[1].startswith(f"{user.id},2,1,20.0")
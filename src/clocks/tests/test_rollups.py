@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from clocks.models import Clock, ClockDailyRollup
+
+
+@pytest.mark.django_db
+def test_rollup_created_with_clock(clock):
+    rollup = ClockDailyRollup.objects.get(user=clock.user, work_date=clock.work_date)
+
+    assert rollup.week_start == date(2026, 2, 9)
+    assert rollup.worked_seconds == 9 * 3600
+    assert rollup.clock_count == 1
+    assert rollup.closed_count == 1
+    assert rollup.pending_count == 1
+
+
+@pytest.mark.django_db
+def test_rollup_follows_status_and_date_changes(clock):
+    clock = Clock.objects.get(pk=clock.pk)
+    clock.status = "approved"
+    clock.work_date = date(2026, 2, 10)
+    clock.save()
+
+    assert not ClockDailyRollup.objects.filter(work_date=date(2026, 2, 9)).exists()
+    rollup = ClockDailyRollup.objects.get(work_date=date(2026, 2, 10))
+    assert rollup.approved_count == 1
+    assert rollup.pending_count == 0
+
+
+@pytest.mark.django_db
+def test_rollup_removed_with_last_clock(clock):
+    clock.delete()
+
+    assert ClockDailyRollup.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_open_clock_counted_without_duration(user):
+    Clock.objects.create(user=user, work_date="2026-02-09", clock_in="08:00:00")
+
+    rollup = ClockDailyRollup.objects.get()
+    assert rollup.clock_count == 1
+    assert rollup.closed_count == 0
+    assert rollup.worked_seconds == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_command(clock):
+    ClockDailyRollup.objects.all().delete()
+
+    call_command("rebuild_clock_rollups", chunk_size=1)
+
+    rollup = ClockDailyRollup.objects.get()
+    assert rollup.worked_seconds == 9 * 3600
@@ -1,5 +1,6 @@
 import pytest
 
+from clocks.models import Clock
 from clocks.serializers import ClockSerializer
 
 
@@ -29,3 +30,18 @@ def test_clock_create_serializer_success(user):
 
     assert clock.user == user
     assert clock.status == "pending"
+
+
+@pytest.mark.django_db
+def test_clock_serializer_rejects_second_open_shift(user):
+    Clock.objects.create(user=user, work_date="2026-02-10", clock_in="08:00:00")
+    serializer = ClockSerializer(
+        data={
+            "user": user.id,
+            "work_date": "2026-02-10",
+            "clock_in": "09:00:00",
+        }
+    )
+
+    assert not serializer.is_valid()
+    assert "clock_out" in serializer.errors
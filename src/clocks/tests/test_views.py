@@ -1,8 +1,20 @@
+import json
+from datetime import date, timedelta
+
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 
-from clocks.models import Clock
+from clocks.anomalies import scan_users
+from clocks.exports import export_rows
+from clocks.models import Clock, ClockAnomaly, ClockDailyRollup
+from clocks.parsers import NDJSONParser
+from clocks.reconciliation import reconcile
+from departments.models import Department
+from plannings.models import Planning
+from teams.models import TeamMembership, Teams
 
 
 @pytest.mark.django_db
@@ -57,3 +69,490 @@ def test_delete_clock(api_client, user, clock):
 
     response = api_client.delete(reverse("clocks-detail", args=[clock.id]))
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_summary_by_user(api_client, user, clock):
+    Clock.objects.create(
+        user=user, work_date="2026-02-10", clock_in="09:00:00", clock_out="12:00:00"
+    )
+    Clock.objects.create(user=user, work_date="2026-02-11", clock_in="09:00:00")
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse("clocks-summary"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == [
+        {
+            "user": user.id,
+            "total_hours": 12.0,
+            "average_hours": 6.0,
+            "clock_count": 2,
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_summary_by_user_and_week(api_client, user, clock):
+    Clock.objects.create(
+        user=user, work_date="2026-02-16", clock_in="08:30:00", clock_out="12:00:00"
+    )
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(
+        reverse("clocks-summary"),
+        {"group_by": ["user", "week"], "date_from": "2026-02-01"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(row["period"], row["total_hours"]) for row in response.data] == [
+        (date(2026, 2, 9), 9.0),
+        (date(2026, 2, 16), 3.5),
+    ]
+
+
+@pytest.mark.django_db
+def test_summary_is_scoped_to_requester_unless_manager(
+    api_client, admin_user, user, clock
+):
+    Clock.objects.create(
+        user=admin_user,
+        work_date="2026-02-09",
+        clock_in="09:00:00",
+        clock_out="10:00:00",
+    )
+
+    api_client.force_authenticate(user=user)
+    own = api_client.get(reverse("clocks-summary"), {"group_by": ["user"]})
+    other = api_client.get(
+        reverse("clocks-summary"), {"group_by": ["user"], "user": admin_user.id}
+    )
+    api_client.force_authenticate(user=admin_user)
+    everyone = api_client.get(reverse("clocks-summary"), {"group_by": ["user"]})
+
+    assert [row["user"] for row in own.data] == [user.id]
+    assert other.data == []
+    assert sorted(row["user"] for row in everyone.data) == sorted(
+        [user.id, admin_user.id]
+    )
+
+
+@pytest.mark.django_db
+def test_summary_by_team_and_department(api_client, user, clock):
+    department = Department.objects.create(name="Operations")
+    first = Teams.objects.create(name="Alpha", description="", department=department)
+    second = Teams.objects.create(name="Beta", description="", department=department)
+    for team in (first, second):
+        TeamMembership.objects.create(team=team, user=user, joined_at="2026-01-01")
+    api_client.force_authenticate(user=user)
+
+    by_team = api_client.get(reverse("clocks-summary"), {"group_by": ["team"]})
+    by_department = api_client.get(
+        reverse("clocks-summary"), {"group_by": ["department"]}
+    )
+
+    # Membre de deux équipes : compté une fois, dans la première
+    assert [(row["team"], row["total_hours"]) for row in by_team.data] == [
+        (first.id, 9.0)
+    ]
+    assert [(row["department"], row["total_hours"]) for row in by_department.data] == [
+        (department.id, 9.0)
+    ]
+
+
+@pytest.mark.django_db
+def test_summary_rejects_two_periods(api_client, user):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse("clocks-summary"), {"group_by": ["day", "week"]})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_clocks_filters(api_client, user, clock):
+    Clock.objects.create(
+        user=user, work_date="2026-01-15", clock_in="08:00:00", status="approved"
+    )
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(
+        reverse("clocks-list"),
+        {"user": user.id, "work_date__gte": "2026-02-01", "status": "pending"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.data["results"]] == [clock.id]
+
+
+@pytest.mark.django_db
+def test_list_clocks_rejects_invalid_date(api_client, user):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse("clocks-list"), {"work_date__gte": "hier"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_clocks_keyset_pagination(api_client, user):
+    clocks = [
+        Clock.objects.create(
+            user=user, work_date=day, clock_in="08:00:00", clock_out="12:00:00"
+        )
+        for day in ("2026-02-09", "2026-02-09", "2026-02-10")
+    ]
+    api_client.force_authenticate(user=user)
+
+    first = api_client.get(reverse("clocks-list"), {"page_size": 2})
+    second = api_client.get(first.data["next"])
+
+    assert [item["id"] for item in first.data["results"]] == [
+        clocks[2].id,
+        clocks[1].id,
+    ]
+    assert [item["id"] for item in second.data["results"]] == [clocks[0].id]
+    assert second.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_json(api_client, admin_user, user):
+    api_client.force_authenticate(user=admin_user)
+    payload = [
+        {
+            "user": user.id,
+            "work_date": "2026-02-10",
+            "clock_in": "08:00:00",
+            "idempotency_key": "badge-1",
+        },
+        {"user": user.id, "work_date": "not-a-date", "clock_in": "08:00:00"},
+        {"user": 999999, "work_date": "2026-02-10", "clock_in": "08:00:00"},
+        {
+            "user": user.id,
+            "work_date": "2026-02-10",
+            "clock_in": "08:00:00",
+            "idempotency_key": "badge-1",
+        },
+    ]
+
+    response = api_client.post(reverse("clocks-bulk"), payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.data["results"]
+    assert [result["status"] for result in results] == [
+        "created",
+        "error",
+        "error",
+        "duplicate",
+    ]
+    assert "work_date" in results[1]["errors"]
+    assert results[3]["id"] == results[0]["id"]
+    assert Clock.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_ndjson_retry_is_idempotent(api_client, admin_user, user):
+    api_client.force_authenticate(user=admin_user)
+    body = "\n".join(
+        json.dumps(
+            {
+                "user": user.id,
+                "work_date": "2026-02-10",
+                "clock_in": f"0{hour}:00:00",
+                "clock_out": f"0{hour}:30:00",
+                "idempotency_key": f"badge-{hour}",
+            }
+        )
+        for hour in (7, 8)
+    )
+
+    for _ in range(2):
+        response = api_client.post(
+            reverse("clocks-bulk"), body, content_type="application/x-ndjson"
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    assert [r["status"] for r in response.data["results"]] == [
+        "duplicate",
+        "duplicate",
+    ]
+    assert Clock.objects.count() == 2
+    assert ClockDailyRollup.objects.get().clock_count == 2
+
+
+def test_ndjson_parser_stops_after_max_items(monkeypatch):
+    monkeypatch.setattr(NDJSONParser, "max_items", 2)
+    read = []
+
+    def stream():
+        for number in range(1000):
+            read.append(number)
+            yield json.dumps({"n": number}).encode() + b"\n"
+
+    with pytest.raises(ParseError):
+        NDJSONParser().parse(stream())
+
+    assert len(read) == 3
+
+
+@pytest.mark.django_db
+def test_export_csv_only_approved(api_client, admin_user, user, clock):
+    Clock.objects.filter(pk=clock.pk).update(status="approved")
+    Clock.objects.create(user=user, work_date="2026-02-10", clock_in="09:00:00")
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.get(reverse("clocks-export"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "text/csv"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0].startswith("id,user_id,email,first_name,last_name")
+    assert lines[1:] == [
+        f"{clock.id},{user.id},user@test.com,Normal,User,2026-02-09,"
+        "08:00:00,17:00:00,approved,9.0"
+    ]
+
+
+@pytest.mark.django_db
+def test_export_ndjson(api_client, admin_user, user, clock):
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.get(
+        reverse("clocks-export"), {"output": "ndjson", "status": "pending"}
+    )
+
+    rows = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).decode().splitlines()
+    ]
+    assert rows == [
+        {
+            "id": clock.id,
+            "user_id": user.id,
+            "email": "user@test.com",
+            "first_name": "Normal",
+            "last_name": "User",
+            "work_date": "2026-02-09",
+            "clock_in": "08:00:00",
+            "clock_out": "17:00:00",
+            "status": "pending",
+            "duration_hours": 9.0,
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_export_forbidden_for_user(api_client, user, clock):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(reverse("clocks-export"))
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_rejects_second_open_shift(api_client, admin_user, user):
+    api_client.force_authenticate(user=admin_user)
+    payload = [
+        {"user": user.id, "work_date": "2026-02-10", "clock_in": "08:00:00"},
+        {"user": user.id, "work_date": "2026-02-10", "clock_in": "09:00:00"},
+    ]
+
+    response = api_client.post(reverse("clocks-bulk"), payload, format="json")
+
+    results = response.data["results"]
+    assert [result["status"] for result in results] == ["created", "error"]
+    assert "clock_out" in results[1]["errors"]
+
+
+@pytest.mark.django_db
+def test_bulk_ingest_creates_pending_clocks_for_managers_only(
+    api_client, admin_user, user
+):
+    payload = [
+        {
+            "user": user.id,
+            "work_date": "2026-02-10",
+            "clock_in": "08:00:00",
+            "clock_out": "12:00:00",
+            "status": "approved",
+        }
+    ]
+
+    api_client.force_authenticate(user=user)
+    forbidden = api_client.post(reverse("clocks-bulk"), payload, format="json")
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.post(reverse("clocks-bulk"), payload, format="json")
+
+    assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+    assert response.data["results"][0]["status"] == "created"
+    assert Clock.objects.get().status == "pending"
+
+
+@pytest.mark.django_db
+def test_clock_in_then_clock_out(api_client, user):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("clocks-clock-in"))
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["clock_out"] is None
+
+    response = api_client.post(reverse("clocks-clock-in"))
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = api_client.post(reverse("clocks-clock-out"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["clock_out"] is not None
+    assert Clock.objects.filter(clock_out__isnull=True).count() == 0
+
+
+@pytest.mark.django_db
+def test_clock_out_without_open_shift(api_client, user, clock):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("clocks-clock-out"))
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.django_db
+def test_clock_out_splits_last_night_shift_at_midnight(
+    api_client, user, aware, monkeypatch
+):
+    monkeypatch.setattr(timezone, "now", lambda: aware(2026, 3, 11, 6))
+    night = Clock.objects.create(
+        user=user, work_date=date(2026, 3, 10), clock_in="22:00:00"
+    )
+    Planning.objects.create(
+        title="Night shift",
+        start_datetime=aware(2026, 3, 10, 22),
+        end_datetime=aware(2026, 3, 11, 6),
+        user=user,
+    )
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("clocks-clock-out"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["work_date"] == "2026-03-11"
+    assert response.data["clock_in"] == "00:00:00"
+    assert response.data["clock_out"] == "06:00:00"
+    night.refresh_from_db()
+    assert night.clock_out > night.clock_in
+
+    rollups = ClockDailyRollup.objects.filter(user=user).order_by("work_date")
+    assert [(r.worked_seconds, r.closed_count) for r in rollups] == [
+        (2 * 3600, 1),
+        (6 * 3600, 1),
+    ]
+    assert [row[-1] for row in export_rows(Clock.objects.filter(user=user))] == [
+        2.0,
+        6.0,
+    ]
+    assert scan_users([user.id], today=date(2026, 3, 11)) == 0
+    (result,) = reconcile(date(2026, 3, 10), date(2026, 3, 11), user_ids=[user.id])
+    assert result.planned_shifts == 1
+    assert result.missing_shifts == 0
+    assert result.unplanned_punches == 0
+    assert result.early_leave_count == 0
+    assert result.overtime_minutes == 0
+
+
+@pytest.mark.django_db
+def test_stale_open_shift_is_refused_and_flagged(api_client, user):
+    stale = Clock.objects.create(
+        user=user,
+        work_date=timezone.localdate() - timedelta(days=7),
+        clock_in="09:00:00",
+    )
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("clocks-clock-out"))
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert str(stale.work_date) in response.data["detail"]
+
+    response = api_client.post(reverse("clocks-clock-in"))
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert str(stale.work_date) in response.data["detail"]
+
+    stale.refresh_from_db()
+    assert stale.clock_out is None
+    assert list(ClockAnomaly.objects.values_list("clock_id", "kind")) == [
+        (stale.id, ClockAnomaly.Kind.OPEN)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_status_approves_pending_only(api_client, admin_user, user, clock):
+    rejected = Clock.objects.create(
+        user=user,
+        work_date="2026-02-10",
+        clock_in="08:00:00",
+        clock_out="12:00:00",
+        status="rejected",
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(
+        reverse("clocks-bulk-status"),
+        {"status": "approved", "user": user.id},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["updated"] == 1
+    clock.refresh_from_db()
+    rejected.refresh_from_db()
+    assert clock.status == "approved"
+    assert rejected.status == "rejected"
+    assert ClockDailyRollup.objects.get(work_date=clock.work_date).approved_count == 1
+
+
+@pytest.mark.django_db
+def test_bulk_status_by_team(api_client, admin_user, user, clock):
+    team = Teams.objects.create(name="Alpha", description="")
+    TeamMembership.objects.create(team=team, user=user)
+    outsider = Clock.objects.create(
+        user=admin_user, work_date="2026-02-09", clock_in="08:00:00"
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(
+        reverse("clocks-bulk-status"),
+        {"status": "approved", "team": team.id},
+        format="json",
+    )
+    unknown = api_client.post(
+        reverse("clocks-bulk-status"),
+        {"status": "approved", "team": 999999},
+        format="json",
+    )
+
+    assert response.data["updated"] == 1
+    assert Clock.objects.get(pk=clock.pk).status == "approved"
+    assert Clock.objects.get(pk=outsider.pk).status == "pending"
+    assert unknown.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_status_requires_a_filter(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(
+        reverse("clocks-bulk-status"), {"status": "approved"}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_bulk_status_forbidden_for_user(api_client, user, clock):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(
+        reverse("clocks-bulk-status"),
+        {"status": "approved", "ids": [clock.id]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -1,8 +1,9 @@
 from rest_framework.routers import DefaultRouter
 
-from .views import ClockViewSet
+from .views import ClockAnomalyViewSet, ClockViewSet
 
 router = DefaultRouter()
 router.register("clocks", ClockViewSet, basename="clocks")
+router.register("clock-anomalies", ClockAnomalyViewSet, basename="clock-anomalies")
 
 urlpatterns = router.urls
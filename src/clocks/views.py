@@ -1,14 +1,75 @@
+from datetime import time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import permissions, viewsets
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+
+from users.permissions import IsManagerOrAdmin, is_manager_or_admin
+
+from .anomalies import flag_open_shift, scan_anomalies
+from .exports import STREAMS, export_rows
+from .ingest import MAX_ITEMS, ingest_clocks
+from .kpis import get_snapshot
+from .models import Clock, ClockAnomaly, ClockArchive, ClockDailyRollup
+from .pagination import ClockAnomalyPagination, ClockPagination
+from .parsers import NDJSONParser
+from .permissions import IsAdmin
+from .reconciliation import reconcile
+from .reports import worked_hours_summary
+from .rollups import update_status
+from .serializers import (
+    OPEN_SHIFT_ERROR,
+    STALE_SHIFT_ERROR,
+    ClockAnomalyFilterSerializer,
+    ClockAnomalySerializer,
+    ClockArchiveSerializer,
+    ClockBulkItemSerializer,
+    ClockBulkStatusSerializer,
+    ClockExportQuerySerializer,
+    ClockFilterSerializer,
+    ClockSerializer,
+    ClockSummaryQuerySerializer,
+    KpiQuerySerializer,
+    KpiSnapshotSerializer,
+    ReconciliationQuerySerializer,
+)
 
-from .models import Clock
-from .serializers import ClockSerializer
+
+def _stale_open_shift(user, today):
+    """
+    Réponse 409 si l'utilisateur a un pointage ouvert antérieur à la veille,
+    après l'avoir signalé comme anomalie ; None sinon.
+    """
+    stale = Clock.objects.filter(
+        user=user,
+        clock_out__isnull=True,
+        work_date__lt=today - timedelta(days=1),
+    ).first()
+    if stale is None:
+        return None
+
+    flag_open_shift(stale)
+    return Response(
+        {"detail": STALE_SHIFT_ERROR.format(work_date=stale.work_date)},
+        status=status.HTTP_409_CONFLICT,
+    )
 
 
 @extend_schema_view(
     list=extend_schema(
         tags=["Clocks"],
         summary="Lister tous les pointages",
+        description=(
+            "Liste paginée par curseur (work_date, id), du plus récent au plus "
+            "ancien, filtrable par utilisateur, statut et plage de dates. "
+            "archived=true lit les pointages archivés."
+        ),
+        parameters=[ClockFilterSerializer],
     ),
     retrieve=extend_schema(
         tags=["Clocks"],
@@ -35,3 +96,357 @@ class ClockViewSet(viewsets.ModelViewSet):
     queryset = Clock.objects.all()
     serializer_class = ClockSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ClockPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action == "list":
+            params = ClockFilterSerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            filters = dict(params.validated_data)
+            source = params.get_source(filters)
+            if source is ClockArchive:
+                self.archived = True
+                queryset = source.objects.all()
+            queryset = queryset.filter(**filters)
+
+        return queryset
+
+    def get_serializer_class(self):
+        if getattr(self, "archived", False):
+            return ClockArchiveSerializer
+
+        return super().get_serializer_class()
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Synthèse des heures travaillées",
+        description=(
+            "Total et moyenne des heures travaillées, agrégés à partir des "
+            "rollups journaliers par utilisateur, équipe ou département "
+            "et/ou par jour, semaine ISO ou mois. Hors managers et "
+            "administrateurs, seules les heures de l'utilisateur connecté "
+            "sont prises en compte."
+        ),
+        parameters=[ClockSummaryQuerySerializer],
+    )
+    @action(detail=False, methods=["get"], url_path="summary")
+    def summary(self, request):
+        params = ClockSummaryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        queryset = ClockDailyRollup.objects.all()
+        # Hors ADMIN/MANAGER : uniquement ses propres heures
+        if not is_manager_or_admin(request.user):
+            queryset = queryset.filter(user=request.user)
+        if "user" in filters:
+            queryset = queryset.filter(user_id=filters["user"])
+        if "date_from" in filters:
+            queryset = queryset.filter(work_date__gte=filters["date_from"])
+        if "date_to" in filters:
+            queryset = queryset.filter(work_date__lte=filters["date_to"])
+
+        return Response(worked_hours_summary(queryset, filters["group_by"]))
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Import groupé de pointages",
+        description=(
+            "Reçoit un tableau JSON ou un flux NDJSON de pointages (badgeuses) "
+            "et renvoie un résultat par élément : created, duplicate (clé "
+            "d'idempotence déjà connue) ou error. Les pointages sont créés en "
+            "attente. Réservé aux managers et administrateurs."
+        ),
+        request=ClockBulkItemSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk",
+        parser_classes=[JSONParser, NDJSONParser],
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Un tableau de pointages est attendu."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(items) > MAX_ITEMS:
+            return Response(
+                {"detail": f"{MAX_ITEMS} pointages maximum par envoi."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            results = ingest_clocks(items)
+        except IntegrityError:
+            # Envoi concurrent avec les mêmes clés : le rejeu donnera des doublons
+            return Response(
+                {"detail": "Conflit d'idempotence, veuillez réessayer."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Export paie des pointages",
+        description=(
+            "Export en flux (CSV ou NDJSON) des pointages filtrés, avec "
+            "l'email et le nom de l'utilisateur et la durée calculée. "
+            "Mémoire constante quel que soit le volume exporté. Réservé aux "
+            "managers et administrateurs."
+        ),
+        parameters=[ClockExportQuerySerializer],
+        responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def export(self, request):
+        params = ClockExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = dict(params.validated_data)
+        output = filters.pop("output")
+        source = params.get_source(filters)
+
+        stream, content_type = STREAMS[output]
+        response = StreamingHttpResponse(
+            stream(export_rows(source.objects.filter(**filters))),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="clocks_export.{output}"'
+        )
+        return response
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Pointer l'entrée",
+        description=(
+            "Ouvre un pointage pour l'utilisateur connecté à l'heure courante. "
+            "Refusé (409) si un pointage est déjà en cours (signalé comme "
+            "anomalie s'il date d'avant la veille)."
+        ),
+        request=None,
+        responses={201: ClockSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="clock-in")
+    def clock_in(self, request):
+        now = timezone.localtime()
+
+        try:
+            # L'index partiel unique garantit un seul pointage ouvert par user
+            with transaction.atomic():
+                clock = Clock.objects.create(
+                    user=request.user,
+                    work_date=now.date(),
+                    clock_in=now.time(),
+                )
+        except IntegrityError:
+            stale = _stale_open_shift(request.user, now.date())
+            if stale is not None:
+                return stale
+            return Response(
+                {"detail": OPEN_SHIFT_ERROR},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(ClockSerializer(clock).data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Pointer la sortie",
+        description=(
+            "Ferme le pointage en cours de l'utilisateur connecté à l'heure "
+            "courante. Un pointage ouvert la veille est fermé à minuit et "
+            "prolongé par un pointage du jour, qui est renvoyé. Refusé (409) "
+            "s'il n'y a aucun pointage ouvert du jour ou de la veille ; un "
+            "pointage plus ancien est signalé comme anomalie pour correction "
+            "par un manager."
+        ),
+        request=None,
+        responses={200: ClockSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="clock-out")
+    def clock_out(self, request):
+        now = timezone.localtime()
+
+        with transaction.atomic():
+            # Seul un pointage du jour (ou de la veille, pour les nuits) est
+            # fermé : l'heure courante n'a pas de sens sur une date plus ancienne.
+            clock = (
+                Clock.objects.select_for_update()
+                .filter(
+                    user=request.user,
+                    clock_out__isnull=True,
+                    work_date__gte=now.date() - timedelta(days=1),
+                    work_date__lte=now.date(),
+                )
+                .first()
+            )
+            if clock is None:
+                stale = _stale_open_shift(request.user, now.date())
+                if stale is not None:
+                    return stale
+                return Response(
+                    {"detail": "Aucun pointage en cours."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            if clock.work_date < now.date():
+                # Nuit à cheval sur deux jours : le pointage de la veille est
+                # fermé à minuit et la suite devient un pointage du jour, pour
+                # qu'aucun pointage ne sorte de sa journée (durées, rollups,
+                # anomalies, rapprochement et export restent cohérents).
+                clock.clock_out = time.max
+                clock.save(update_fields=["clock_out", "updated_at"])
+                clock = Clock.objects.create(
+                    user=request.user,
+                    work_date=now.date(),
+                    clock_in=time.min,
+                    clock_out=now.time(),
+                )
+            else:
+                clock.clock_out = now.time()
+                clock.save(update_fields=["clock_out", "updated_at"])
+
+        return Response(ClockSerializer(clock).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Valider / refuser des pointages en masse",
+        description=(
+            "Passe en approved ou rejected, en une seule requête UPDATE, les "
+            "pointages en attente désignés par leurs ids ou par des filtres "
+            "(utilisateur, équipe, dates). "
+            "Réservé aux managers et administrateurs."
+        ),
+        request=ClockBulkStatusSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-status",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def bulk_status(self, request):
+        serializer = ClockBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        queryset = Clock.objects.filter(**serializer.get_filters())
+        updated = update_status(queryset, serializer.validated_data["status"])
+
+        return Response(
+            {"status": serializer.validated_data["status"], "updated": updated},
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Rapprochement pointages / plannings",
+        description=(
+            "Compare, par utilisateur, les pointages aux créneaux SHIFT "
+            "planifiés : retards, départs anticipés, absences, pointages "
+            "non fermés et heures hors planning. Réservé aux managers et "
+            "administrateurs."
+        ),
+        parameters=[ReconciliationQuerySerializer],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="reconciliation",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def reconciliation(self, request):
+        params = ReconciliationQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        results = reconcile(
+            data["date_from"],
+            data["date_to"],
+            user_ids=data.get("user"),
+            tolerance=timedelta(minutes=data["tolerance"]),
+        )
+        return Response([result.as_dict() for result in results])
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="KPI de présence par équipe ou département",
+        description=(
+            "Taux de retard, heures quotidiennes moyennes, heures "
+            "supplémentaires et absences sur la période, servis depuis un "
+            "snapshot recalculé à expiration. Réservé aux managers et "
+            "administrateurs."
+        ),
+        parameters=[KpiQuerySerializer],
+        responses={200: KpiSnapshotSerializer},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="kpis",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def kpis(self, request):
+        params = KpiQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        snapshot = get_snapshot(**params.validated_data)
+        return Response(KpiSnapshotSerializer(snapshot).data)
+
+
+@extend_schema_view(
+    list=extend_schema(
+        tags=["Clocks"],
+        summary="Lister les anomalies de pointage",
+        description=(
+            "Anomalies enregistrées par le dernier scan, paginées par curseur "
+            "(work_date, id). Réservé aux administrateurs."
+        ),
+        parameters=[ClockAnomalyFilterSerializer],
+    ),
+    retrieve=extend_schema(
+        tags=["Clocks"],
+        summary="Détail d’une anomalie de pointage",
+    ),
+)
+class ClockAnomalyViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ClockAnomaly.objects.all()
+    serializer_class = ClockAnomalySerializer
+    permission_classes = [IsAdmin]
+    pagination_class = ClockAnomalyPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action == "list":
+            params = ClockAnomalyFilterSerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            queryset = queryset.filter(**params.validated_data)
+
+        return queryset
+
+    @extend_schema(
+        tags=["Clocks"],
+        summary="Scanner les anomalies de pointage",
+        description=(
+            "Relance la détection (non fermés, chevauchements, sortie avant "
+            "l'entrée) sur toute la table, par lots d'utilisateurs."
+        ),
+        request=None,
+    )
+    @action(detail=False, methods=["post"], url_path="scan")
+    def scan(self, request):
+        total = scan_anomalies()
+        return Response({"anomalies": total}, status=status.HTTP_200_OK)
@@ -1,4 +1,7 @@
+from datetime import datetime
+
 import pytest
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from users.constants import UserRole
@@ -9,6 +12,18 @@ def api_client():
     return APIClient()
 
 
+@pytest.fixture
+def aware():
+    """
+    datetime(*args) dans le fuseau courant.
+    """
+
+    def make(*args):
+        return timezone.make_aware(datetime(*args))
+
+    return make
+
+
 @pytest.fixture
 def admin_user(django_user_model):
     return django_user_model.objects.create_user(
@@ -0,0 +1,27 @@
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .ics import hash_feed_token
+from .models import CalendarFeedToken
+
+
+class FeedTokenAuthentication(BaseAuthentication):
+    """
+    Authentification par jeton de flux passé dans l'URL (?token=), réservée
+    au flux iCalendar.
+    """
+
+    def authenticate(self, request):
+        token = request.query_params.get("token")
+        if not token:
+            return None
+
+        feed_token = (
+            CalendarFeedToken.objects.select_related("user")
+            .filter(key_hash=hash_feed_token(token))
+            .first()
+        )
+        if feed_token is None or not feed_token.user.is_active:
+            raise AuthenticationFailed("Jeton de flux invalide.")
+
+        return feed_token.user, feed_token
@@ -0,0 +1,43 @@
+from .conflicts import CONFLICTING_TYPES
+from .models import PlanningType
+from .recurrence import expand_window
+
+# Un shift n'empêche pas une réunion ; une autre réunion ou un congé, si.
+BUSY_TYPES = CONFLICTING_TYPES[PlanningType.MEETING]
+
+
+def merge_intervals(intervals):
+    """
+    Fusion des intervalles [début, fin[ qui se chevauchent ou se touchent,
+    par tri puis balayage : O(n log n).
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def free_slots(queryset, start, end, duration):
+    """
+    Créneaux communs d'au moins `duration` sur [start, end[ où aucun des
+    plannings bloquants de `queryset` n'est posé. Tous les utilisateurs sont
+    chargés ensemble (récurrences dépliées), puis fusionnés en un balayage.
+    """
+    busy = merge_intervals(
+        (max(o.start_datetime, start), min(o.end_datetime, end))
+        for o in expand_window(
+            queryset.filter(planning_type__in=BUSY_TYPES), start, end
+        )
+    )
+
+    slots = []
+    cursor = start
+    for busy_start, busy_end in busy + [[end, end]]:
+        if busy_start - cursor >= duration:
+            slots.append({"start": cursor, "end": busy_start})
+        cursor = max(cursor, busy_end)
+    return slots
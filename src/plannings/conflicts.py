@@ -0,0 +1,136 @@
+import heapq
+from datetime import timedelta
+
+from .models import Planning, PlanningException, PlanningType
+from .recurrence import expand_planning, expand_window
+
+# Types qui ne peuvent pas se chevaucher pour un même utilisateur.
+# Une réunion pendant un shift est normale ; un congé bloque tout.
+CONFLICTING_TYPES = {
+    PlanningType.SHIFT: {PlanningType.SHIFT, PlanningType.PTO},
+    PlanningType.MEETING: {PlanningType.MEETING, PlanningType.PTO},
+    PlanningType.PTO: set(PlanningType),
+}
+
+# Horizon de vérification d'une règle récurrente (même borne que la
+# fenêtre de calendrier).
+RECURRENCE_HORIZON = timedelta(days=366)
+
+
+def planning_occurrences(planning, horizon=RECURRENCE_HORIZON):
+    """
+    Occurrences d'un planning (éventuellement non enregistré) à vérifier :
+    une règle récurrente est dépliée sur `horizon` à partir de son début.
+    """
+    exceptions = {}
+    if planning.recurrence and planning.pk:
+        exceptions = {
+            exception.occurrence_date: exception
+            for exception in PlanningException.objects.filter(planning_id=planning.pk)
+        }
+    return expand_planning(
+        planning,
+        planning.start_datetime,
+        planning.start_datetime + horizon,
+        exceptions,
+    )
+
+
+def first_conflict(planning):
+    """
+    Premier planning existant de l'utilisateur incompatible avec l'une des
+    occurrences de `planning` (règles récurrentes dépliées des deux côtés),
+    ou None.
+    """
+    occurrences = planning_occurrences(planning)
+    if not occurrences or planning.user_id is None:
+        return None
+
+    existing = Planning.objects.filter(
+        user_id=planning.user_id,
+        planning_type__in=CONFLICTING_TYPES[planning.planning_type],
+    )
+    if planning.pk is not None:
+        existing = existing.exclude(pk=planning.pk)
+    others = expand_window(
+        existing,
+        min(o.start_datetime for o in occurrences),
+        max(o.end_datetime for o in occurrences),
+    )
+
+    # Le planning vérifié est numéroté 0 pour le distinguer de l'existant
+    rows = [
+        (
+            o.planning.pk,
+            planning.user_id,
+            o.start_datetime,
+            o.end_datetime,
+            o.planning.planning_type,
+        )
+        for o in others
+    ] + [
+        (0, planning.user_id, o.start_datetime, o.end_datetime, planning.planning_type)
+        for o in occurrences
+    ]
+    rows.sort(key=lambda row: (row[2], row[0]))
+
+    plannings = {o.planning.pk: o.planning for o in others}
+    for conflict in sweep_conflicts(rows):
+        first, second = conflict["plannings"]
+        # Seuls comptent les conflits entre le planning vérifié et l'existant
+        if (first == 0) != (second == 0):
+            return plannings[first or second]
+    return None
+
+
+def find_conflicts(queryset, start, end):
+    """
+    Paires de plannings incompatibles qui se chevauchent sur [start, end[,
+    récurrences dépliées (voir sweep_conflicts).
+    """
+    rows = [
+        (
+            o.planning.pk,
+            o.planning.user_id,
+            o.start_datetime,
+            o.end_datetime,
+            o.planning.planning_type,
+        )
+        for o in expand_window(queryset.filter(user__isnull=False), start, end)
+    ]
+    rows.sort(key=lambda row: (row[1], row[2], row[0]))
+    return sweep_conflicts(rows)
+
+
+def sweep_conflicts(rows):
+    """
+    Balayage de lignes (pk, user_id, début, fin, type) triées par
+    (user, début) : un tas des créneaux encore ouverts par utilisateur.
+    O(n log n + nombre de chevauchements).
+    """
+    conflicts = []
+    active = []
+    current_user = None
+
+    for pk, user_id, start, end, planning_type in rows:
+        if user_id != current_user:
+            current_user, active = user_id, []
+
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        for other_end, other_pk, other_type in active:
+            if other_type in CONFLICTING_TYPES[planning_type]:
+                conflicts.append(
+                    {
+                        "user": user_id,
+                        "plannings": [other_pk, pk],
+                        "types": [other_type, planning_type],
+                        "overlap_start": start,
+                        "overlap_end": min(end, other_end),
+                    }
+                )
+
+        heapq.heappush(active, (end, pk, planning_type))
+
+    return conflicts
@@ -0,0 +1,111 @@
+from django.db import transaction
+
+from .conflicts import CONFLICTING_TYPES, sweep_conflicts
+from .models import Planning, PlanningType
+from .pto import sync_plannings
+from .recurrence import expand_window
+
+MAX_COPIES = 5000
+
+COPIED_FIELDS = (
+    "title",
+    "description",
+    "planning_type",
+    "work_mode",
+    "user_id",
+    "team_id",
+)
+
+
+def build_copies(source, offset, repeat):
+    """
+    Copies non enregistrées de chaque planning de `source`, décalées de
+    offset, 2 * offset, ... repeat * offset.
+    """
+    copies = []
+    for planning in source:
+        for step in range(1, repeat + 1):
+            copy = Planning(
+                **{field: getattr(planning, field) for field in COPIED_FIELDS},
+                start_datetime=planning.start_datetime + offset * step,
+                end_datetime=planning.end_datetime + offset * step,
+            )
+            copy.copied_from = planning.pk
+            copies.append(copy)
+    return copies
+
+
+def copy_conflicts(copies):
+    """
+    Chevauchements des copies entre elles et avec l'existant (récurrences
+    dépliées) : l'enveloppe des créneaux cibles est chargée d'un coup, puis
+    balayée une seule fois. Les copies
+    sont numérotées négativement pour les distinguer des plannings existants.
+    """
+    assigned = [copy for copy in copies if copy.user_id is not None]
+    if not assigned:
+        return []
+
+    existing = expand_window(
+        Planning.objects.filter(
+            user_id__in={copy.user_id for copy in assigned},
+            planning_type__in=set().union(
+                *(CONFLICTING_TYPES[copy.planning_type] for copy in assigned)
+            ),
+        ),
+        min(copy.start_datetime for copy in assigned),
+        max(copy.end_datetime for copy in assigned),
+    )
+
+    rows = [
+        (
+            o.planning.pk,
+            o.planning.user_id,
+            o.start_datetime,
+            o.end_datetime,
+            o.planning.planning_type,
+        )
+        for o in existing
+    ] + [
+        (
+            -index,
+            copy.user_id,
+            copy.start_datetime,
+            copy.end_datetime,
+            copy.planning_type,
+        )
+        for index, copy in enumerate(copies, start=1)
+        if copy.user_id is not None
+    ]
+    rows.sort(key=lambda row: (row[1], row[2], row[0]))
+
+    conflicts = []
+    for conflict in sweep_conflicts(rows):
+        if all(pk > 0 for pk in conflict["plannings"]):
+            # Conflit déjà présent en base, hors du périmètre de la copie.
+            continue
+        conflict["plannings"] = [
+            pk if pk > 0 else {"copy_of": copies[-pk - 1].copied_from}
+            for pk in conflict["plannings"]
+        ]
+        conflicts.append(conflict)
+    return conflicts
+
+
+def copy_plannings(source, offset, repeat):
+    """
+    Copie `source` vers les semaines (ou périodes) suivantes. Tout ou rien :
+    en cas de chevauchement rien n'est créé et les conflits sont renvoyés.
+    """
+    copies = build_copies(source, offset, repeat)
+    conflicts = copy_conflicts(copies)
+    if conflicts:
+        return [], conflicts
+
+    with transaction.atomic():
+        created = Planning.objects.bulk_create(copies)
+        # bulk_create n'émet pas de signaux : congés copiés imputés ici
+        pto = [p for p in created if p.planning_type == PlanningType.PTO]
+        if pto:
+            sync_plannings(pto)
+    return created, []
@@ -0,0 +1,67 @@
+import hashlib
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import PlanningType, WorkMode
+from .recurrence import expand_window
+
+BUCKET_MINUTES = (15, 30, 60)
+COVERAGE_CACHE_TIMEOUT = 60 * 60
+
+
+def coverage_counts(intervals, start, end, bucket):
+    """
+    Nombre de personnes planifiées par tranche et par mode de travail.
+
+    Tableau de différences : +1 sur la tranche de début, -1 après la
+    tranche de fin, puis somme préfixe. O(intervalles + tranches).
+    """
+    size = -(-(end - start) // bucket)
+    diffs = {mode: [0] * (size + 1) for mode in WorkMode.values}
+
+    for interval_start, interval_end, work_mode in intervals:
+        first = max((interval_start - start) // bucket, 0)
+        last = min(-(-(interval_end - start) // bucket), size)
+        if first < last:
+            diffs[work_mode][first] += 1
+            diffs[work_mode][last] -= 1
+
+    return {mode: list(accumulate(diff))[:size] for mode, diff in diffs.items()}
+
+
+def _cache_key(queryset, scope, start, end, bucket):
+    # Même principe que les ETag du flux iCalendar : la clé change dès
+    # qu'un planning est créé, modifié ou supprimé.
+    stats = queryset.aggregate(last_modified=Max("updated_at"), total=Count("id"))
+    version = f"{stats['total']}:{stats['last_modified']}"
+    raw = f"{scope}:{start.isoformat()}:{end.isoformat()}:{bucket}:{version}"
+    return "planning-coverage:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def coverage(queryset, scope, start, end, bucket_minutes):
+    """
+    Heatmap de présence des shifts de `queryset` sur [start, end[, mise en
+    cache par fenêtre tant que les plannings ne changent pas.
+    """
+    bucket = timedelta(minutes=bucket_minutes)
+    shifts = queryset.filter(planning_type=PlanningType.SHIFT)
+    key = _cache_key(shifts, scope, start, end, bucket_minutes)
+
+    result = cache.get(key)
+    if result is None:
+        counts = coverage_counts(
+            (
+                (o.start_datetime, o.end_datetime, o.planning.work_mode)
+                for o in expand_window(shifts, start, end)
+            ),
+            start,
+            end,
+            bucket,
+        )
+        result = {"bucket_minutes": bucket_minutes, "counts": counts}
+        cache.set(key, result, COVERAGE_CACHE_TIMEOUT)
+
+    return result
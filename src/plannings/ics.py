@@ -0,0 +1,113 @@
+import hashlib
+import secrets
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import CalendarFeedToken
+from .recurrence import expand_window
+
+# Fenêtre bornée du flux : les clients rafraîchissent en continu.
+FEED_PAST = timedelta(days=30)
+FEED_FUTURE = timedelta(days=180)
+
+PRODID = "-//Time Manager//Plannings//FR"
+
+
+def feed_window(now=None):
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - FEED_PAST, today + FEED_FUTURE
+
+
+def feed_validators(queryset, scope, window_start):
+    """
+    (ETag, Last-Modified) du flux en une requête d'agrégat. Le nombre de
+    lignes couvre les suppressions, le début de fenêtre son glissement.
+    """
+    stats = queryset.aggregate(last_modified=Max("updated_at"), total=Count("id"))
+    last_modified = stats["last_modified"] or window_start
+    key = f"{scope}:{stats['total']}:{last_modified.isoformat()}:{window_start.date()}"
+    return hashlib.sha1(key.encode()).hexdigest(), last_modified
+
+
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """
+    Repli RFC 5545 : lignes de 75 octets au plus, suites préfixées d'un espace.
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        # Ne pas couper au milieu d'un caractère UTF-8
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return "\r\n ".join(parts)
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_calendar(queryset, name, start, end):
+    """
+    Document iCalendar des plannings de `queryset` sur [start, end[,
+    récurrences dépliées.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+
+    for occurrence in expand_window(queryset, start, end):
+        planning = occurrence.planning
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{planning.pk}-{occurrence.occurrence_date:%Y%m%d}@time-manager",
+            f"DTSTAMP:{_utc(planning.updated_at)}",
+            f"DTSTART:{_utc(occurrence.start_datetime)}",
+            f"DTEND:{_utc(occurrence.end_datetime)}",
+            f"SUMMARY:{_escape(planning.title)}",
+            f"CATEGORIES:{planning.planning_type}",
+        ]
+        if planning.description:
+            lines.append(f"DESCRIPTION:{_escape(planning.description)}")
+        lines.append("END:VEVENT")
+
+    lines.append("END:VCALENDAR")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def hash_feed_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def rotate_feed_token(user):
+    """
+    Génère un nouveau jeton de flux pour `user` (l'ancien cesse de marcher)
+    et renvoie sa valeur en clair, qui n'est plus récupérable ensuite.
+    """
+    token = secrets.token_urlsafe(32)
+    CalendarFeedToken.objects.update_or_create(
+        user=user, defaults={"key_hash": hash_feed_token(token)}
+    )
+    return token
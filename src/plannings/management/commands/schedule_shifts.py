@@ -0,0 +1,62 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from plannings.scheduler import schedule_shifts, teams_for
+from plannings.serializers import AutoScheduleSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Planifie automatiquement les shifts d'une équipe ou d'un département "
+        "à partir d'un fichier JSON (même format que /plannings/auto-schedule/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("payload", help="Fichier JSON des besoins.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processus utilisés pour résoudre les équipes en parallèle.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calculer sans enregistrer les plannings.",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["payload"], encoding="utf-8") as payload:
+            params = AutoScheduleSerializer(
+                data={**json.load(payload), "dry_run": options["dry_run"]}
+            )
+        if not params.is_valid():
+            raise CommandError(json.dumps(params.errors, ensure_ascii=False))
+
+        workers = options["workers"] if options["workers"] > 0 else os.cpu_count()
+        plannings, unfilled = schedule_shifts(
+            teams_for(
+                params.validated_data.get("team"),
+                params.validated_data.get("department"),
+            ),
+            workers=workers,
+            **params.get_options(),
+        )
+
+        for slot in unfilled:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Équipe {slot['team']} : {slot['start_datetime']:%Y-%m-%d %H:%M} "
+                    f"il manque {slot['missing']} personne(s)"
+                    + (
+                        " dont un détenteur de permission"
+                        if slot["permission_missing"]
+                        else ""
+                    )
+                )
+            )
+
+        verb = "calculés" if options["dry_run"] else "créés"
+        self.stdout.write(self.style.SUCCESS(f"{len(plannings)} shifts {verb}."))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0002_alter_planning_options_remove_planning_team_id_and_more"),
+        ("teams", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="planning",
+            index=models.Index(
+                fields=["user", "updated_at", "id"], name="planning_user_updated_idx"
+            ),
+        ),
+    ]
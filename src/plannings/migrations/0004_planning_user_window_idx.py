@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0003_planning_planning_user_updated_idx"),
+        ("teams", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="planning",
+            index=models.Index(
+                fields=["user", "start_datetime", "end_datetime"],
+                name="planning_user_window_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations
+
+# Contrainte d'exclusion GiST (PostgreSQL uniquement) : deux plannings
+# SHIFT / PTO d'un même utilisateur ne peuvent pas se chevaucher.
+# Les autres bases s'appuient sur la vérification du serializer.
+CREATE_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    """
+    ALTER TABLE plannings_planning
+    ADD CONSTRAINT planning_no_overlap
+    EXCLUDE USING gist (
+        user_id WITH =,
+        tstzrange(start_datetime, end_datetime) WITH &&
+    )
+    WHERE (user_id IS NOT NULL AND planning_type IN ('SHIFT', 'PTO'))
+    """,
+]
+
+DROP_SQL = ["ALTER TABLE plannings_planning DROP CONSTRAINT planning_no_overlap"]
+
+# Chevauchements déjà en base, qui empêcheraient la création de la
+# contrainte (une contrainte d'exclusion ne peut pas être NOT VALID).
+OVERLAPS_SQL = """
+    SELECT a.user_id, a.id, b.id
+    FROM plannings_planning a
+    JOIN plannings_planning b
+      ON b.user_id = a.user_id
+     AND b.id > a.id
+     AND b.start_datetime < a.end_datetime
+     AND a.start_datetime < b.end_datetime
+    WHERE a.planning_type IN ('SHIFT', 'PTO')
+      AND b.planning_type IN ('SHIFT', 'PTO')
+    ORDER BY a.user_id, a.id, b.id
+    LIMIT %s
+"""
+
+REPORTED_OVERLAPS = 50
+
+
+def check_existing_overlaps(schema_editor):
+    """
+    Les doublons de shifts et les congés chevauchants existants ne peuvent
+    pas être arbitrés automatiquement : la migration s'arrête en listant
+    les paires à corriger (voir aussi GET /plannings/conflicts/).
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_SQL, [REPORTED_OVERLAPS])
+        overlaps = cursor.fetchall()
+
+    if overlaps:
+        pairs = "\n".join(
+            f"  user {user_id}: plannings {first} / {second}"
+            for user_id, first, second in overlaps
+        )
+        raise RuntimeError(
+            "Plannings SHIFT / PTO qui se chevauchent : corrigez-les avant "
+            f"d'appliquer cette migration ({REPORTED_OVERLAPS} paires "
+            f"listées au plus).\n{pairs}"
+        )
+
+
+def _run_on_postgresql(statements, check=None):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        if check is not None:
+            check(schema_editor)
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0004_planning_user_window_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run_on_postgresql(CREATE_SQL, check=check_existing_overlaps),
+            _run_on_postgresql(DROP_SQL),
+        ),
+    ]
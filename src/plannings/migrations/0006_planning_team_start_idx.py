@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0005_planning_no_overlap_constraint"),
+        ("teams", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="planning",
+            index=models.Index(
+                fields=["team", "start_datetime"], name="planning_team_start_idx"
+            ),
+        ),
+    ]
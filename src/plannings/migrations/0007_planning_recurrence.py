@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0006_planning_team_start_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="planning",
+            name="recurrence",
+            field=models.CharField(
+                blank=True,
+                choices=[("DAILY", "Daily"), ("WEEKLY", "Weekly")],
+                default="",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="planning",
+            name="recurrence_interval",
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="planning",
+            name="recurrence_until",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="planning",
+            name="recurrence_weekdays",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name="PlanningException",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("occurrence_date", models.DateField()),
+                ("is_cancelled", models.BooleanField(default=False)),
+                ("start_datetime", models.DateTimeField(blank=True, null=True)),
+                ("end_datetime", models.DateTimeField(blank=True, null=True)),
+                (
+                    "planning",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exceptions",
+                        to="plannings.planning",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["occurrence_date"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("planning", "occurrence_date"),
+                        name="planning_exception_unique_date",
+                    )
+                ],
+            },
+        ),
+    ]
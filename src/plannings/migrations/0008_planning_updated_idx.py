@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0007_planning_recurrence"),
+        ("teams", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="planning",
+            index=models.Index(fields=["updated_at"], name="planning_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0009_pto_ledger"),
+        ("teams", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="planning",
+            index=models.Index(
+                fields=["start_datetime", "id"], name="planning_start_id_idx"
+            ),
+        ),
+    ]
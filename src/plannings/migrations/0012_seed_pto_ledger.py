@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.utils import timezone
+
+from plannings.pto import pto_days
+
+
+def seed(apps, schema_editor):
+    """
+    Inscrit au registre les congés antérieurs à sa création. Sans cela, la
+    première modification d'un ancien congé débiterait rétroactivement toute
+    sa durée.
+
+    Ces jours ont été pris sur un solde que le registre ne connaît pas :
+    chaque utilisateur reçoit un ajustement de reprise du même montant, son
+    solde est inchangé. Une modification ou une suppression ultérieure
+    ajoute ensuite le bon mouvement correctif.
+    """
+    Planning = apps.get_model("plannings", "Planning")
+    PtoLedgerEntry = apps.get_model("plannings", "PtoLedgerEntry")
+
+    plannings = (
+        Planning.objects.filter(planning_type="PTO", user__isnull=False)
+        .exclude(pto_entries__isnull=False)
+        .order_by("user_id", "start_datetime", "id")
+    )
+    by_user = defaultdict(list)
+    for planning in plannings.iterator():
+        by_user[planning.user_id].append(planning)
+
+    for user_id, user_plannings in by_user.items():
+        last = PtoLedgerEntry.objects.filter(user_id=user_id).order_by("-id").first()
+        balance = last.balance if last else 0
+        consumed = [
+            (planning, pto_days(planning.start_datetime, planning.end_datetime))
+            for planning in user_plannings
+        ]
+        total = sum(days for _, days in consumed)
+        if not total:
+            continue
+
+        entries = [
+            PtoLedgerEntry(
+                user_id=user_id,
+                kind="ADJUSTMENT",
+                amount=total,
+                balance=balance + total,
+                effective_date=timezone.localtime(
+                    user_plannings[0].start_datetime
+                ).date(),
+                note="Reprise des congés antérieurs au registre",
+            )
+        ]
+        balance += total
+        for planning, days in consumed:
+            if not days:
+                continue
+            balance -= days
+            entries.append(
+                PtoLedgerEntry(
+                    user_id=user_id,
+                    kind="CONSUMPTION",
+                    amount=-days,
+                    balance=balance,
+                    effective_date=timezone.localtime(planning.start_datetime).date(),
+                    planning_id=planning.pk,
+                    note=planning.title[:255],
+                )
+            )
+        PtoLedgerEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plannings", "0011_calendar_feed_token"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed, migrations.RunPython.noop),
+    ]
@@ -14,6 +14,11 @@ class WorkMode(models.TextChoices):
     HYBRID = "HYBRID", "Hybrid"
 
 
+class Recurrence(models.TextChoices):
+    DAILY = "DAILY", "Daily"
+    WEEKLY = "WEEKLY", "Weekly"
+
+
 class Planning(models.Model):
     title = models.CharField(max_length=150)
     description = models.TextField(blank=True)
@@ -45,11 +50,139 @@ class Planning(models.Model):
         related_name="plannings",
     )
 
+    # Règle de récurrence : la ligne porte la première occurrence, les
+    # suivantes sont calculées à la demande (voir plannings.recurrence).
+    recurrence = models.CharField(
+        max_length=10, choices=Recurrence.choices, blank=True, default=""
+    )
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    # Jours de la semaine (0 = lundi) pour WEEKLY ; vide = jour du début.
+    recurrence_weekdays = models.JSONField(default=list, blank=True)
+    recurrence_until = models.DateField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-start_datetime"]
+        indexes = [
+            models.Index(
+                fields=["user", "updated_at", "id"], name="planning_user_updated_idx"
+            ),
+            models.Index(
+                fields=["user", "start_datetime", "end_datetime"],
+                name="planning_user_window_idx",
+            ),
+            models.Index(
+                fields=["team", "start_datetime"], name="planning_team_start_idx"
+            ),
+            models.Index(fields=["updated_at"], name="planning_updated_idx"),
+            models.Index(fields=["start_datetime", "id"], name="planning_start_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} ({self.start_datetime} -> {self.end_datetime})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Propriétaire d'origine, pour notifier la synchronisation s'il change
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+
+class PlanningException(models.Model):
+    """
+    Exception sur une occurrence d'un planning récurrent : annulation ou
+    horaires déplacés.
+    """
+
+    planning = models.ForeignKey(
+        Planning, on_delete=models.CASCADE, related_name="exceptions"
+    )
+    occurrence_date = models.DateField()
+    is_cancelled = models.BooleanField(default=False)
+    start_datetime = models.DateTimeField(null=True, blank=True)
+    end_datetime = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["occurrence_date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["planning", "occurrence_date"],
+                name="planning_exception_unique_date",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.planning_id} @ {self.occurrence_date}"
+
+
+class PtoEntryKind(models.TextChoices):
+    ACCRUAL = "ACCRUAL", "Accrual"
+    CONSUMPTION = "CONSUMPTION", "Consumption"
+    ADJUSTMENT = "ADJUSTMENT", "Adjustment"
+
+
+class PtoLedgerEntry(models.Model):
+    """
+    Mouvement du compteur de congés (en jours). Le registre est en ajout
+    seul : `balance` est le solde après le mouvement, dans l'ordre
+    d'enregistrement, ce qui rend la lecture du solde immédiate.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="pto_entries",
+    )
+    kind = models.CharField(max_length=20, choices=PtoEntryKind.choices)
+    amount = models.DecimalField(max_digits=6, decimal_places=2)
+    balance = models.DecimalField(max_digits=8, decimal_places=2)
+    effective_date = models.DateField()
+    planning = models.ForeignKey(
+        Planning,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="pto_entries",
+    )
+    note = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["user", "id"], name="pto_user_entry_idx"),
+            models.Index(fields=["user", "effective_date"], name="pto_user_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.kind} {self.amount} -> {self.balance}"
+
+
+class CalendarFeedToken(models.Model):
+    """
+    Jeton secret d'abonnement au flux iCalendar d'un utilisateur : les
+    applications d'agenda ne savent pas envoyer d'en-tête Authorization, le
+    jeton est donc passé dans l'URL. Seule son empreinte SHA-256 est
+    conservée ; le régénérer invalide l'URL précédente.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="calendar_feed_token",
+    )
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.user_id} feed token"
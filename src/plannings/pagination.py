@@ -0,0 +1,5 @@
+from primeBank.pagination import KeysetPagination
+
+
+class PlanningPagination(KeysetPagination):
+    ordering_field = "start_datetime"
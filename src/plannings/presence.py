@@ -0,0 +1,235 @@
+import threading
+from bisect import bisect_right
+from collections import Counter, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.utils import timezone
+
+from clocks.models import Clock
+from sync.models import Tombstone
+
+from .models import Planning, PlanningType
+from .recurrence import expand_window
+
+# Fraîcheur maximale de l'index : au plus une série de requêtes delta par
+# worker et par intervalle, quel que soit le nombre d'appels.
+REFRESH_INTERVAL = timedelta(seconds=30)
+
+# Recouvrement des rafraîchissements : une transaction validée après un
+# passage peut porter un updated_at antérieur. Relire ces lignes est sans
+# effet (remplacement à l'identique).
+REFRESH_OVERLAP = timedelta(minutes=2)
+
+Entry = namedtuple("Entry", "start end user_id team_id work_mode source")
+
+
+def _clock_entries(clock):
+    """
+    Intervalle de présence d'un pointage (ouvert : jusqu'à nouvel ordre).
+    Une sortie avant l'entrée est une anomalie (les nuits sont coupées à
+    minuit par clock-out) : comme dans les rollups, elle ne compte pas.
+    """
+    start = timezone.make_aware(datetime.combine(clock.work_date, clock.clock_in))
+    if clock.clock_out is None:
+        end = None
+    else:
+        end = timezone.make_aware(datetime.combine(clock.work_date, clock.clock_out))
+        if end <= start:
+            return []
+    return [Entry(start, end, clock.user_id, None, None, "clock")]
+
+
+class OnShiftIndex:
+    """
+    Index en mémoire (par worker) des shifts du jour et des pointages.
+
+    Les intervalles sont découpés en segments élémentaires entre leurs
+    bornes triées : tous les instants d'un segment ont le même ensemble de
+    présents, calculé une fois puis mémorisé. Une requête coûte une
+    recherche dichotomique ; la base n'est interrogée qu'au rafraîchissement
+    (lignes modifiées depuis le dernier passage, d'après updated_at, et
+    suppressions d'après les tombstones de synchronisation et les
+    utilisateurs disparus).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.day = None
+        self.refreshed_at = None
+        self._since = None
+        self._tombstone_id = 0
+        self._entries = {}
+        self._invalidate()
+
+    def _invalidate(self):
+        self._bounds = None
+        self._memo = {}
+
+    def window(self):
+        start = timezone.make_aware(datetime.combine(self.day, time.min))
+        return start, start + timedelta(days=1)
+
+    # Chargement ----------------------------------------------------------
+
+    def _load_plannings(self, queryset):
+        start, end = self.window()
+        for occurrence in expand_window(
+            queryset.filter(planning_type=PlanningType.SHIFT), start, end
+        ):
+            planning = occurrence.planning
+            self._entries.setdefault(("planning", planning.pk), []).append(
+                Entry(
+                    occurrence.start_datetime,
+                    occurrence.end_datetime,
+                    planning.user_id,
+                    planning.team_id,
+                    planning.work_mode,
+                    "planning",
+                )
+            )
+
+    def _load_clocks(self, queryset):
+        # La veille aussi, pour les pointages de nuit
+        for clock in queryset.filter(
+            work_date__gte=self.day - timedelta(days=1), work_date__lte=self.day
+        ):
+            self._entries[("clock", clock.pk)] = _clock_entries(clock)
+
+    def rebuild(self, now):
+        self.reset()
+        self.day = timezone.localtime(now).date()
+        self._since = now
+        self._tombstone_id = Tombstone.objects.aggregate(last=Max("id"))["last"] or 0
+        self._load_plannings(Planning.objects.filter(user__isnull=False))
+        self._load_clocks(Clock.objects.all())
+        self.refreshed_at = now
+
+    def apply_changes(self, now):
+        since, self._since = self._since - REFRESH_OVERLAP, now
+
+        plannings = Planning.objects.filter(updated_at__gt=since)
+        changed = list(plannings.values_list("id", flat=True))
+        clocks = list(Clock.objects.filter(updated_at__gt=since))
+        tombstones = list(
+            Tombstone.objects.filter(
+                id__gt=self._tombstone_id, model__in=("planning", "clock")
+            ).values_list("id", "model", "object_id")
+        )
+
+        keys = [("planning", pk) for pk in changed]
+        keys += [("clock", clock.pk) for clock in clocks]
+        keys += [(model, object_id) for _, model, object_id in tombstones]
+        for key in keys:
+            self._entries.pop(key, None)
+
+        if changed:
+            self._load_plannings(
+                Planning.objects.filter(pk__in=changed, user__isnull=False)
+            )
+        for clock in clocks:
+            if self.day - timedelta(days=1) <= clock.work_date <= self.day:
+                self._entries[("clock", clock.pk)] = _clock_entries(clock)
+        if tombstones:
+            self._tombstone_id = tombstones[-1][0]
+
+        keys += self._drop_deleted_users()
+        if keys:
+            self._invalidate()
+        self.refreshed_at = now
+
+    def _drop_deleted_users(self):
+        """
+        Retire les entrées des utilisateurs supprimés : la suppression en
+        cascade de leurs plannings et pointages ne laisse pas de tombstone.
+        """
+        user_ids = {
+            entry.user_id for entries in self._entries.values() for entry in entries
+        }
+        existing = set(
+            get_user_model()
+            .objects.filter(pk__in=user_ids)
+            .values_list("pk", flat=True)
+        )
+        removed = [
+            key
+            for key, entries in self._entries.items()
+            if any(entry.user_id not in existing for entry in entries)
+        ]
+        for key in removed:
+            del self._entries[key]
+        return removed
+
+    def refresh(self, now=None):
+        now = now or timezone.now()
+        with self._lock:
+            if self.day != timezone.localtime(now).date():
+                self.rebuild(now)
+            elif now - self.refreshed_at >= REFRESH_INTERVAL:
+                self.apply_changes(now)
+
+    # Requêtes ------------------------------------------------------------
+
+    def _segment(self, when):
+        if self._bounds is None:
+            bounds = set()
+            for entries in self._entries.values():
+                for entry in entries:
+                    bounds.add(entry.start)
+                    if entry.end is not None:
+                        bounds.add(entry.end)
+            self._bounds = sorted(bounds)
+        return bisect_right(self._bounds, when)
+
+    def at(self, when, team=None, work_mode=None):
+        """
+        Personnes présentes ou planifiées à l'instant `when`, filtrées par
+        équipe et mode de travail.
+        """
+        with self._lock:
+            key = (self._segment(when), team, work_mode)
+            if key not in self._memo:
+                self._memo[key] = self._compute(when, team, work_mode)
+            return self._memo[key]
+
+    def _compute(self, when, team, work_mode):
+        people = {}
+        for entries in self._entries.values():
+            for entry in entries:
+                if entry.start > when or (entry.end is not None and entry.end <= when):
+                    continue
+                row = people.setdefault(
+                    entry.user_id,
+                    {
+                        "user": entry.user_id,
+                        "team": None,
+                        "work_mode": None,
+                        "scheduled": False,
+                        "clocked_in": False,
+                    },
+                )
+                if entry.source == "clock":
+                    row["clocked_in"] = True
+                else:
+                    row["scheduled"] = True
+                    row["team"] = entry.team_id
+                    row["work_mode"] = entry.work_mode
+
+        rows = [
+            row
+            for _, row in sorted(people.items())
+            if (team is None or row["team"] == team)
+            and (work_mode is None or row["work_mode"] == work_mode)
+        ]
+        return {
+            "users": rows,
+            "by_team": dict(Counter(row["team"] for row in rows)),
+            "by_work_mode": dict(Counter(row["work_mode"] for row in rows)),
+        }
+
+
+on_shift_index = OnShiftIndex()
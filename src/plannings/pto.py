@@ -0,0 +1,121 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import PlanningType, PtoEntryKind, PtoLedgerEntry
+
+ZERO = Decimal("0")
+
+
+def pto_days(start, end):
+    """
+    Jours ouvrés (lundi-vendredi) couverts par un congé, en heure locale.
+    """
+    day = timezone.localtime(start).date()
+    last = timezone.localtime(end - timedelta(microseconds=1)).date()
+    days = 0
+    while day <= last:
+        if day.weekday() < 5:
+            days += 1
+        day += timedelta(days=1)
+    return Decimal(days)
+
+
+def current_balance(user_id):
+    """
+    Solde courant : la dernière ligne du registre (index (user, id)).
+    """
+    balance = (
+        PtoLedgerEntry.objects.filter(user_id=user_id)
+        .order_by("-id")
+        .values_list("balance", flat=True)
+        .first()
+    )
+    return ZERO if balance is None else balance
+
+
+@transaction.atomic
+def append_entry(user_id, kind, amount, effective_date, **fields):
+    """
+    Ajoute un mouvement et son solde. La ligne utilisateur est verrouillée
+    pour sérialiser les ajouts concurrents sur un même compteur.
+    """
+    list(
+        get_user_model()
+        .objects.select_for_update()
+        .filter(pk=user_id)
+        .values_list("pk", flat=True)
+    )
+    return PtoLedgerEntry.objects.create(
+        user_id=user_id,
+        kind=kind,
+        amount=amount,
+        balance=current_balance(user_id) + amount,
+        effective_date=effective_date,
+        **fields,
+    )
+
+
+def _consumed(planning_ids):
+    consumed = defaultdict(lambda: ZERO)
+    for row in (
+        PtoLedgerEntry.objects.filter(planning_id__in=planning_ids)
+        .values("planning_id", "user_id")
+        .annotate(total=Sum("amount"))
+    ):
+        consumed[row["planning_id"], row["user_id"]] = row["total"]
+    return consumed
+
+
+@transaction.atomic
+def sync_plannings(plannings):
+    """
+    Aligne le registre sur l'état des plannings : chaque congé consomme ses
+    jours ouvrés ; une modification ou un changement de type ajoute le
+    mouvement correctif (le registre n'est jamais réécrit).
+    """
+    consumed = _consumed([planning.pk for planning in plannings])
+
+    for planning in plannings:
+        target = {}
+        if planning.planning_type == PlanningType.PTO and planning.user_id:
+            target[planning.user_id] = -pto_days(
+                planning.start_datetime, planning.end_datetime
+            )
+
+        users = set(target) | {
+            user_id for planning_id, user_id in consumed if planning_id == planning.pk
+        }
+        for user_id in sorted(users):
+            delta = target.get(user_id, ZERO) - consumed[planning.pk, user_id]
+            if delta:
+                append_entry(
+                    user_id,
+                    PtoEntryKind.CONSUMPTION,
+                    delta,
+                    timezone.localtime(planning.start_datetime).date(),
+                    planning=planning,
+                    note=planning.title[:255],
+                )
+
+
+@transaction.atomic
+def cancel_planning(planning):
+    """
+    Recrédite les jours d'un congé supprimé.
+    """
+    for (_, user_id), total in _consumed([planning.pk]).items():
+        if total:
+            append_entry(
+                user_id,
+                PtoEntryKind.CONSUMPTION,
+                -total,
+                timezone.localtime(planning.start_datetime).date(),
+                planning=planning,
+                note=f"Annulation : {planning.title}"[:255],
+            )
@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Planning, PlanningException, Recurrence
+
+# Une occurrence récurrente dure au plus un jour (vérifié par le
+# serializer) : c'est la marge utilisée pour retrouver les occurrences qui
+# débordent sur la fenêtre.
+MAX_OCCURRENCE_DURATION = timedelta(days=1)
+
+
+@dataclass
+class Occurrence:
+    planning: Planning
+    occurrence_date: date
+    start_datetime: datetime
+    end_datetime: datetime
+    is_exception: bool = False
+
+
+def _rule(planning):
+    """
+    (première date locale, ancre, période en jours, décalages dans la période).
+    """
+    first = timezone.localtime(planning.start_datetime).date()
+    interval = max(planning.recurrence_interval, 1)
+
+    if planning.recurrence == Recurrence.WEEKLY:
+        weekdays = planning.recurrence_weekdays or [first.weekday()]
+        anchor = first - timedelta(days=first.weekday())
+        return first, anchor, 7 * interval, sorted(set(weekdays))
+
+    return first, first, interval, [0]
+
+
+def occurs_on(planning, day):
+    """
+    Vrai si la règle de `planning` produit une occurrence le jour `day`.
+    """
+    if not planning.recurrence:
+        return day == timezone.localtime(planning.start_datetime).date()
+
+    first, anchor, period, offsets = _rule(planning)
+    if day < first or (planning.recurrence_until and day > planning.recurrence_until):
+        return False
+    return (day - anchor).days % period in offsets
+
+
+def _at(planning, day):
+    """
+    Horaires de l'occurrence du jour `day` : même heure locale que la
+    première occurrence, même durée (les changements d'heure sont respectés).
+    """
+    local = timezone.localtime(planning.start_datetime)
+    start = timezone.make_aware(
+        datetime.combine(day, local.time().replace(tzinfo=None))
+    )
+    return start, start + (planning.end_datetime - planning.start_datetime)
+
+
+def iter_occurrences(planning, start, end, exceptions=None):
+    """
+    Occurrences de `planning` qui intersectent [start, end[, dans l'ordre.
+
+    On saute directement à la première période utile : le coût est
+    proportionnel au nombre d'occurrences de la fenêtre, pas à l'ancienneté
+    de la règle.
+    """
+    exceptions = exceptions or {}
+    first, anchor, period, offsets = _rule(planning)
+    duration = planning.end_datetime - planning.start_datetime
+    earliest = timezone.localtime(start - duration).date() - timedelta(days=1)
+    k = max(0, (earliest - anchor).days // period)
+
+    while True:
+        for offset in offsets:
+            day = anchor + timedelta(days=k * period + offset)
+            if day < first:
+                continue
+            if planning.recurrence_until and day > planning.recurrence_until:
+                return
+
+            occurrence_start, occurrence_end = _at(planning, day)
+            if occurrence_start >= end:
+                return
+
+            exception = exceptions.get(day)
+            if exception is not None:
+                # Les occurrences déplacées sont traitées par expand_planning.
+                continue
+            if occurrence_end > start:
+                yield Occurrence(planning, day, occurrence_start, occurrence_end)
+        k += 1
+
+
+def expand_window(queryset, start, end):
+    """
+    Plannings de `queryset` sur [start, end[, règles de récurrence dépliées
+    et exceptions appliquées. Deux requêtes, quel que soit le nombre de règles.
+    """
+    plannings = list(
+        queryset.filter(start_datetime__lt=end).filter(
+            Q(recurrence="", end_datetime__gt=start)
+            | (
+                ~Q(recurrence="")
+                & (
+                    Q(recurrence_until__isnull=True)
+                    | Q(
+                        recurrence_until__gte=timezone.localtime(
+                            start - MAX_OCCURRENCE_DURATION
+                        ).date()
+                    )
+                )
+            )
+        )
+    )
+    rules = {planning.pk: planning for planning in plannings if planning.recurrence}
+
+    exceptions = {}
+    if rules:
+        window_dates = (
+            timezone.localtime(start - MAX_OCCURRENCE_DURATION).date(),
+            timezone.localtime(end).date(),
+        )
+        for exception in PlanningException.objects.filter(
+            Q(occurrence_date__range=window_dates)
+            | Q(start_datetime__lt=end, end_datetime__gt=start),
+            planning_id__in=rules,
+        ):
+            exceptions.setdefault(exception.planning_id, {})[
+                exception.occurrence_date
+            ] = exception
+
+    occurrences = []
+    for planning in plannings:
+        occurrences.extend(
+            expand_planning(planning, start, end, exceptions.get(planning.pk, {}))
+        )
+
+    occurrences.sort(key=lambda o: (o.start_datetime, o.planning.pk))
+    return occurrences
+
+
+def expand_planning(planning, start, end, exceptions=None):
+    """
+    Occurrences d'un seul planning (éventuellement non enregistré) sur
+    [start, end[, exceptions {date: PlanningException} appliquées.
+    """
+    if not planning.recurrence:
+        if planning.start_datetime >= end or planning.end_datetime <= start:
+            return []
+        return [
+            Occurrence(
+                planning,
+                timezone.localtime(planning.start_datetime).date(),
+                planning.start_datetime,
+                planning.end_datetime,
+            )
+        ]
+
+    exceptions = exceptions or {}
+    occurrences = list(iter_occurrences(planning, start, end, exceptions))
+
+    # Occurrences déplacées : les horaires de l'exception font foi.
+    for day, exception in exceptions.items():
+        if exception.is_cancelled or not occurs_on(planning, day):
+            continue
+        default_start, default_end = _at(planning, day)
+        occurrence_start = exception.start_datetime or default_start
+        occurrence_end = exception.end_datetime or default_end
+        if occurrence_start < end and occurrence_end > start:
+            occurrences.append(
+                Occurrence(planning, day, occurrence_start, occurrence_end, True)
+            )
+
+    return occurrences
@@ -0,0 +1,419 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from permissions.constants import PermissionType
+from permissions.models import Permission
+from teams.models import TeamMembership, Teams
+
+from .models import Planning, PlanningType, WorkMode
+from .recurrence import expand_window
+
+# Une permission couvre les niveaux inférieurs : un ADMIN peut tenir un
+# créneau qui demande un APPROVE.
+GRANT_LEVELS = [
+    PermissionType.READ,
+    PermissionType.WRITE,
+    PermissionType.APPROVE,
+    PermissionType.ADMIN,
+]
+
+MAX_LOCAL_SEARCH_PASSES = 20
+
+
+@dataclass(frozen=True)
+class Requirement:
+    """
+    Besoin en personnel : `required` personnes de `start` à `end` les jours
+    `weekdays` (0 = lundi), dont au moins une détient `permission_type`.
+    """
+
+    start: time
+    end: time
+    required: int
+    weekdays: tuple = (0, 1, 2, 3, 4)
+    permission_type: str = ""
+    work_mode: str = WorkMode.ONSITE
+    title: str = "Shift"
+
+
+@dataclass(frozen=True)
+class Slot:
+    index: int
+    day: object
+    start: datetime
+    end: datetime
+    required: int
+    requirement: Requirement
+
+
+@dataclass
+class Problem:
+    """
+    Données d'une équipe, indépendantes de la base (sérialisables pour un
+    pool de processus).
+    """
+
+    team_id: int
+    users: list
+    slots: list
+    busy: dict = field(default_factory=dict)
+    # Shifts déjà posés (sous-ensemble de `busy`), soumis au repos minimal
+    worked: dict = field(default_factory=dict)
+    weekly_load: dict = field(default_factory=dict)
+    grants: dict = field(default_factory=dict)
+    max_weekly: timedelta = timedelta(hours=40)
+    min_rest: timedelta = timedelta(hours=11)
+
+
+@dataclass
+class Solution:
+    team_id: int
+    assignments: dict
+    unfilled: list
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def build_slots(requirements, date_from, date_to):
+    """
+    Instances datées des besoins sur [date_from, date_to]. Un créneau dont la
+    fin précède le début se termine le lendemain.
+    """
+    slots = []
+    day = date_from
+    while day <= date_to:
+        for requirement in requirements:
+            if day.weekday() not in requirement.weekdays:
+                continue
+            start = timezone.make_aware(datetime.combine(day, requirement.start))
+            end = timezone.make_aware(datetime.combine(day, requirement.end))
+            if end <= start:
+                end = timezone.make_aware(
+                    datetime.combine(day + timedelta(days=1), requirement.end)
+                )
+            slots.append(
+                Slot(len(slots), day, start, end, requirement.required, requirement)
+            )
+        day += timedelta(days=1)
+    return slots
+
+
+class Solver:
+    """
+    Glouton puis recherche locale.
+
+    Le glouton parcourt les créneaux dans l'ordre chronologique et affecte
+    les personnes disponibles les moins chargées (un détenteur de la
+    permission demandée d'abord). La recherche locale déplace ensuite des
+    affectations des plus chargés vers les moins chargés tant que la
+    somme des carrés des charges diminue.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.assigned = {slot.index: [] for slot in problem.slots}
+        self.days = defaultdict(dict)
+        self.load = defaultdict(timedelta)
+        self.weekly = defaultdict(timedelta, problem.weekly_load)
+
+    def holds(self, user_id, slot):
+        needed = slot.requirement.permission_type
+        if not needed:
+            return True
+        level = GRANT_LEVELS.index(needed)
+        return any(
+            GRANT_LEVELS.index(permission_type) >= level
+            and start <= slot.day
+            and (end is None or end >= slot.day)
+            for permission_type, start, end in self.problem.grants.get(user_id, ())
+        )
+
+    def available(self, user_id, slot):
+        problem = self.problem
+        days = self.days[user_id]
+        if slot.day in days:
+            return False
+
+        duration = slot.end - slot.start
+        if self.weekly[user_id, week_start(slot.day)] + duration > problem.max_weekly:
+            return False
+
+        previous = days.get(slot.day - timedelta(days=1))
+        if previous and previous.end + problem.min_rest > slot.start:
+            return False
+        following = days.get(slot.day + timedelta(days=1))
+        if following and slot.end + problem.min_rest > following.start:
+            return False
+
+        # Repos aussi vis-à-vis des shifts existants (ex. fin à 23 h la veille)
+        if any(
+            end + problem.min_rest > slot.start and slot.end + problem.min_rest > start
+            for start, end in problem.worked.get(user_id, ())
+        ):
+            return False
+
+        return not any(
+            start < slot.end and end > slot.start
+            for start, end in problem.busy.get(user_id, ())
+        )
+
+    def assign(self, user_id, slot):
+        duration = slot.end - slot.start
+        self.assigned[slot.index].append(user_id)
+        self.days[user_id][slot.day] = slot
+        self.load[user_id] += duration
+        self.weekly[user_id, week_start(slot.day)] += duration
+
+    def unassign(self, user_id, slot):
+        duration = slot.end - slot.start
+        self.assigned[slot.index].remove(user_id)
+        del self.days[user_id][slot.day]
+        self.load[user_id] -= duration
+        self.weekly[user_id, week_start(slot.day)] -= duration
+
+    def greedy(self):
+        for slot in self.problem.slots:
+            candidates = sorted(
+                (u for u in self.problem.users if self.available(u, slot)),
+                key=lambda u: (self.load[u], u),
+            )
+            if slot.requirement.permission_type:
+                holders = [u for u in candidates if self.holds(u, slot)]
+                if holders:
+                    candidates.remove(holders[0])
+                    candidates.insert(0, holders[0])
+            for user_id in candidates[: slot.required]:
+                self.assign(user_id, slot)
+
+    def improve(self):
+        for _ in range(MAX_LOCAL_SEARCH_PASSES):
+            moved = False
+            for slot in self.problem.slots:
+                duration = slot.end - slot.start
+                for user_id in sorted(
+                    self.assigned[slot.index], key=lambda u: -self.load[u]
+                ):
+                    holders = [
+                        u for u in self.assigned[slot.index] if self.holds(u, slot)
+                    ]
+                    must_hold = holders == [user_id]
+                    target = self._lighter(slot, user_id, duration, must_hold)
+                    if target is not None:
+                        self.unassign(user_id, slot)
+                        self.assign(target, slot)
+                        moved = True
+            if not moved:
+                return
+
+    def _lighter(self, slot, user_id, duration, must_hold):
+        # Déplacer d'une charge L vers une charge l diminue la somme des
+        # carrés si et seulement si l + durée < L.
+        best = None
+        for candidate in self.problem.users:
+            if self.load[candidate] + duration >= self.load[user_id]:
+                continue
+            if candidate in self.assigned[slot.index]:
+                continue
+            if must_hold and not self.holds(candidate, slot):
+                continue
+            if not self.available(candidate, slot):
+                continue
+            if best is None or self.load[candidate] < self.load[best]:
+                best = candidate
+        return best
+
+    def solve(self):
+        self.greedy()
+        self.improve()
+
+        unfilled = []
+        for slot in self.problem.slots:
+            missing = slot.required - len(self.assigned[slot.index])
+            holder_missing = bool(slot.requirement.permission_type) and not any(
+                self.holds(u, slot) for u in self.assigned[slot.index]
+            )
+            if missing > 0 or holder_missing:
+                unfilled.append(
+                    {
+                        "team": self.problem.team_id,
+                        "start_datetime": slot.start,
+                        "end_datetime": slot.end,
+                        "missing": max(missing, 0),
+                        "permission_missing": holder_missing,
+                    }
+                )
+
+        return Solution(
+            self.problem.team_id,
+            {index: list(users) for index, users in self.assigned.items() if users},
+            unfilled,
+        )
+
+
+def solve(problem):
+    return Solver(problem).solve()
+
+
+def load_problems(teams, requirements, date_from, date_to, max_weekly, min_rest):
+    """
+    Un problème par équipe, en un nombre constant de requêtes. Une personne
+    membre de plusieurs équipes n'est planifiée qu'avec la première (par id),
+    ce qui rend les équipes indépendantes.
+    """
+    teams = sorted(teams, key=lambda team: team.pk)
+    members = defaultdict(list)
+    seen = set()
+    memberships = set(
+        TeamMembership.objects.active()
+        .filter(team__in=teams, user__is_active=True)
+        .values_list("team_id", "user_id")
+    )
+    for team_id, user_id in sorted(memberships):
+        if user_id not in seen:
+            seen.add(user_id)
+            members[team_id].append(user_id)
+
+    window_start = timezone.make_aware(datetime.combine(date_from, time.min))
+    window_end = timezone.make_aware(
+        datetime.combine(date_to + timedelta(days=2), time.min)
+    )
+    slots = build_slots(requirements, date_from, date_to)
+
+    busy = defaultdict(list)
+    worked = defaultdict(list)
+    weekly_load = defaultdict(timedelta)
+    existing = defaultdict(int)
+    for occurrence in expand_window(
+        Planning.objects.filter(
+            user_id__in=seen,
+            planning_type__in=(PlanningType.SHIFT, PlanningType.PTO),
+        ),
+        window_start - timedelta(days=7),
+        window_end,
+    ):
+        planning = occurrence.planning
+        busy[planning.user_id].append(
+            (occurrence.start_datetime, occurrence.end_datetime)
+        )
+        if planning.planning_type == PlanningType.SHIFT:
+            worked[planning.user_id].append(
+                (occurrence.start_datetime, occurrence.end_datetime)
+            )
+            day = timezone.localtime(occurrence.start_datetime).date()
+            weekly_load[planning.user_id, week_start(day)] += (
+                occurrence.end_datetime - occurrence.start_datetime
+            )
+            existing[
+                planning.team_id, occurrence.start_datetime, occurrence.end_datetime
+            ] += 1
+
+    grants = defaultdict(list)
+    for user_id, permission_type, start, end in Permission.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=date_from),
+        granted_to_user_id__in=seen,
+        start_date__lte=date_to,
+    ).values_list("granted_to_user_id", "permission_type", "start_date", "end_date"):
+        grants[user_id].append((permission_type, start, end))
+
+    problems = []
+    for team in teams:
+        users = members.get(team.pk, [])
+        team_slots = []
+        for slot in slots:
+            # Les shifts déjà posés pour l'équipe comptent : relancer ne
+            # crée pas de doublons.
+            required = slot.required - existing[team.pk, slot.start, slot.end]
+            if required > 0:
+                team_slots.append(
+                    Slot(
+                        len(team_slots),
+                        slot.day,
+                        slot.start,
+                        slot.end,
+                        required,
+                        slot.requirement,
+                    )
+                )
+        problems.append(
+            Problem(
+                team.pk,
+                users,
+                team_slots,
+                busy={u: busy[u] for u in users if u in busy},
+                worked={u: worked[u] for u in users if u in worked},
+                weekly_load={k: v for k, v in weekly_load.items() if k[0] in users},
+                grants={u: grants[u] for u in users if u in grants},
+                max_weekly=max_weekly,
+                min_rest=min_rest,
+            )
+        )
+    return problems
+
+
+def schedule_shifts(
+    teams,
+    requirements,
+    date_from,
+    date_to,
+    max_weekly=timedelta(hours=40),
+    min_rest=timedelta(hours=11),
+    workers=1,
+    dry_run=False,
+):
+    """
+    Planifie les shifts des équipes sur [date_from, date_to]. Les équipes
+    sont résolues en parallèle si workers > 1, puis toutes les affectations
+    sont écrites en un seul bulk_create.
+
+    Retourne (plannings, créneaux non couverts).
+    """
+    problems = load_problems(
+        teams, requirements, date_from, date_to, max_weekly, min_rest
+    )
+
+    if workers > 1 and len(problems) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            solutions = list(pool.map(solve, problems))
+    else:
+        solutions = [solve(problem) for problem in problems]
+
+    plannings = []
+    unfilled = []
+    for problem, solution in zip(problems, solutions):
+        unfilled.extend(solution.unfilled)
+        for index, users in solution.assignments.items():
+            slot = problem.slots[index]
+            requirement = slot.requirement
+            plannings.extend(
+                Planning(
+                    title=requirement.title,
+                    start_datetime=slot.start,
+                    end_datetime=slot.end,
+                    planning_type=PlanningType.SHIFT,
+                    work_mode=requirement.work_mode,
+                    user_id=user_id,
+                    team_id=problem.team_id,
+                )
+                for user_id in users
+            )
+
+    plannings.sort(key=lambda p: (p.start_datetime, p.team_id, p.user_id))
+    if not dry_run:
+        with transaction.atomic():
+            plannings = Planning.objects.bulk_create(plannings)
+
+    return plannings, unfilled
+
+
+def teams_for(team_id=None, department_id=None):
+    if team_id is not None:
+        return list(Teams.objects.filter(pk=team_id))
+    return list(Teams.objects.filter(department_id=department_id))
@@ -1,8 +1,28 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
 
+from permissions.constants import PermissionType
 from users.constants import UserRole
 
-from .models import Planning
+from .conflicts import first_conflict
+from .copy import MAX_COPIES
+from .coverage import BUCKET_MINUTES
+from .models import (
+    Planning,
+    PlanningException,
+    PlanningType,
+    PtoEntryKind,
+    PtoLedgerEntry,
+    Recurrence,
+    WorkMode,
+)
+from .recurrence import MAX_OCCURRENCE_DURATION, occurs_on
+from .scheduler import Requirement
+
+OVERLAP_ERROR = "Ce créneau chevauche le planning « {title} »."
 
 
 class PlanningSerializer(serializers.ModelSerializer):
@@ -35,8 +55,96 @@ class PlanningSerializer(serializers.ModelSerializer):
                 }
             )
 
+        planning_type = (
+            attrs.get("planning_type")
+            or getattr(self.instance, "planning_type", None)
+            or PlanningType.SHIFT
+        )
+        self._validate_recurrence(attrs, start_dt, end_dt, planning_type)
+
+        user = attrs.get("user") or getattr(self.instance, "user", None)
+        if user and start_dt and end_dt:
+            conflict = first_conflict(
+                self._candidate(attrs, user, start_dt, end_dt, planning_type)
+            )
+            if conflict:
+                raise serializers.ValidationError(
+                    {
+                        "start_datetime": OVERLAP_ERROR.format(title=conflict.title),
+                    }
+                )
+
         return attrs
 
+    def _candidate(self, attrs, user, start_dt, end_dt, planning_type):
+        """
+        Planning tel qu'il sera enregistré (non sauvegardé), pour vérifier
+        les chevauchements de toutes ses occurrences.
+        """
+        recurrence = {
+            field: attrs.get(field, getattr(self.instance, field, default))
+            for field, default in (
+                ("recurrence", ""),
+                ("recurrence_interval", 1),
+                ("recurrence_weekdays", []),
+                ("recurrence_until", None),
+            )
+        }
+        return Planning(
+            pk=getattr(self.instance, "pk", None),
+            user=user,
+            start_datetime=start_dt,
+            end_datetime=end_dt,
+            planning_type=planning_type,
+            **recurrence,
+        )
+
+    def _validate_recurrence(self, attrs, start_dt, end_dt, planning_type):
+        recurrence = attrs.get("recurrence", getattr(self.instance, "recurrence", ""))
+        if not recurrence:
+            return
+
+        # Le registre de congés impute des jours datés : un congé se pose
+        # période par période, pas comme une règle sans fin.
+        if planning_type == PlanningType.PTO:
+            raise serializers.ValidationError(
+                {"recurrence": "Un congé (PTO) ne peut pas être récurrent."}
+            )
+
+        if start_dt and end_dt and end_dt - start_dt > MAX_OCCURRENCE_DURATION:
+            raise serializers.ValidationError(
+                {
+                    "recurrence": (
+                        "Une occurrence récurrente ne peut pas dépasser 24 heures."
+                    ),
+                }
+            )
+
+        weekdays = attrs.get(
+            "recurrence_weekdays", getattr(self.instance, "recurrence_weekdays", [])
+        )
+        if weekdays and (
+            recurrence != Recurrence.WEEKLY
+            or not isinstance(weekdays, list)
+            or any(day not in range(7) for day in weekdays)
+        ):
+            raise serializers.ValidationError(
+                {
+                    "recurrence_weekdays": (
+                        "Liste de jours 0 (lundi) à 6 (dimanche), "
+                        "uniquement pour une récurrence WEEKLY."
+                    ),
+                }
+            )
+
+        until = attrs.get(
+            "recurrence_until", getattr(self.instance, "recurrence_until", None)
+        )
+        if until and start_dt and until < start_dt.date():
+            raise serializers.ValidationError(
+                {"recurrence_until": "recurrence_until précède le début."}
+            )
+
     def validate_user(self, value):
         """
         Empêche un USER de créer/modifier un planning pour quelqu’un d’autre.
@@ -56,3 +164,413 @@ class PlanningSerializer(serializers.ModelSerializer):
             )
 
         return value
+
+
+class PlanningWindowQuerySerializer(serializers.Serializer):
+    """
+    Fenêtre de calendrier [from, to[ (au plus 366 jours).
+    """
+
+    max_window = timedelta(days=366)
+    window_required = True
+
+    def get_fields(self):
+        # `from` est un mot réservé Python : champs déclarés dynamiquement
+        fields = super().get_fields()
+        fields["from"] = serializers.DateTimeField(required=self.window_required)
+        fields["to"] = serializers.DateTimeField(required=self.window_required)
+        return fields
+
+    def validate(self, attrs):
+        if ("from" in attrs) != ("to" in attrs):
+            raise serializers.ValidationError(
+                "from et to doivent être fournis ensemble."
+            )
+
+        if "from" not in attrs:
+            return attrs
+
+        if attrs["to"] <= attrs["from"]:
+            raise serializers.ValidationError(
+                {"to": "to doit être strictement après from."}
+            )
+
+        if attrs["to"] - attrs["from"] > self.max_window:
+            raise serializers.ValidationError(
+                {"to": f"La fenêtre est limitée à {self.max_window.days} jours."}
+            )
+
+        return attrs
+
+    def get_window_filter(self):
+        """
+        Plannings qui intersectent la fenêtre (aucun filtre sans fenêtre).
+        """
+        if "from" not in self.validated_data:
+            return Q()
+
+        return Q(
+            start_datetime__lt=self.validated_data["to"],
+            end_datetime__gt=self.validated_data["from"],
+        )
+
+
+class PlanningListQuerySerializer(PlanningWindowQuerySerializer):
+    """
+    Filtres de la liste des plannings (vue calendrier).
+    """
+
+    window_required = False
+
+    team = serializers.IntegerField(required=False)
+    planning_type = serializers.ChoiceField(
+        choices=PlanningType.choices, required=False
+    )
+    work_mode = serializers.ChoiceField(choices=WorkMode.choices, required=False)
+
+    def get_filters(self):
+        return {
+            key: value
+            for key, value in self.validated_data.items()
+            if key not in ("from", "to")
+        }
+
+
+class PlanningOccurrenceQuerySerializer(PlanningListQuerySerializer):
+    """
+    Fenêtre obligatoire pour déplier les récurrences.
+    """
+
+    window_required = True
+
+
+class PlanningExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlanningException
+        fields = (
+            "id",
+            "planning",
+            "occurrence_date",
+            "is_cancelled",
+            "start_datetime",
+            "end_datetime",
+        )
+        read_only_fields = ("id", "planning")
+
+    def validate(self, attrs):
+        planning = self.context["planning"]
+
+        if not planning.recurrence:
+            raise serializers.ValidationError("Ce planning n'est pas récurrent.")
+
+        if not occurs_on(planning, attrs["occurrence_date"]):
+            raise serializers.ValidationError(
+                {"occurrence_date": "Aucune occurrence à cette date."}
+            )
+
+        start_dt = attrs.get("start_datetime")
+        end_dt = attrs.get("end_datetime")
+        if (start_dt is None) != (end_dt is None):
+            raise serializers.ValidationError(
+                "start_datetime et end_datetime doivent être fournis ensemble."
+            )
+        if start_dt and end_dt <= start_dt:
+            raise serializers.ValidationError(
+                {
+                    "end_datetime": (
+                        "end_datetime doit être strictement après start_datetime."
+                    ),
+                }
+            )
+
+        if start_dt and not attrs.get("is_cancelled") and planning.user_id:
+            # Occurrence déplacée : mêmes règles de chevauchement qu'un planning
+            # ponctuel, la règle parente exceptée (même pk)
+            conflict = first_conflict(
+                Planning(
+                    pk=planning.pk,
+                    user_id=planning.user_id,
+                    start_datetime=start_dt,
+                    end_datetime=end_dt,
+                    planning_type=planning.planning_type,
+                )
+            )
+            if conflict:
+                raise serializers.ValidationError(
+                    {
+                        "start_datetime": OVERLAP_ERROR.format(title=conflict.title),
+                    }
+                )
+
+        return attrs
+
+
+class PlanningOccurrenceSerializer(serializers.Serializer):
+    planning = serializers.IntegerField(source="planning.pk")
+    title = serializers.CharField(source="planning.title")
+    planning_type = serializers.CharField(source="planning.planning_type")
+    work_mode = serializers.CharField(source="planning.work_mode")
+    user = serializers.IntegerField(source="planning.user_id", allow_null=True)
+    team = serializers.IntegerField(source="planning.team_id", allow_null=True)
+    occurrence_date = serializers.DateField()
+    start_datetime = serializers.DateTimeField()
+    end_datetime = serializers.DateTimeField()
+    is_exception = serializers.BooleanField()
+
+
+class PlanningCopySerializer(PlanningWindowQuerySerializer):
+    """
+    Copie des plannings d'une fenêtre source vers les périodes suivantes.
+    """
+
+    team = serializers.IntegerField(required=False)
+    users = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    offset = serializers.DurationField(default=timedelta(days=7))
+    repeat = serializers.IntegerField(min_value=1, max_value=52, default=1)
+
+    def validate_offset(self, value):
+        if value <= timedelta(0):
+            raise serializers.ValidationError("offset doit être positif.")
+        return value
+
+    def get_filters(self):
+        filters = {"recurrence": ""}
+        if "team" in self.validated_data:
+            filters["team_id"] = self.validated_data["team"]
+        if "users" in self.validated_data:
+            filters["user_id__in"] = self.validated_data["users"]
+        return filters
+
+    def check_size(self, source_count):
+        if source_count * self.validated_data["repeat"] > MAX_COPIES:
+            raise serializers.ValidationError(
+                f"Au plus {MAX_COPIES} copies par opération."
+            )
+
+
+class PlanningFeedQuerySerializer(serializers.Serializer):
+    """
+    Flux iCalendar : plannings de l'utilisateur ou d'une équipe.
+    """
+
+    team = serializers.IntegerField(required=False)
+
+
+class PlanningFeedTokenSerializer(serializers.Serializer):
+    token = serializers.CharField()
+    url = serializers.URLField()
+
+
+class PlanningFreeSlotQuerySerializer(PlanningWindowQuerySerializer):
+    """
+    Recherche de créneaux libres communs (utilisateurs ou équipe).
+    """
+
+    max_window = timedelta(days=31)
+
+    users = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    team = serializers.IntegerField(required=False)
+    duration = serializers.DurationField()
+
+    def validate_duration(self, value):
+        if value <= timedelta(0):
+            raise serializers.ValidationError("duration doit être positive.")
+        return value
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        if "users" not in attrs and "team" not in attrs:
+            raise serializers.ValidationError("Indiquez des users ou une team.")
+
+        return attrs
+
+
+class FreeSlotSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+
+class CoverageQuerySerializer(PlanningWindowQuerySerializer):
+    """
+    Heatmap de présence d'une équipe ou d'un département.
+    """
+
+    max_window = timedelta(days=31)
+
+    team = serializers.IntegerField(required=False)
+    department = serializers.IntegerField(required=False)
+    bucket = serializers.ChoiceField(choices=BUCKET_MINUTES, default=30)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        if ("team" in attrs) == ("department" in attrs):
+            raise serializers.ValidationError("Indiquez une team ou un department.")
+
+        return attrs
+
+
+class CoverageSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(source="from")
+    end = serializers.DateTimeField(source="to")
+    bucket_minutes = serializers.IntegerField()
+    counts = serializers.DictField(child=serializers.ListField())
+
+
+class RequirementSerializer(serializers.Serializer):
+    """
+    Besoin en personnel d'un créneau type (voir scheduler.Requirement).
+    """
+
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+    required = serializers.IntegerField(min_value=1, max_value=1000)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        default=[0, 1, 2, 3, 4],
+        allow_empty=False,
+    )
+    permission_type = serializers.ChoiceField(
+        choices=PermissionType.choices, required=False, default=""
+    )
+    work_mode = serializers.ChoiceField(
+        choices=WorkMode.choices, default=WorkMode.ONSITE
+    )
+    title = serializers.CharField(max_length=150, default="Shift")
+
+    def validate(self, attrs):
+        if attrs["start"] == attrs["end"]:
+            raise serializers.ValidationError(
+                {"end": "end doit être différent de start."}
+            )
+        return attrs
+
+    def to_requirement(self, attrs):
+        return Requirement(
+            **{**attrs, "weekdays": tuple(sorted(set(attrs["weekdays"])))}
+        )
+
+
+class AutoScheduleSerializer(serializers.Serializer):
+    """
+    Planification automatique des shifts d'une équipe ou d'un département.
+    """
+
+    max_days = 31
+
+    team = serializers.IntegerField(required=False)
+    department = serializers.IntegerField(required=False)
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    requirements = RequirementSerializer(many=True, allow_empty=False)
+    max_weekly_hours = serializers.IntegerField(min_value=1, max_value=80, default=40)
+    min_rest_hours = serializers.IntegerField(min_value=0, max_value=24, default=11)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if ("team" in attrs) == ("department" in attrs):
+            raise serializers.ValidationError("Indiquez une team ou un department.")
+
+        if attrs["date_to"] < attrs["date_from"]:
+            raise serializers.ValidationError(
+                {"date_to": "date_to doit être postérieure à date_from."}
+            )
+
+        if (attrs["date_to"] - attrs["date_from"]).days >= self.max_days:
+            raise serializers.ValidationError(
+                {"date_to": f"La période est limitée à {self.max_days} jours."}
+            )
+
+        return attrs
+
+    def get_options(self):
+        data = self.validated_data
+        child = self.fields["requirements"].child
+        return {
+            "requirements": [
+                child.to_requirement(item) for item in data["requirements"]
+            ],
+            "date_from": data["date_from"],
+            "date_to": data["date_to"],
+            "max_weekly": timedelta(hours=data["max_weekly_hours"]),
+            "min_rest": timedelta(hours=data["min_rest_hours"]),
+            "dry_run": data["dry_run"],
+        }
+
+
+class UnfilledSlotSerializer(serializers.Serializer):
+    team = serializers.IntegerField()
+    start_datetime = serializers.DateTimeField()
+    end_datetime = serializers.DateTimeField()
+    missing = serializers.IntegerField()
+    permission_missing = serializers.BooleanField()
+
+
+class OnShiftQuerySerializer(serializers.Serializer):
+    """
+    Qui travaille à l'instant `at` (par défaut : maintenant).
+    """
+
+    at = serializers.DateTimeField(required=False)
+    team = serializers.IntegerField(required=False)
+    work_mode = serializers.ChoiceField(choices=WorkMode.choices, required=False)
+
+    def validate_at(self, value):
+        if timezone.localtime(value).date() != timezone.localdate():
+            raise serializers.ValidationError(
+                "L'index ne couvre que la journée en cours."
+            )
+        return value
+
+
+class PtoLedgerEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PtoLedgerEntry
+        fields = (
+            "id",
+            "user",
+            "kind",
+            "amount",
+            "balance",
+            "effective_date",
+            "planning",
+            "note",
+            "created_by",
+            "created_at",
+        )
+        read_only_fields = ("id", "balance", "planning", "created_by", "created_at")
+
+    def validate_kind(self, value):
+        if value == PtoEntryKind.CONSUMPTION:
+            raise serializers.ValidationError(
+                "Les consommations sont calculées à partir des congés planifiés."
+            )
+        return value
+
+    def validate(self, attrs):
+        if attrs["kind"] == PtoEntryKind.ACCRUAL and attrs["amount"] <= 0:
+            raise serializers.ValidationError(
+                {"amount": "Une acquisition doit être positive."}
+            )
+        if not attrs["amount"]:
+            raise serializers.ValidationError({"amount": "Montant nul."})
+        return attrs
+
+
+class PtoStatementQuerySerializer(serializers.Serializer):
+    """
+    Relevé annuel d'un compteur (par défaut : le sien, l'année en cours).
+    """
+
+    user = serializers.IntegerField(required=False)
+    year = serializers.IntegerField(min_value=2000, max_value=2100, required=False)
+
+
+class PtoBalanceSerializer(serializers.Serializer):
+    user = serializers.IntegerField()
+    balance = serializers.DecimalField(max_digits=8, decimal_places=2)
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Planning, PlanningType, PtoLedgerEntry
+from .pto import cancel_planning, sync_plannings
+
+
+@receiver(post_save, sender=Planning)
+def sync_pto_ledger_on_save(sender, instance, **kwargs):
+    # Un shift qui n'a jamais été un congé ne touche pas au registre
+    if (
+        instance.planning_type != PlanningType.PTO
+        and not PtoLedgerEntry.objects.filter(planning=instance).exists()
+    ):
+        return
+
+    sync_plannings([instance])
+
+
+@receiver(pre_delete, sender=Planning)
+def sync_pto_ledger_on_delete(sender, instance, origin=None, **kwargs):
+    # Suppression en cascade d'un utilisateur : son registre part avec lui
+    if isinstance(origin, get_user_model()):
+        return
+
+    # Avant la suppression : le lien planning -> registre existe encore
+    cancel_planning(instance)
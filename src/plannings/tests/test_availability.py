@@ -0,0 +1,132 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from plannings.models import Planning
+from teams.models import TeamMembership, Teams
+
+
+def _busy(user, start, end, planning_type="MEETING", **kwargs):
+    return Planning(
+        title=planning_type,
+        start_datetime=start,
+        end_datetime=end,
+        user=user,
+        planning_type=planning_type,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_free_slots_merges_busy_intervals(
+    api_client, normal_user, admin_user, django_assert_max_num_queries, aware
+):
+    Planning.objects.bulk_create(
+        [
+            _busy(normal_user, aware(2026, 3, 2, 9), aware(2026, 3, 2, 10)),
+            _busy(admin_user, aware(2026, 3, 2, 9, 30), aware(2026, 3, 2, 11)),
+            _busy(admin_user, aware(2026, 3, 2, 11, 30), aware(2026, 3, 2, 12)),
+            # Un shift n'occupe pas le créneau
+            _busy(normal_user, aware(2026, 3, 2, 8), aware(2026, 3, 2, 18), "SHIFT"),
+        ]
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    with django_assert_max_num_queries(1):
+        res = api_client.get(
+            reverse("planning-free-slots"),
+            {
+                "users": [normal_user.id, admin_user.id],
+                "from": "2026-03-02T08:00:00+01:00",
+                "to": "2026-03-02T13:00:00+01:00",
+                "duration": "00:45:00",
+            },
+        )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert [(slot["start"], slot["end"]) for slot in res.json()] == [
+        ("2026-03-02T08:00:00+01:00", "2026-03-02T09:00:00+01:00"),
+        ("2026-03-02T12:00:00+01:00", "2026-03-02T13:00:00+01:00"),
+    ]
+
+
+@pytest.mark.django_db
+def test_free_slots_for_team(api_client, normal_user, admin_user, aware):
+    team = Teams.objects.create(name="Alpha", description="", owner=admin_user)
+    TeamMembership.objects.create(team=team, user=normal_user)
+    Planning.objects.bulk_create(
+        [
+            _busy(
+                normal_user,
+                aware(2026, 3, 2, 8),
+                aware(2026, 3, 2, 9),
+                "SHIFT",
+                team=team,
+            ),
+            _busy(normal_user, aware(2026, 3, 2, 9), aware(2026, 3, 2, 12), "PTO"),
+        ]
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    res = api_client.get(
+        reverse("planning-free-slots"),
+        {
+            "team": team.id,
+            "from": "2026-03-02T08:00:00+01:00",
+            "to": "2026-03-02T13:00:00+01:00",
+            "duration": "01:00:00",
+        },
+    )
+
+    assert [slot["start"] for slot in res.json()] == [
+        "2026-03-02T08:00:00+01:00",
+        "2026-03-02T12:00:00+01:00",
+    ]
+
+
+@pytest.mark.django_db
+def test_free_slots_requires_users_or_team(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.get(
+        reverse("planning-free-slots"),
+        {
+            "from": "2026-03-02T08:00:00+01:00",
+            "to": "2026-03-02T13:00:00+01:00",
+            "duration": "01:00:00",
+        },
+    )
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_free_slots_limited_to_own_teams(
+    api_client, normal_user, admin_user, django_user_model
+):
+    teammate, outsider = (
+        django_user_model.objects.create_user(
+            email=f"{name}@test.com", password="x", first_name=name, last_name="U"
+        )
+        for name in ("teammate", "outsider")
+    )
+    team = Teams.objects.create(name="Alpha", description="", owner=teammate)
+    TeamMembership.objects.create(team=team, user=normal_user)
+    other_team = Teams.objects.create(name="Beta", description="", owner=admin_user)
+    api_client.force_authenticate(user=normal_user)
+
+    def query(**params):
+        return api_client.get(
+            reverse("planning-free-slots"),
+            {
+                "from": "2026-03-02T08:00:00+01:00",
+                "to": "2026-03-02T13:00:00+01:00",
+                "duration": "01:00:00",
+                **params,
+            },
+        ).status_code
+
+    assert query(users=[normal_user.id, teammate.id]) == status.HTTP_200_OK
+    assert query(team=team.id) == status.HTTP_200_OK
+    assert query(users=[outsider.id]) == status.HTTP_403_FORBIDDEN
+    assert query(team=other_team.id) == status.HTTP_403_FORBIDDEN
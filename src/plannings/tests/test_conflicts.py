@@ -0,0 +1,197 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from plannings.conflicts import find_conflicts
+from plannings.models import Planning
+from plannings.serializers import PlanningSerializer
+
+
+@pytest.fixture
+def shift(db, normal_user, aware):
+    return Planning.objects.create(
+        title="Morning shift",
+        start_datetime=aware(2026, 3, 2, 9),
+        end_datetime=aware(2026, 3, 2, 17),
+        user=normal_user,
+    )
+
+
+def _serializer(user, start, end, planning_type, instance=None):
+    data = {
+        "title": "New",
+        "start_datetime": start,
+        "end_datetime": end,
+        "user": user.id,
+        "planning_type": planning_type,
+        "work_mode": "ONSITE",
+    }
+    return PlanningSerializer(instance=instance, data=data)
+
+
+@pytest.mark.django_db
+def test_double_booked_shift_rejected(normal_user, shift, aware):
+    serializer = _serializer(
+        normal_user, aware(2026, 3, 2, 16), aware(2026, 3, 2, 20), "SHIFT"
+    )
+
+    assert not serializer.is_valid()
+    assert "Morning shift" in serializer.errors["start_datetime"][0]
+
+
+@pytest.mark.django_db
+def test_meeting_during_shift_allowed_but_not_pto(normal_user, shift, aware):
+    meeting = _serializer(
+        normal_user, aware(2026, 3, 2, 10), aware(2026, 3, 2, 11), "MEETING"
+    )
+    pto = _serializer(normal_user, aware(2026, 3, 2), aware(2026, 3, 3), "PTO")
+
+    assert meeting.is_valid(), meeting.errors
+    assert not pto.is_valid()
+
+
+@pytest.mark.django_db
+def test_adjacent_and_self_updates_allowed(normal_user, shift, aware):
+    adjacent = _serializer(
+        normal_user, aware(2026, 3, 2, 17), aware(2026, 3, 2, 20), "SHIFT"
+    )
+    moved = _serializer(
+        normal_user,
+        aware(2026, 3, 2, 10),
+        aware(2026, 3, 2, 18),
+        "SHIFT",
+        instance=shift,
+    )
+
+    assert adjacent.is_valid(), adjacent.errors
+    assert moved.is_valid(), moved.errors
+
+
+@pytest.mark.django_db
+def test_find_conflicts_sweep(normal_user, shift, aware):
+    overlapping = Planning.objects.bulk_create(
+        [
+            Planning(
+                title="Long shift",
+                start_datetime=aware(2026, 3, 2, 8),
+                end_datetime=aware(2026, 3, 2, 20),
+                user=normal_user,
+            ),
+            Planning(
+                title="Meeting",
+                start_datetime=aware(2026, 3, 2, 10),
+                end_datetime=aware(2026, 3, 2, 11),
+                user=normal_user,
+                planning_type="MEETING",
+            ),
+        ]
+    )
+
+    conflicts = find_conflicts(
+        Planning.objects.all(), aware(2026, 3, 1), aware(2026, 3, 8)
+    )
+
+    assert [conflict["plannings"] for conflict in conflicts] == [
+        [overlapping[0].id, shift.id]
+    ]
+    assert conflicts[0]["overlap_end"] == aware(2026, 3, 2, 17)
+
+
+@pytest.mark.django_db
+def test_conflicts_endpoint(api_client, normal_user, shift, aware):
+    Planning.objects.create(
+        title="Day off",
+        start_datetime=aware(2026, 3, 2),
+        end_datetime=aware(2026, 3, 3),
+        user=normal_user,
+        planning_type="PTO",
+    )
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.get(
+        reverse("planning-conflicts"),
+        {"from": "2026-03-01T00:00:00Z", "to": "2026-03-08T00:00:00Z"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 1
+    assert response.data[0]["types"] == ["PTO", "SHIFT"]
+
+
+@pytest.fixture
+def weekday_shift(db, normal_user, aware):
+    return Planning.objects.create(
+        title="Weekday shift",
+        start_datetime=aware(2026, 3, 2, 9),
+        end_datetime=aware(2026, 3, 2, 17),
+        user=normal_user,
+        recurrence="WEEKLY",
+        recurrence_weekdays=[0, 1, 2, 3, 4],
+    )
+
+
+@pytest.mark.django_db
+def test_pto_over_later_occurrence_of_recurring_shift_rejected(
+    normal_user, weekday_shift, aware
+):
+    pto = _serializer(normal_user, aware(2026, 3, 16), aware(2026, 3, 21), "PTO")
+
+    assert not pto.is_valid()
+    assert "Weekday shift" in pto.errors["start_datetime"][0]
+
+
+@pytest.mark.django_db
+def test_recurring_shift_checked_against_existing_pto(normal_user, aware):
+    Planning.objects.create(
+        title="Week off",
+        start_datetime=aware(2026, 3, 16),
+        end_datetime=aware(2026, 3, 21),
+        user=normal_user,
+        planning_type="PTO",
+    )
+    serializer = _serializer(
+        normal_user, aware(2026, 3, 2, 9), aware(2026, 3, 2, 17), "SHIFT"
+    )
+    serializer.initial_data["recurrence"] = "DAILY"
+
+    assert not serializer.is_valid()
+    assert "Week off" in serializer.errors["start_datetime"][0]
+
+
+@pytest.mark.django_db
+def test_conflicts_endpoint_expands_recurrences(
+    api_client, normal_user, weekday_shift, aware
+):
+    pto = Planning.objects.bulk_create(
+        [
+            Planning(
+                title="Week off",
+                start_datetime=aware(2026, 3, 16),
+                end_datetime=aware(2026, 3, 21),
+                user=normal_user,
+                planning_type="PTO",
+            )
+        ]
+    )[0]
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.get(
+        reverse("planning-conflicts"),
+        {"from": "2026-03-01T00:00:00Z", "to": "2026-04-01T00:00:00Z"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 5
+    assert {tuple(c["plannings"]) for c in response.data} == {
+        (pto.id, weekday_shift.id)
+    }
+
+
+@pytest.mark.django_db
+def test_conflicts_endpoint_requires_window(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.get(reverse("planning-conflicts"))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "from" in response.data
@@ -0,0 +1,72 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from plannings.models import Planning
+
+WINDOW = {"from": "2026-03-02T00:00:00+01:00", "to": "2026-03-09T00:00:00+01:00"}
+
+
+@pytest.fixture
+def week(db, normal_user, aware):
+    return Planning.objects.bulk_create(
+        [
+            Planning(
+                title=f"Shift {day}",
+                start_datetime=aware(2026, 3, day, 9),
+                end_datetime=aware(2026, 3, day, 17),
+                user=normal_user,
+            )
+            for day in (2, 3, 4)
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_copy_week_to_following_weeks(
+    api_client, normal_user, week, django_assert_max_num_queries, aware
+):
+    api_client.force_authenticate(user=normal_user)
+
+    with django_assert_max_num_queries(6):
+        res = api_client.post(
+            reverse("planning-copy"), {**WINDOW, "repeat": 3}, format="json"
+        )
+
+    assert res.status_code == status.HTTP_201_CREATED
+    assert len(res.json()) == 9
+    assert Planning.objects.filter(
+        start_datetime=aware(2026, 3, 23, 9), user=normal_user
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_copy_is_all_or_nothing_on_overlap(api_client, normal_user, week, aware):
+    blocking = Planning.objects.create(
+        title="Holiday",
+        start_datetime=aware(2026, 3, 10),
+        end_datetime=aware(2026, 3, 11),
+        user=normal_user,
+        planning_type="PTO",
+    )
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.post(
+        reverse("planning-copy"), {**WINDOW, "repeat": 2}, format="json"
+    )
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    conflict = res.json()["conflicts"][0]
+    assert conflict["plannings"] == [blocking.id, {"copy_of": week[1].id}]
+    assert Planning.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_copy_filters_on_users(api_client, normal_user, admin_user, week):
+    api_client.force_authenticate(user=admin_user)
+    res = api_client.post(
+        reverse("planning-copy"), {**WINDOW, "users": [admin_user.id]}, format="json"
+    )
+
+    assert res.status_code == status.HTTP_201_CREATED
+    assert res.json() == []
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from departments.models import Department
+from plannings.coverage import coverage_counts
+from plannings.models import Planning
+from teams.models import TeamMembership, Teams
+
+
+def test_coverage_counts_difference_array(aware):
+    start = aware(2026, 3, 2, 8)
+    counts = coverage_counts(
+        [
+            (aware(2026, 3, 2, 8), aware(2026, 3, 2, 10), "ONSITE"),
+            (aware(2026, 3, 2, 9, 15), aware(2026, 3, 2, 9, 45), "ONSITE"),
+            # Déborde de la fenêtre des deux côtés
+            (aware(2026, 3, 2, 7), aware(2026, 3, 2, 12), "REMOTE"),
+        ],
+        start,
+        start + timedelta(hours=3),
+        timedelta(minutes=60),
+    )
+
+    assert counts["ONSITE"] == [1, 2, 0]
+    assert counts["REMOTE"] == [1, 1, 1]
+    assert counts["HYBRID"] == [0, 0, 0]
+
+
+@pytest.mark.django_db
+def test_coverage_endpoint_for_department(
+    api_client, admin_user, normal_user, django_assert_max_num_queries, aware
+):
+    department = Department.objects.create(name="Ops", description="")
+    team = Teams.objects.create(
+        name="Alpha", description="", owner=admin_user, department=department
+    )
+    TeamMembership.objects.create(team=team, user=admin_user, role="LEAD")
+    Planning.objects.bulk_create(
+        [
+            Planning(
+                title="Shift",
+                start_datetime=aware(2026, 3, 2, 9),
+                end_datetime=aware(2026, 3, 2, 10),
+                user=normal_user,
+                team=team,
+            ),
+            Planning(
+                title="Remote shift",
+                start_datetime=aware(2026, 3, 2, 9, 30),
+                end_datetime=aware(2026, 3, 2, 11),
+                user=admin_user,
+                work_mode="REMOTE",
+            ),
+        ]
+    )
+    api_client.force_authenticate(user=admin_user)
+    params = {
+        "department": department.id,
+        "from": "2026-03-02T09:00:00+01:00",
+        "to": "2026-03-02T11:00:00+01:00",
+        "bucket": 30,
+    }
+
+    res = api_client.get(reverse("planning-coverage"), params)
+    with django_assert_max_num_queries(1):
+        cached = api_client.get(reverse("planning-coverage"), params)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["counts"]["ONSITE"] == [1, 1, 0, 0]
+    assert res.json()["counts"]["REMOTE"] == [0, 1, 1, 1]
+    assert cached.json() == res.json()
+
+
+@pytest.mark.django_db
+def test_coverage_requires_manager(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.get(reverse("planning-coverage"))
+
+    assert res.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from plannings.ics import _fold
+from plannings.models import CalendarFeedToken, Planning
+from teams.models import Teams
+
+
+@pytest.fixture
+def upcoming(db, normal_user):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=2)
+    return Planning.objects.create(
+        title="Shift, early; desk 4",
+        start_datetime=start,
+        end_datetime=start + timedelta(hours=8),
+        user=normal_user,
+    )
+
+
+@pytest.mark.django_db
+def test_ics_feed_renders_events(api_client, normal_user, upcoming):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.get(reverse("planning-ics"))
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res["Content-Type"].startswith("text/calendar")
+    body = res.content.decode()
+    assert body.startswith("BEGIN:VCALENDAR\r\n")
+    assert "SUMMARY:Shift\\, early\\; desk 4\r\n" in body
+    assert body.count("BEGIN:VEVENT") == 1
+
+
+@pytest.mark.django_db
+def test_ics_feed_conditional_get(
+    api_client, normal_user, upcoming, django_assert_max_num_queries
+):
+    api_client.force_authenticate(user=normal_user)
+    first = api_client.get(reverse("planning-ics"))
+
+    with django_assert_max_num_queries(1):
+        cached = api_client.get(
+            reverse("planning-ics"), HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+    upcoming.title = "Late shift"
+    upcoming.save()
+    changed = api_client.get(reverse("planning-ics"), HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed["ETag"] != first["ETag"]
+
+
+@pytest.mark.django_db
+def test_ics_team_feed_forbidden_for_non_member(api_client, normal_user, admin_user):
+    team = Teams.objects.create(name="Alpha", description="", owner=admin_user)
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.get(reverse("planning-ics"), {"team": team.id})
+
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_ics_feed_subscribed_with_rotatable_token(api_client, normal_user, upcoming):
+    api_client.force_authenticate(user=normal_user)
+    first = api_client.post(reverse("planning-ics-token")).data
+    second = api_client.post(reverse("planning-ics-token")).data
+    api_client.force_authenticate(user=None)
+
+    res = api_client.get(second["url"])
+    stale = api_client.get(reverse("planning-ics"), {"token": first["token"]})
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.content.decode().count("BEGIN:VEVENT") == 1
+    assert stale.status_code == status.HTTP_401_UNAUTHORIZED
+    assert CalendarFeedToken.objects.get().key_hash != second["token"]
+
+
+@pytest.mark.django_db
+def test_feed_token_only_opens_the_feed(api_client, normal_user, upcoming):
+    api_client.force_authenticate(user=normal_user)
+    token = api_client.post(reverse("planning-ics-token")).data["token"]
+    api_client.force_authenticate(user=None)
+
+    res = api_client.get(reverse("planning-list"), {"token": token})
+
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_feed_token_revoked(api_client, normal_user, upcoming):
+    api_client.force_authenticate(user=normal_user)
+    token = api_client.post(reverse("planning-ics-token")).data["token"]
+    assert (
+        api_client.delete(reverse("planning-ics-token")).status_code
+        == status.HTTP_204_NO_CONTENT
+    )
+    api_client.force_authenticate(user=None)
+
+    res = api_client.get(reverse("planning-ics"), {"token": token})
+
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_fold_long_lines():
+    folded = _fold("SUMMARY:" + "é" * 80)
+
+    assert all(len(part.encode()) <= 75 for part in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "") == "SUMMARY:" + "é" * 80
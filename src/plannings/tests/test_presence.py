@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from clocks.models import Clock
+from plannings.models import Planning
+from plannings.presence import REFRESH_INTERVAL, OnShiftIndex, on_shift_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    on_shift_index.reset()
+    yield
+    on_shift_index.reset()
+
+
+def _shift(user, now, **kwargs):
+    return Planning.objects.create(
+        title="Shift",
+        start_datetime=now - timedelta(minutes=30),
+        end_datetime=now + timedelta(minutes=30),
+        user=user,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_index_refreshes_incrementally(
+    normal_user, admin_user, django_assert_num_queries
+):
+    now = timezone.now().replace(microsecond=0)
+    if timezone.localtime(now).hour == 0:
+        now += timedelta(hours=1)
+    _shift(normal_user, now, work_mode="REMOTE")
+    index = OnShiftIndex()
+    index.refresh(now)
+
+    with django_assert_num_queries(0):
+        first = index.at(now)
+        assert index.at(now + timedelta(minutes=1)) is first
+
+    later = _shift(admin_user, now + timedelta(minutes=10))
+    Planning.objects.filter(user=normal_user).delete()
+    index.refresh(now + REFRESH_INTERVAL)
+
+    assert [row["user"] for row in first["users"]] == [normal_user.id]
+    assert first["by_work_mode"] == {"REMOTE": 1}
+    assert [row["user"] for row in index.at(later.start_datetime)["users"]] == [
+        admin_user.id
+    ]
+
+
+@pytest.mark.django_db
+def test_on_shift_endpoint_merges_clocks(api_client, admin_user, normal_user):
+    now = timezone.localtime().replace(microsecond=0)
+    if now.hour < 2:
+        pytest.skip("Pointage de la veille autour de minuit")
+    _shift(normal_user, now, team=None)
+    Clock.objects.create(
+        user=admin_user,
+        work_date=now.date(),
+        clock_in=(now - timedelta(hours=1)).time(),
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    res = api_client.get(reverse("planning-on-shift"))
+
+    assert res.status_code == status.HTTP_200_OK
+    rows = {row["user"]: row for row in res.json()["users"]}
+    assert rows[normal_user.id]["scheduled"] and not rows[normal_user.id]["clocked_in"]
+    assert rows[admin_user.id]["clocked_in"] and not rows[admin_user.id]["scheduled"]
+
+
+@pytest.mark.django_db
+def test_on_shift_rejects_other_days(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+
+    res = api_client.get(
+        reverse("planning-on-shift"),
+        {"at": (timezone.now() + timedelta(days=2)).isoformat()},
+    )
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_refresh_catches_late_commits_and_deleted_users(normal_user, admin_user):
+    now = timezone.now().replace(microsecond=0)
+    if timezone.localtime(now).hour == 0:
+        now += timedelta(hours=1)
+    _shift(admin_user, now)
+    index = OnShiftIndex()
+    index.refresh(now)
+
+    # Validé après le rafraîchissement, mais daté d'avant
+    late = _shift(normal_user, now)
+    Planning.objects.filter(pk=late.pk).update(updated_at=now - timedelta(seconds=5))
+    admin_user.delete()
+    index.refresh(now + REFRESH_INTERVAL)
+
+    assert [row["user"] for row in index.at(now)["users"]] == [normal_user.id]
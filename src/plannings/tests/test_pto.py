@@ -0,0 +1,171 @@
+from datetime import date
+from decimal import Decimal
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.urls import reverse
+from rest_framework import status
+
+from plannings.models import Planning, PtoLedgerEntry
+from plannings.pto import append_entry, current_balance, pto_days
+
+
+def test_pto_days_counts_working_days(aware):
+    # Du vendredi au mardi inclus : vendredi, lundi, mardi
+    assert pto_days(aware(2026, 3, 6), aware(2026, 3, 11)) == 3
+
+
+@pytest.mark.django_db
+def test_ledger_follows_pto_plannings(normal_user, aware):
+    append_entry(normal_user.pk, "ACCRUAL", Decimal("25"), date(2026, 1, 1))
+    pto = Planning.objects.create(
+        title="Holiday",
+        start_datetime=aware(2026, 3, 2),
+        end_datetime=aware(2026, 3, 7),
+        user=normal_user,
+        planning_type="PTO",
+    )
+    assert current_balance(normal_user.pk) == Decimal("20")
+
+    pto.end_datetime = aware(2026, 3, 4)
+    pto.save()
+    assert current_balance(normal_user.pk) == Decimal("23")
+
+    pto.delete()
+    assert current_balance(normal_user.pk) == Decimal("25")
+    assert list(
+        PtoLedgerEntry.objects.filter(user=normal_user).values_list("amount", "balance")
+    ) == [
+        (Decimal("25"), Decimal("25")),
+        (Decimal("-5"), Decimal("20")),
+        (Decimal("3"), Decimal("23")),
+        (Decimal("2"), Decimal("25")),
+    ]
+
+
+@pytest.mark.django_db
+def test_shift_saves_do_not_touch_ledger(normal_user, django_assert_num_queries, aware):
+    # Insertion + vérification d'un éventuel passé de congé
+    with django_assert_num_queries(2):
+        shift = Planning.objects.create(
+            title="Shift",
+            start_datetime=aware(2026, 3, 2, 9),
+            end_datetime=aware(2026, 3, 2, 17),
+            user=normal_user,
+        )
+
+    shift.planning_type = "PTO"
+    shift.save()
+
+    assert current_balance(normal_user.pk) == Decimal("-1")
+
+
+@pytest.mark.django_db
+def test_pto_ledger_api(api_client, admin_user, normal_user):
+    api_client.force_authenticate(user=admin_user)
+    created = api_client.post(
+        reverse("pto-ledger-list"),
+        {
+            "user": normal_user.id,
+            "kind": "ACCRUAL",
+            "amount": "2.08",
+            "effective_date": "2026-01-31",
+        },
+    )
+    consumption = api_client.post(
+        reverse("pto-ledger-list"),
+        {
+            "user": normal_user.id,
+            "kind": "CONSUMPTION",
+            "amount": "-1",
+            "effective_date": "2026-01-31",
+        },
+    )
+
+    api_client.force_authenticate(user=normal_user)
+    balance = api_client.get(reverse("pto-ledger-balance"))
+    statement = api_client.get(reverse("pto-ledger-list"), {"year": 2026})
+    other = api_client.get(reverse("pto-ledger-list"), {"user": admin_user.id})
+
+    assert created.status_code == status.HTTP_201_CREATED
+    assert created.json()["balance"] == "2.08"
+    assert consumption.status_code == status.HTTP_400_BAD_REQUEST
+    assert balance.json() == {"user": normal_user.id, "balance": "2.08"}
+    assert [entry["amount"] for entry in statement.json()] == ["2.08"]
+    assert other.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_accrual_requires_manager(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.post(
+        reverse("pto-ledger-list"),
+        {
+            "user": normal_user.id,
+            "kind": "ACCRUAL",
+            "amount": "30",
+            "effective_date": "2026-01-31",
+        },
+    )
+
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_recurring_pto_is_rejected(api_client, normal_user, aware):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.post(
+        reverse("planning-list"),
+        {
+            "title": "Every Friday off",
+            "start_datetime": aware(2026, 3, 6, 9).isoformat(),
+            "end_datetime": aware(2026, 3, 6, 17).isoformat(),
+            "user": normal_user.id,
+            "planning_type": "PTO",
+            "recurrence": "WEEKLY",
+        },
+        format="json",
+    )
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert "recurrence" in res.json()
+    assert not PtoLedgerEntry.objects.exists()
+
+
+@pytest.mark.django_db
+def test_seed_records_pre_ledger_pto_without_changing_balance(normal_user, aware):
+    append_entry(normal_user.pk, "ACCRUAL", Decimal("25"), date(2024, 1, 1))
+    # bulk_create : pas de signal, comme un congé antérieur au registre
+    (old_pto,) = Planning.objects.bulk_create(
+        [
+            Planning(
+                title="Holiday 2024",
+                start_datetime=aware(2024, 8, 5),
+                end_datetime=aware(2024, 8, 17),
+                user=normal_user,
+                planning_type="PTO",
+            )
+        ]
+    )
+
+    import_module("plannings.migrations.0012_seed_pto_ledger").seed(apps, None)
+    assert current_balance(normal_user.pk) == Decimal("25")
+
+    old_pto = Planning.objects.get(pk=old_pto.pk)
+    old_pto.description = "Summer"
+    old_pto.save()
+    assert current_balance(normal_user.pk) == Decimal("25")
+
+    old_pto.delete()
+    assert current_balance(normal_user.pk) == Decimal("35")
+    assert list(
+        PtoLedgerEntry.objects.filter(user=normal_user).values_list("kind", "amount")
+    ) == [
+        ("ACCRUAL", Decimal("25")),
+        ("ADJUSTMENT", Decimal("10")),
+        ("CONSUMPTION", Decimal("-10")),
+        ("CONSUMPTION", Decimal("10")),
+    ]
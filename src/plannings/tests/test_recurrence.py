@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from plannings.models import Planning, PlanningException, Recurrence
+from plannings.recurrence import expand_window, occurs_on
+
+
+@pytest.fixture
+def weekday_shift(db, normal_user, aware):
+    # Tous les jours ouvrés, 9h-17h, depuis le lundi 5 janvier 2026.
+    return Planning.objects.create(
+        title="Weekday shift",
+        start_datetime=aware(2026, 1, 5, 9),
+        end_datetime=aware(2026, 1, 5, 17),
+        user=normal_user,
+        recurrence=Recurrence.WEEKLY,
+        recurrence_weekdays=[0, 1, 2, 3, 4],
+    )
+
+
+@pytest.mark.django_db
+def test_expand_window_jumps_to_window(weekday_shift, aware):
+    occurrences = expand_window(
+        Planning.objects.all(), aware(2026, 3, 27), aware(2026, 4, 1)
+    )
+
+    # Vendredi 27, lundi 30, mardi 31 ; le 30 mars suit le passage à l'heure d'été.
+    assert [o.occurrence_date for o in occurrences] == [
+        date(2026, 3, 27),
+        date(2026, 3, 30),
+        date(2026, 3, 31),
+    ]
+    assert all(timezone.localtime(o.start_datetime).hour == 9 for o in occurrences)
+    assert all(
+        o.end_datetime - o.start_datetime == timedelta(hours=8) for o in occurrences
+    )
+
+
+@pytest.mark.django_db
+def test_expand_window_applies_exceptions(weekday_shift, aware):
+    PlanningException.objects.create(
+        planning=weekday_shift, occurrence_date=date(2026, 3, 30), is_cancelled=True
+    )
+    PlanningException.objects.create(
+        planning=weekday_shift,
+        occurrence_date=date(2026, 3, 31),
+        start_datetime=aware(2026, 3, 31, 13),
+        end_datetime=aware(2026, 3, 31, 20),
+    )
+
+    occurrences = expand_window(
+        Planning.objects.all(), aware(2026, 3, 30), aware(2026, 4, 1)
+    )
+
+    assert len(occurrences) == 1
+    assert occurrences[0].is_exception
+    assert occurrences[0].start_datetime == aware(2026, 3, 31, 13)
+
+
+@pytest.mark.django_db
+def test_recurrence_until_and_interval(normal_user, aware):
+    planning = Planning.objects.create(
+        title="Every other day",
+        start_datetime=aware(2026, 1, 1, 22),
+        end_datetime=aware(2026, 1, 2, 6),
+        user=normal_user,
+        recurrence=Recurrence.DAILY,
+        recurrence_interval=2,
+        recurrence_until=date(2026, 1, 7),
+    )
+
+    occurrences = expand_window(
+        Planning.objects.all(), aware(2026, 1, 2), aware(2026, 2, 1)
+    )
+
+    assert [o.occurrence_date.day for o in occurrences] == [1, 3, 5, 7]
+    assert occurs_on(planning, date(2026, 1, 5))
+    assert not occurs_on(planning, date(2026, 1, 6))
+
+
+@pytest.mark.django_db
+def test_occurrences_endpoint(api_client, normal_user, weekday_shift):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.get(
+        reverse("planning-occurrences"),
+        {"from": "2026-03-02T00:00:00+01:00", "to": "2026-03-09T00:00:00+01:00"},
+    )
+
+    assert res.status_code == status.HTTP_200_OK
+    assert len(res.json()) == 5
+    assert res.json()[0]["planning"] == weekday_shift.id
+
+
+@pytest.mark.django_db
+def test_exception_endpoint_rejects_non_occurrence(
+    api_client, normal_user, weekday_shift
+):
+    api_client.force_authenticate(user=normal_user)
+    url = reverse("planning-exceptions", args=[weekday_shift.id])
+
+    saturday = api_client.post(
+        url, {"occurrence_date": "2026-03-07", "is_cancelled": True}
+    )
+    monday = api_client.post(
+        url, {"occurrence_date": "2026-03-09", "is_cancelled": True}
+    )
+
+    assert saturday.status_code == status.HTTP_400_BAD_REQUEST
+    assert monday.status_code == status.HTTP_201_CREATED
+    assert weekday_shift.exceptions.get().is_cancelled
+
+
+@pytest.mark.django_db
+def test_moved_occurrence_is_checked_for_overlaps(
+    api_client, normal_user, weekday_shift, aware
+):
+    Planning.objects.create(
+        title="Saturday shift",
+        start_datetime=aware(2026, 3, 7, 9),
+        end_datetime=aware(2026, 3, 7, 17),
+        user=normal_user,
+    )
+    api_client.force_authenticate(user=normal_user)
+    url = reverse("planning-exceptions", args=[weekday_shift.id])
+
+    overlapping = api_client.post(
+        url,
+        {
+            "occurrence_date": "2026-03-09",
+            "start_datetime": aware(2026, 3, 7, 10).isoformat(),
+            "end_datetime": aware(2026, 3, 7, 12).isoformat(),
+        },
+    )
+    evening = api_client.post(
+        url,
+        {
+            "occurrence_date": "2026-03-09",
+            "start_datetime": aware(2026, 3, 9, 18).isoformat(),
+            "end_datetime": aware(2026, 3, 9, 20).isoformat(),
+        },
+    )
+
+    assert overlapping.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Saturday shift" in overlapping.data["start_datetime"][0]
+    assert evening.status_code == status.HTTP_201_CREATED
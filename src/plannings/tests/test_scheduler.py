@@ -0,0 +1,152 @@
+from datetime import date, time, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from permissions.models import Permission
+from plannings.models import Planning
+from plannings.scheduler import Problem, Requirement, build_slots, solve
+from teams.models import TeamMembership, Teams
+from users.constants import UserRole
+from users.models import User
+
+
+def test_solver_balances_load_and_respects_rest():
+    slots = build_slots(
+        [
+            Requirement(time(6), time(14), 1, tuple(range(7))),
+            Requirement(time(22), time(6), 1, tuple(range(7))),
+        ],
+        date(2026, 3, 2),
+        date(2026, 3, 8),
+    )
+    problem = Problem(1, [1, 2, 3, 4], slots)
+
+    solution = solve(problem)
+
+    assert solution.unfilled == []
+    per_user = {}
+    for index, users in solution.assignments.items():
+        for user_id in users:
+            per_user.setdefault(user_id, []).append(slots[index])
+    assert sorted(len(shifts) for shifts in per_user.values()) == [3, 3, 4, 4]
+    for shifts in per_user.values():
+        shifts.sort(key=lambda slot: slot.start)
+        for previous, following in zip(shifts, shifts[1:]):
+            assert following.start - previous.end >= timedelta(hours=11)
+
+
+def test_solver_keeps_rest_after_existing_shift(aware):
+    slots = build_slots(
+        [Requirement(time(6), time(14), 1, (1,))],
+        date(2026, 3, 3),
+        date(2026, 3, 3),
+    )
+    late = (aware(2026, 3, 2, 15), aware(2026, 3, 2, 23))
+    problem = Problem(1, [1, 2], slots, busy={1: [late]}, worked={1: [late]})
+
+    solution = solve(problem)
+
+    assert solution.assignments == {0: [2]}
+
+
+def test_solver_requires_permission_holder():
+    slots = build_slots(
+        [Requirement(time(9), time(17), 2, (0,), "APPROVE")],
+        date(2026, 3, 2),
+        date(2026, 3, 2),
+    )
+    problem = Problem(
+        1,
+        [1, 2, 3],
+        slots,
+        grants={3: [("ADMIN", date(2026, 1, 1), None)]},
+    )
+
+    solution = solve(problem)
+
+    assert 3 in solution.assignments[0]
+    assert solution.unfilled == []
+
+
+@pytest.fixture
+def staffed_team(db, admin_user):
+    team = Teams.objects.create(name="Desk", description="", owner=admin_user)
+    users = [
+        User.objects.create_user(
+            email=f"agent{i}@test.com",
+            password="password",
+            first_name="Agent",
+            last_name=str(i),
+            role=UserRole.USER,
+        )
+        for i in range(3)
+    ]
+    TeamMembership.objects.bulk_create(
+        [TeamMembership(team=team, user=user) for user in users]
+    )
+    return team, users
+
+
+@pytest.mark.django_db
+def test_auto_schedule_skips_pto_and_writes_once(
+    api_client, admin_user, staffed_team, django_assert_max_num_queries, aware
+):
+    team, users = staffed_team
+    Planning.objects.create(
+        title="Holiday",
+        start_datetime=aware(2026, 3, 2),
+        end_datetime=aware(2026, 3, 7),
+        user=users[0],
+        planning_type="PTO",
+    )
+    Permission.objects.create(
+        permission_type="APPROVE",
+        start_date=date(2026, 1, 1),
+        granted_by_user=admin_user,
+        granted_to_user=users[1],
+    )
+    api_client.force_authenticate(user=admin_user)
+    payload = {
+        "team": team.id,
+        "date_from": "2026-03-02",
+        "date_to": "2026-03-06",
+        "requirements": [
+            {
+                "start": "09:00",
+                "end": "17:00",
+                "required": 2,
+                "permission_type": "APPROVE",
+            }
+        ],
+    }
+
+    with django_assert_max_num_queries(10):
+        res = api_client.post(reverse("planning-auto-schedule"), payload, format="json")
+
+    assert res.status_code == status.HTTP_201_CREATED
+    assert res.json()["created"] == 10
+    assert res.json()["unfilled"] == []
+    shifts = Planning.objects.filter(team=team, planning_type="SHIFT")
+    assert not shifts.filter(user=users[0]).exists()
+    assert shifts.filter(user=users[1]).count() == 5
+
+    # Relancer ne crée rien : les shifts existants couvrent les besoins
+    again = api_client.post(reverse("planning-auto-schedule"), payload, format="json")
+    assert again.json()["created"] == 0
+
+
+@pytest.mark.django_db
+def test_schedule_shifts_command_dry_run(staffed_team, tmp_path):
+    team, _ = staffed_team
+    payload = tmp_path / "needs.json"
+    payload.write_text(
+        '{"team": %d, "date_from": "2026-03-02", "date_to": "2026-03-03", '
+        '"requirements": [{"start": "08:00", "end": "12:00", "required": 5}]}' % team.id
+    )
+
+    call_command("schedule_shifts", str(payload), "--dry-run")
+
+    assert not Planning.objects.filter(planning_type="SHIFT").exists()
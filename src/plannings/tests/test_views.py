@@ -1,11 +1,13 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 import pytest
+from django.db import IntegrityError
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
 from plannings.models import Planning
+from plannings.serializers import PlanningSerializer
 
 
 @pytest.mark.django_db
@@ -24,7 +26,7 @@ def test_list_plannings_authenticated_only_own(
     assert res.status_code == status.HTTP_200_OK
 
     # normal_user doit voir uniquement ses plannings
-    ids = [p["id"] for p in res.json()]
+    ids = [p["id"] for p in res.json()["results"]]
     assert planning_owned_by_normal_user.id in ids
     assert planning_owned_by_admin.id not in ids
 
@@ -49,6 +51,32 @@ def test_create_planning_user_creates_for_self(api_client, normal_user):
     assert Planning.objects.filter(title="Created by user", user=normal_user).exists()
 
 
+@pytest.mark.django_db
+def test_create_planning_concurrent_overlap_is_a_conflict(
+    api_client, normal_user, monkeypatch
+):
+    def rejected_by_constraint(self, validated_data):
+        raise IntegrityError("planning_no_overlap")
+
+    # Simule la contrainte d'exclusion PostgreSQL après la vérification
+    monkeypatch.setattr(PlanningSerializer, "create", rejected_by_constraint)
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.post(
+        reverse("planning-list"),
+        data={
+            "title": "Concurrent",
+            "start_datetime": timezone.now().isoformat(),
+            "end_datetime": (timezone.now() + timedelta(hours=1)).isoformat(),
+            "user": normal_user.id,
+        },
+        format="json",
+    )
+
+    assert res.status_code == status.HTTP_409_CONFLICT
+    assert not Planning.objects.exists()
+
+
 @pytest.mark.django_db
 def test_create_planning_user_cannot_create_for_other(
     api_client, normal_user, admin_user
@@ -102,3 +130,77 @@ def test_invalid_dates_rejected(api_client, normal_user):
         format="json",
     )
     assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_plannings_calendar_window(api_client, admin_user):
+    start = timezone.make_aware(datetime(2026, 3, 2, 9))
+    inside, overnight, outside = Planning.objects.bulk_create(
+        [
+            Planning(
+                title="Inside",
+                start_datetime=start,
+                end_datetime=start + timedelta(hours=8),
+                user=admin_user,
+                work_mode="REMOTE",
+            ),
+            Planning(
+                title="Overnight",
+                start_datetime=start - timedelta(hours=12),
+                end_datetime=start - timedelta(hours=4),
+                user=admin_user,
+            ),
+            Planning(
+                title="Next week",
+                start_datetime=start + timedelta(days=7),
+                end_datetime=start + timedelta(days=7, hours=8),
+                user=admin_user,
+            ),
+        ]
+    )
+    api_client.force_authenticate(user=admin_user)
+    window = {"from": "2026-03-02T00:00:00+01:00", "to": "2026-03-09T00:00:00+01:00"}
+
+    res = api_client.get(reverse("planning-list"), window)
+    remote = api_client.get(reverse("planning-list"), {**window, "work_mode": "REMOTE"})
+
+    assert res.status_code == status.HTTP_200_OK
+    assert [p["id"] for p in res.json()["results"]] == [inside.id, overnight.id]
+    assert [p["id"] for p in remote.json()["results"]] == [inside.id]
+
+
+@pytest.mark.django_db
+def test_list_plannings_window_needs_both_bounds(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    res = api_client.get(reverse("planning-list"), {"from": "2026-03-02T00:00:00Z"})
+
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_plannings_cursor_pagination(api_client, admin_user):
+    start = timezone.make_aware(datetime(2026, 3, 2, 9))
+    plannings = Planning.objects.bulk_create(
+        [
+            Planning(
+                title=f"Shift {i}",
+                start_datetime=start + timedelta(days=i // 2),
+                end_datetime=start + timedelta(days=i // 2, hours=1),
+                user=admin_user,
+                planning_type="MEETING",
+            )
+            for i in range(5)
+        ]
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    seen = []
+    url = reverse("planning-list") + "?page_size=2"
+    while url:
+        page = api_client.get(url).json()
+        seen += [p["id"] for p in page["results"]]
+        url = page["next"]
+
+    expected = sorted(plannings, key=lambda p: (p.start_datetime, p.id), reverse=True)
+    assert seen == [p.id for p in expected]
@@ -1,8 +1,9 @@
 from rest_framework.routers import DefaultRouter
 
-from .views import PlanningViewSet
+from .views import PlanningViewSet, PtoLedgerViewSet
 
 router = DefaultRouter()
 router.register("plannings", PlanningViewSet, basename="planning")
+router.register("pto-ledger", PtoLedgerViewSet, basename="pto-ledger")
 
 urlpatterns = router.urls
@@ -1,16 +1,78 @@
+from urllib.parse import urlencode
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.mixins import CreateModelMixin, ListModelMixin
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from primeBank.exceptions import ConcurrentWriteConflict
+from teams.membership import check_team_access, check_users_access, member_ids_query
+from teams.models import Teams
+from teams.schedule import department_plannings, team_plannings
 from users.constants import UserRole
+from users.permissions import IsManagerOrAdmin, is_manager_or_admin
 
-from .models import Planning
+from .authentication import FeedTokenAuthentication
+from .availability import free_slots
+from .conflicts import find_conflicts
+from .copy import copy_plannings
+from .coverage import coverage
+from .ics import feed_validators, feed_window, render_calendar, rotate_feed_token
+from .models import CalendarFeedToken, Planning, PlanningException, PtoLedgerEntry
+from .pagination import PlanningPagination
 from .permissions import IsAdminOrOwner
-from .serializers import PlanningSerializer
+from .presence import on_shift_index
+from .pto import append_entry, current_balance
+from .recurrence import expand_window
+from .scheduler import schedule_shifts, teams_for
+from .serializers import (
+    AutoScheduleSerializer,
+    CoverageQuerySerializer,
+    CoverageSerializer,
+    FreeSlotSerializer,
+    OnShiftQuerySerializer,
+    PlanningCopySerializer,
+    PlanningExceptionSerializer,
+    PlanningFeedQuerySerializer,
+    PlanningFeedTokenSerializer,
+    PlanningFreeSlotQuerySerializer,
+    PlanningListQuerySerializer,
+    PlanningOccurrenceQuerySerializer,
+    PlanningOccurrenceSerializer,
+    PlanningSerializer,
+    PlanningWindowQuerySerializer,
+    PtoBalanceSerializer,
+    PtoLedgerEntrySerializer,
+    PtoStatementQuerySerializer,
+    UnfilledSlotSerializer,
+)
 
 
 @extend_schema_view(
-    list=extend_schema(summary="List plannings"),
+    list=extend_schema(
+        summary="List plannings",
+        description=(
+            "Optionally restricted to the plannings intersecting a from/to "
+            "calendar window, and filtered by team, planning_type and work_mode. "
+            "Recurring plannings are returned once, as their rule; use "
+            "/occurrences/ for the expanded calendar. Cursor-paginated on "
+            "(start_datetime, id), most recent first."
+        ),
+        parameters=[PlanningListQuerySerializer],
+    ),
     retrieve=extend_schema(summary="Retrieve a planning"),
     create=extend_schema(summary="Create a planning"),
     update=extend_schema(summary="Update a planning"),
@@ -21,9 +83,442 @@ class PlanningViewSet(ModelViewSet):
     queryset = Planning.objects.all()
     serializer_class = PlanningSerializer
     permission_classes = [IsAuthenticated, IsAdminOrOwner]
+    pagination_class = PlanningPagination
 
     def get_queryset(self):
         user = self.request.user
         if getattr(user, "role", None) == UserRole.ADMIN:
-            return Planning.objects.all()
-        return Planning.objects.filter(user=user)
+            queryset = Planning.objects.all()
+        else:
+            queryset = Planning.objects.filter(user=user)
+
+        if self.action == "list":
+            params = PlanningListQuerySerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            queryset = queryset.filter(
+                params.get_window_filter(), **params.get_filters()
+            )
+
+        return queryset
+
+    # Écriture du planning et mouvements du registre de congés (signaux)
+    # dans la même transaction.
+    def perform_create(self, serializer):
+        self._save(serializer)
+
+    def perform_update(self, serializer):
+        self._save(serializer)
+
+    def _save(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            # Contrainte d'exclusion PostgreSQL : écriture concurrente
+            raise ConcurrentWriteConflict()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+    @extend_schema(
+        summary="List overlapping plannings",
+        description=(
+            "Pairs of incompatible plannings (double-booked shifts, anything "
+            "overlapping a PTO...) intersecting the from/to window, recurring "
+            "plannings expanded to their occurrences."
+        ),
+        parameters=[PlanningWindowQuerySerializer],
+    )
+    @action(detail=False, methods=["get"], url_path="conflicts")
+    def conflicts(self, request):
+        params = PlanningWindowQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        return Response(
+            find_conflicts(
+                self.get_queryset(),
+                params.validated_data["from"],
+                params.validated_data["to"],
+            )
+        )
+
+    @extend_schema(
+        summary="List planning occurrences",
+        description=(
+            "Calendar view of the from/to window: recurring plannings are "
+            "expanded into their occurrences, with cancelled or moved "
+            "occurrences applied."
+        ),
+        parameters=[PlanningOccurrenceQuerySerializer],
+        responses=PlanningOccurrenceSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], url_path="occurrences")
+    def occurrences(self, request):
+        params = PlanningOccurrenceQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        occurrences = expand_window(
+            self.get_queryset().filter(**params.get_filters()),
+            params.validated_data["from"],
+            params.validated_data["to"],
+        )
+        return Response(PlanningOccurrenceSerializer(occurrences, many=True).data)
+
+    @extend_schema(
+        summary="Cancel or move one occurrence",
+        description=(
+            "Creates or replaces the exception of a recurring planning for "
+            "the given occurrence_date."
+        ),
+        request=PlanningExceptionSerializer,
+        responses=PlanningExceptionSerializer,
+    )
+    @action(detail=True, methods=["post"], url_path="exceptions")
+    def exceptions(self, request, pk=None):
+        planning = self.get_object()
+        serializer = PlanningExceptionSerializer(
+            data=request.data, context={"planning": planning}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        data = dict(serializer.validated_data)
+        exception, created = PlanningException.objects.update_or_create(
+            planning=planning,
+            occurrence_date=data.pop("occurrence_date"),
+            defaults={
+                "is_cancelled": data.get("is_cancelled", False),
+                "start_datetime": data.get("start_datetime"),
+                "end_datetime": data.get("end_datetime"),
+            },
+        )
+        # Invalide les ETag des flux et remonte dans la synchronisation delta
+        Planning.objects.filter(pk=planning.pk).update(updated_at=timezone.now())
+
+        return Response(
+            PlanningExceptionSerializer(exception).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        summary="Copy plannings to following periods",
+        description=(
+            "Copies every one-off planning of the from/to window (optionally "
+            "restricted to a team or a set of users) `repeat` times, shifted by "
+            "`offset` each time (one week by default). All or nothing: on any "
+            "overlap nothing is created and the conflicts are returned."
+        ),
+        request=PlanningCopySerializer,
+        responses=PlanningSerializer(many=True),
+    )
+    @action(detail=False, methods=["post"], url_path="copy")
+    def copy(self, request):
+        params = PlanningCopySerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        source = list(
+            self.get_queryset()
+            .filter(params.get_window_filter(), **params.get_filters())
+            .order_by("start_datetime", "id")
+        )
+        params.check_size(len(source))
+
+        try:
+            created, conflicts = copy_plannings(
+                source,
+                params.validated_data["offset"],
+                params.validated_data["repeat"],
+            )
+        except IntegrityError:
+            # Contrainte d'exclusion PostgreSQL : écriture concurrente
+            raise ConcurrentWriteConflict()
+
+        if conflicts:
+            return Response(
+                {"conflicts": conflicts}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            PlanningSerializer(created, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        summary="iCalendar feed",
+        description=(
+            "Plannings of the current user (or of a team with ?team=) from 30 "
+            "days ago to 180 days ahead, as text/calendar. Calendar apps "
+            "authenticate with ?token= (see /ics-token/); a bearer token is "
+            "accepted too. Supports conditional GET: If-None-Match / "
+            "If-Modified-Since return 304 when nothing changed."
+        ),
+        parameters=[PlanningFeedQuerySerializer],
+        responses={(200, "text/calendar"): str},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="ics",
+        authentication_classes=[
+            *api_settings.DEFAULT_AUTHENTICATION_CLASSES,
+            FeedTokenAuthentication,
+        ],
+    )
+    def ics(self, request):
+        params = PlanningFeedQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        if "team" in params.validated_data:
+            team = get_object_or_404(Teams, pk=params.validated_data["team"])
+            check_team_access(team, request)
+            queryset, scope, name = team_plannings(team), f"team:{team.pk}", team.name
+        else:
+            user = request.user
+            queryset = Planning.objects.filter(user=user)
+            scope, name = f"user:{user.pk}", f"{user.first_name} {user.last_name}"
+
+        start, end = feed_window()
+        etag, last_modified = feed_validators(queryset, scope, start)
+        headers = {
+            "ETag": quote_etag(etag),
+            "Last-Modified": http_date(last_modified.timestamp()),
+            "Cache-Control": "private, no-cache",
+        }
+
+        not_modified = get_conditional_response(
+            request, etag=quote_etag(etag), last_modified=int(last_modified.timestamp())
+        )
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+            return not_modified
+
+        return HttpResponse(
+            render_calendar(queryset, name.strip(), start, end),
+            content_type="text/calendar; charset=utf-8",
+            headers=headers,
+        )
+
+    @extend_schema(
+        summary="Rotate or revoke the iCalendar feed token",
+        description=(
+            "POST issues a new secret feed token for the current user and "
+            "returns the subscription URL; the previous token stops working. "
+            "The token is shown only once. DELETE revokes it."
+        ),
+        request=None,
+        responses={201: PlanningFeedTokenSerializer, 204: None},
+    )
+    @action(detail=False, methods=["post", "delete"], url_path="ics-token")
+    def ics_token(self, request):
+        if request.method == "DELETE":
+            CalendarFeedToken.objects.filter(user=request.user).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        token = rotate_feed_token(request.user)
+        url = request.build_absolute_uri(reverse("planning-ics"))
+        return Response(
+            PlanningFeedTokenSerializer(
+                {"token": token, "url": f"{url}?{urlencode({'token': token})}"}
+            ).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        summary="Find common free slots",
+        description=(
+            "Free slots of at least `duration` in the from/to window (31 days "
+            "max) where none of the given users, or none of the team members, "
+            "has a meeting or a PTO. Users other than ADMIN/MANAGER may only "
+            "query themselves, their teammates and their own teams."
+        ),
+        parameters=[PlanningFreeSlotQuerySerializer],
+        responses=FreeSlotSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], url_path="free-slots")
+    def free_slots(self, request):
+        params = PlanningFreeSlotQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        check_users_access(data.get("users", []), request)
+        users = Q(user_id__in=data.get("users", []))
+        if "team" in data:
+            team = get_object_or_404(Teams, pk=data["team"])
+            check_team_access(team, request)
+            users |= Q(user_id__in=member_ids_query(team))
+
+        slots = free_slots(
+            Planning.objects.filter(users), data["from"], data["to"], data["duration"]
+        )
+        return Response(FreeSlotSerializer(slots, many=True).data)
+
+    @extend_schema(
+        summary="Staffing coverage heatmap",
+        description=(
+            "Number of people on shift per 15/30/60-minute bucket and per work "
+            "mode, for a team or a department over the from/to window (31 days "
+            "max). counts[mode][i] covers from + i * bucket. Cached per window "
+            "until a planning changes."
+        ),
+        parameters=[CoverageQuerySerializer],
+        responses=CoverageSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="coverage",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def coverage(self, request):
+        params = CoverageQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        if "team" in data:
+            team = get_object_or_404(Teams, pk=data["team"])
+            queryset, scope = team_plannings(team), f"team:{team.pk}"
+        else:
+            queryset = department_plannings(data["department"])
+            scope = f"department:{data['department']}"
+
+        result = coverage(queryset, scope, data["from"], data["to"], data["bucket"])
+        return Response(
+            CoverageSerializer({**result, "from": data["from"], "to": data["to"]}).data
+        )
+
+    @extend_schema(
+        summary="Automatically schedule shifts",
+        description=(
+            "Generates the SHIFT plannings of a team or of every team of a "
+            "department from staffing requirements, skipping PTOs and existing "
+            "shifts and honouring permission grants, weekly hours and rest time. "
+            "With dry_run nothing is written. Large departments should use the "
+            "schedule_shifts management command (process pool)."
+        ),
+        request=AutoScheduleSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="auto-schedule",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def auto_schedule(self, request):
+        params = AutoScheduleSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        options = params.get_options()
+
+        teams = teams_for(
+            params.validated_data.get("team"), params.validated_data.get("department")
+        )
+        try:
+            plannings, unfilled = schedule_shifts(teams, **options)
+        except IntegrityError:
+            raise ConcurrentWriteConflict()
+
+        return Response(
+            {
+                "created": 0 if options["dry_run"] else len(plannings),
+                "plannings": PlanningSerializer(plannings, many=True).data,
+                "unfilled": UnfilledSlotSerializer(unfilled, many=True).data,
+            },
+            status=(
+                status.HTTP_200_OK if options["dry_run"] else status.HTTP_201_CREATED
+            ),
+        )
+
+    @extend_schema(
+        summary="Who is on shift now",
+        description=(
+            "People scheduled on a shift or clocked in at `at` (default: now, "
+            "today only), optionally filtered by team and work_mode. Answered "
+            "from a per-worker in-memory index refreshed every 30 seconds."
+        ),
+        parameters=[OnShiftQuerySerializer],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="on-shift",
+        permission_classes=[IsManagerOrAdmin],
+    )
+    def on_shift(self, request):
+        params = OnShiftQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        now = timezone.now()
+        on_shift_index.refresh(now)
+        return Response(
+            on_shift_index.at(
+                data.get("at", now), data.get("team"), data.get("work_mode")
+            )
+        )
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="PTO statement",
+        description=(
+            "Ledger entries of one user (default: yourself) for a year "
+            "(default: current year), in recording order. Only ADMIN/MANAGER "
+            "may read someone else's ledger."
+        ),
+        parameters=[PtoStatementQuerySerializer],
+    ),
+    create=extend_schema(
+        summary="Record a PTO accrual or adjustment",
+        description="Consumption entries are derived from PTO plannings.",
+    ),
+)
+class PtoLedgerViewSet(CreateModelMixin, ListModelMixin, GenericViewSet):
+    queryset = PtoLedgerEntry.objects.all()
+    serializer_class = PtoLedgerEntrySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_permissions(self):
+        if self.action == "create":
+            return [IsManagerOrAdmin()]
+        return super().get_permissions()
+
+    def _target_user(self, params):
+        user_id = params.validated_data.get("user", self.request.user.pk)
+        if user_id != self.request.user.pk and not is_manager_or_admin(
+            self.request.user
+        ):
+            raise PermissionDenied("Vous ne pouvez consulter que votre compteur.")
+        return user_id
+
+    def get_queryset(self):
+        params = PtoStatementQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        year = params.validated_data.get("year", timezone.localdate().year)
+
+        # Plage sur l'index (user, effective_date)
+        return PtoLedgerEntry.objects.filter(
+            user_id=self._target_user(params), effective_date__year=year
+        ).order_by("id")
+
+    def perform_create(self, serializer):
+        data = dict(serializer.validated_data)
+        serializer.instance = append_entry(
+            data.pop("user").pk, created_by=self.request.user, **data
+        )
+
+    @extend_schema(
+        summary="Current PTO balance",
+        parameters=[PtoStatementQuerySerializer],
+        responses=PtoBalanceSerializer,
+    )
+    @action(detail=False, methods=["get"], url_path="balance")
+    def balance(self, request):
+        params = PtoStatementQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        user_id = self._target_user(params)
+
+        return Response(
+            PtoBalanceSerializer(
+                {"user": user_id, "balance": current_balance(user_id)}
+            ).data
+        )
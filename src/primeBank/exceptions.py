@@ -0,0 +1,15 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+CONCURRENT_WRITE_ERROR = "Conflit d'écriture concurrente, veuillez réessayer."
+
+
+class ConcurrentWriteConflict(APIException):
+    """
+    Écriture refusée par une contrainte de la base à cause d'une écriture
+    concurrente : le client peut réessayer.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = CONCURRENT_WRITE_ERROR
+    default_code = "conflict"
@@ -0,0 +1,120 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur (keyset) sur le couple (ordering_field, id).
+
+    Chaque page est une simple plage d'index : la page suivante filtre sur
+    la dernière clé vue au lieu d'un OFFSET, son coût ne dépend donc pas
+    de la profondeur.
+    """
+
+    ordering_field = None
+    descending = True
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Curseur invalide."
+
+    def get_ordering(self):
+        prefix = "-" if self.descending else ""
+        return [f"{prefix}{self.ordering_field}", f"{prefix}id"]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, instance):
+        value = getattr(instance, self.ordering_field)
+        position = json.dumps([value.isoformat(), instance.pk])
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(value, str) or not isinstance(pk, int):
+            raise NotFound(self.invalid_cursor_message)
+
+        return value, pk
+
+    def get_after_filter(self, cursor):
+        value, pk = cursor
+        lookup = "lt" if self.descending else "gt"
+        return Q(**{f"{self.ordering_field}__{lookup}": value}) | Q(
+            **{self.ordering_field: value, f"id__{lookup}": pk}
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.get_ordering())
+        cursor = self.decode_cursor(request)
+        if cursor:
+            queryset = queryset.filter(self.get_after_filter(cursor))
+
+        page = list(queryset[: page_size + 1])
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Curseur de la page suivante.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Taille de page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
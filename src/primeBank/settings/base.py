@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     "departments",
     "clocks",
     "teams",
+    "sync",
 ]
 
 # =============================================================================
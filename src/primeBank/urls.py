@@ -31,5 +31,6 @@ urlpatterns = [
     path("api/", include("clocks.urls")),
     path("api/", include("plannings.urls")),
     path("api/", include("permissions.urls")),
+    path("api/", include("sync.urls")),
     path("api/teams/", include("teams.urls")),
 ]
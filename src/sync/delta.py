@@ -0,0 +1,154 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+from clocks.models import Clock
+from plannings.models import Planning
+
+from .models import Tombstone
+
+PAGE_SIZE = 500
+
+STREAMS = {
+    "clocks": Clock,
+    "plannings": Planning,
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    data = {
+        name: (
+            None
+            if position[name] is None
+            else [
+                position[name][0].isoformat(),
+                position[name][1],
+            ]
+        )
+        for name in STREAMS
+    }
+    data["deleted"] = position["deleted"]
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _decode_key(key):
+    """
+    Clé (updated_at, id) d'un flux : None ou [datetime ISO avec fuseau, id].
+    """
+    if key is None:
+        return None
+
+    if not isinstance(key, list) or len(key) != 2:
+        raise ValueError(key)
+
+    updated_at, pk = key
+    if not isinstance(updated_at, str) or not _is_id(pk):
+        raise ValueError(key)
+
+    updated_at = datetime.fromisoformat(updated_at)
+    if updated_at.tzinfo is None:
+        raise ValueError(key)
+
+    return updated_at, pk
+
+
+def decode_cursor(encoded):
+    """
+    Position initiale si aucun curseur : tout est à synchroniser. Un curseur
+    illisible ou altéré lève InvalidCursor.
+    """
+    if not encoded:
+        return {"clocks": None, "plannings": None, "deleted": 0}
+
+    try:
+        position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(encoded)
+
+    if not isinstance(position, dict) or set(position) != {*STREAMS, "deleted"}:
+        raise InvalidCursor(encoded)
+
+    if not _is_id(position["deleted"]):
+        raise InvalidCursor(encoded)
+
+    try:
+        for name in STREAMS:
+            position[name] = _decode_key(position[name])
+    except ValueError:
+        raise InvalidCursor(encoded)
+
+    return position
+
+
+def _after(key):
+    """
+    Lignes modifiées strictement après la clé (updated_at, id).
+    """
+    if key is None:
+        return Q()
+
+    updated_at, pk = key
+    return Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)
+
+
+def _changes(user, position):
+    querysets = {
+        name: model.objects.filter(user=user)
+        .filter(_after(position[name]))
+        .order_by("updated_at", "id")
+        for name, model in STREAMS.items()
+    }
+    querysets["deleted"] = Tombstone.objects.filter(
+        user=user, id__gt=position["deleted"]
+    ).order_by("id")
+    return querysets
+
+
+def has_changes(user, position):
+    """
+    Une seule requête (UNION ALL des trois flux) pour le cas courant où
+    rien n'a changé depuis le curseur.
+    """
+    first, *others = (
+        queryset.values_list("id").order_by()
+        for queryset in _changes(user, position).values()
+    )
+    return first.union(*others, all=True).exists()
+
+
+def collect_changes(user, position, page_size=PAGE_SIZE):
+    """
+    Lignes modifiées et suppressions depuis `position`, au plus `page_size`
+    par flux. Renvoie (lignes par flux, nouvelle position, reste-t-il des
+    changements).
+    """
+    querysets = _changes(user, position)
+    position = dict(position)
+    changes = {}
+    has_more = False
+
+    for name, queryset in querysets.items():
+        rows = list(queryset[: page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            has_more = True
+
+        if rows and name == "deleted":
+            position[name] = rows[-1].id
+        elif rows:
+            position[name] = (rows[-1].updated_at, rows[-1].id)
+
+        changes[name] = rows
+
+    return changes, position, has_more
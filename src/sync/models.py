@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    Trace d'une suppression, pour que la synchronisation incrémentale
+    propage les lignes supprimées aux clients mobiles.
+    """
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="tombstones",
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "sync_tombstone"
+        indexes = [
+            models.Index(fields=["user", "id"], name="tombstone_user_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model}#{self.object_id}"
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clocks.archive import is_archiving
+from clocks.models import Clock
+from plannings.models import Planning
+
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=Clock)
+@receiver(post_delete, sender=Planning)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # Suppression en cascade d'un utilisateur : plus personne à synchroniser
+    if isinstance(origin, get_user_model()):
+        return
+    # Archivage : la ligne reste consultable, rien à propager
+    if is_archiving():
+        return
+
+    Tombstone.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        user_id=instance.user_id,
+    )
+
+
+@receiver(post_save, sender=Clock)
+@receiver(post_save, sender=Planning)
+def record_tombstone_on_reassign(sender, instance, created, **kwargs):
+    # Ligne passée à un autre utilisateur : elle disparaît pour l'ancien
+    loaded_user_id = getattr(instance, "_loaded_user_id", None)
+    if not created and loaded_user_id and loaded_user_id != instance.user_id:
+        Tombstone.objects.create(
+            model=sender._meta.model_name,
+            object_id=instance.pk,
+            user_id=loaded_user_id,
+        )
+
+    instance._loaded_user_id = instance.user_id
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from clocks.models import Clock
+from plannings.models import Planning
+
+
+@pytest.fixture
+def user_clock(db, normal_user):
+    return Clock.objects.create(
+        user=normal_user,
+        work_date="2026-02-09",
+        clock_in="08:00:00",
+        clock_out="17:00:00",
+    )
+
+
+@pytest.fixture
+def user_planning(db, normal_user):
+    return Planning.objects.create(
+        title="Shift",
+        start_datetime=timezone.now(),
+        end_datetime=timezone.now() + timedelta(hours=8),
+        user=normal_user,
+    )
+
+
+@pytest.fixture
+def admin_clock(db, admin_user):
+    return Clock.objects.create(
+        user=admin_user,
+        work_date="2026-02-09",
+        clock_in="08:00:00",
+        clock_out="17:00:00",
+    )
@@ -0,0 +1,113 @@
+import base64
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+def test_initial_sync_returns_own_rows(
+    api_client, normal_user, user_clock, user_planning, admin_clock
+):
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.get(reverse("sync"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [clock["id"] for clock in response.data["clocks"]] == [user_clock.id]
+    assert [p["id"] for p in response.data["plannings"]] == [user_planning.id]
+    assert response.data["deleted"] == []
+    assert response.data["has_more"] is False
+
+
+@pytest.mark.django_db
+def test_sync_without_changes_is_a_single_query(
+    api_client, normal_user, user_clock, django_assert_num_queries
+):
+    api_client.force_authenticate(user=normal_user)
+    cursor = api_client.get(reverse("sync")).data["cursor"]
+
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse("sync"), {"cursor": cursor})
+
+    assert response.data["clocks"] == []
+    assert response.data["cursor"] == cursor
+
+
+@pytest.mark.django_db
+def test_sync_returns_updates_and_tombstones(
+    api_client, normal_user, user_clock, user_planning
+):
+    api_client.force_authenticate(user=normal_user)
+    cursor = api_client.get(reverse("sync")).data["cursor"]
+
+    user_clock.status = "approved"
+    user_clock.save()
+    planning_id = user_planning.id
+    user_planning.delete()
+
+    response = api_client.get(reverse("sync"), {"cursor": cursor})
+
+    assert [clock["id"] for clock in response.data["clocks"]] == [user_clock.id]
+    assert response.data["plannings"] == []
+    assert response.data["deleted"] == [{"model": "planning", "id": planning_id}]
+
+
+@pytest.mark.django_db
+def test_sync_tombstones_rows_moved_to_another_user(
+    api_client, normal_user, admin_user, user_clock, user_planning
+):
+    api_client.force_authenticate(user=normal_user)
+    cursor = api_client.get(reverse("sync")).data["cursor"]
+
+    api_client.patch(
+        reverse("clocks-detail", args=[user_clock.id]), {"user": admin_user.id}
+    )
+    user_planning.user = admin_user
+    user_planning.save()
+
+    response = api_client.get(reverse("sync"), {"cursor": cursor})
+
+    assert response.data["clocks"] == []
+    assert response.data["plannings"] == []
+    assert response.data["deleted"] == [
+        {"model": "clock", "id": user_clock.id},
+        {"model": "planning", "id": user_planning.id},
+    ]
+
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(reverse("sync"))
+    assert [clock["id"] for clock in response.data["clocks"]] == [user_clock.id]
+    assert response.data["deleted"] == []
+
+
+@pytest.mark.django_db
+def test_sync_rejects_invalid_cursor(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.get(reverse("sync"), {"cursor": "nope"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "position",
+    [
+        {"clocks": "x", "plannings": None, "deleted": 0},
+        {"clocks": ["not-a-date", 1], "plannings": None, "deleted": 0},
+        {"clocks": ["2026-02-10T08:00:00", 1], "plannings": None, "deleted": 0},
+        {"clocks": ["2026-02-10T08:00:00+00:00", "1"], "plannings": None, "deleted": 0},
+        {"clocks": [1, 2, 3], "plannings": None, "deleted": 0},
+        {"clocks": None, "plannings": None, "deleted": "1"},
+        {"clocks": None, "plannings": None, "deleted": None},
+    ],
+)
+@pytest.mark.django_db
+def test_sync_rejects_tampered_cursor(api_client, normal_user, position):
+    api_client.force_authenticate(user=normal_user)
+    cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    response = api_client.get(reverse("sync"), {"cursor": cursor})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,71 @@
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from clocks.serializers import ClockSerializer
+from plannings.serializers import PlanningSerializer
+
+from .delta import (
+    InvalidCursor,
+    collect_changes,
+    decode_cursor,
+    encode_cursor,
+    has_changes,
+)
+
+
+class SyncView(APIView):
+    """
+    Synchronisation incrémentale des pointages et plannings de l'utilisateur
+    connecté (application mobile).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=["Sync"],
+        summary="Synchronisation incrémentale",
+        description=(
+            "Renvoie les pointages et plannings modifiés depuis le curseur "
+            "fourni, ainsi que les suppressions. Sans curseur, renvoie tout. "
+            "Rappeler avec le nouveau curseur tant que has_more est vrai."
+        ),
+        parameters=[
+            OpenApiParameter("cursor", str, description="Curseur précédent."),
+        ],
+    )
+    def get(self, request):
+        try:
+            position = decode_cursor(request.query_params.get("cursor"))
+        except InvalidCursor:
+            raise ValidationError({"cursor": "Curseur invalide."})
+
+        if request.query_params.get("cursor") and not has_changes(
+            request.user, position
+        ):
+            return Response(
+                {
+                    "clocks": [],
+                    "plannings": [],
+                    "deleted": [],
+                    "cursor": request.query_params["cursor"],
+                    "has_more": False,
+                }
+            )
+
+        changes, position, has_more = collect_changes(request.user, position)
+
+        return Response(
+            {
+                "clocks": ClockSerializer(changes["clocks"], many=True).data,
+                "plannings": PlanningSerializer(changes["plannings"], many=True).data,
+                "deleted": [
+                    {"model": tombstone.model, "id": tombstone.object_id}
+                    for tombstone in changes["deleted"]
+                ],
+                "cursor": encode_cursor(position),
+                "has_more": has_more,
+            }
+        )
@@ -0,0 +1,73 @@
+from django.db.models import Q
+from rest_framework.exceptions import PermissionDenied
+
+from users.permissions import is_manager_or_admin
+
+from .models import TeamMembership, Teams
+
+
+def member_ids_query(team):
+    """
+    Sous-requête des membres actifs de l'équipe (index (team, user)).
+    """
+    return TeamMembership.objects.active().filter(team=team).values("user_id")
+
+
+def team_ids_of(request):
+    """
+    Équipes de l'utilisateur courant (membre actif ou propriétaire),
+    calculées une fois par requête puis mémorisées sur celle-ci : les
+    contrôles d'accès successifs ne refont pas la requête.
+    """
+    team_ids = getattr(request, "_team_ids", None)
+    if team_ids is None:
+        user = request.user
+        team_ids = frozenset(
+            Teams.objects.filter(
+                Q(memberships__user=user, memberships__left_at__isnull=True)
+                | Q(owner=user)
+            )
+            .values_list("id", flat=True)
+            .distinct()
+        )
+        request._team_ids = team_ids
+    return team_ids
+
+
+def is_member(team, request):
+    return team.owner_id == request.user.pk or team.pk in team_ids_of(request)
+
+
+def check_team_access(team, request):
+    """
+    Données d'une équipe : réservées aux ADMIN/MANAGER, au propriétaire et
+    aux membres.
+    """
+    if not is_manager_or_admin(request.user) and not is_member(team, request):
+        raise PermissionDenied("Vous ne faites pas partie de cette équipe.")
+
+
+def check_users_access(user_ids, request):
+    """
+    Données de plusieurs utilisateurs : un USER ne voit que lui-même et les
+    membres (ou propriétaires) de ses équipes.
+    """
+    if is_manager_or_admin(request.user):
+        return
+
+    team_ids = team_ids_of(request)
+    allowed = {request.user.pk}
+    allowed.update(
+        TeamMembership.objects.active()
+        .filter(team_id__in=team_ids)
+        .values_list("user_id", flat=True)
+    )
+    allowed.update(
+        Teams.objects.filter(pk__in=team_ids, owner__isnull=False).values_list(
+            "owner_id", flat=True
+        )
+    )
+    if set(user_ids) - allowed:
+        raise PermissionDenied(
+            "Vous ne pouvez consulter que les membres de vos équipes."
+        )
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[("MEMBER", "Member"), ("LEAD", "Lead")],
+                        default="MEMBER",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "joined_at",
+                    models.DateField(default=django.utils.timezone.localdate),
+                ),
+                ("left_at", models.DateField(blank=True, null=True)),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="teams.teams",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="team_memberships",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "team_memberships",
+                "ordering": ["joined_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["team", "user"], name="membership_team_user_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "team"], name="membership_user_team_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("left_at__isnull", True)),
+                        fields=("team", "user"),
+                        name="team_membership_one_active",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from datetime import date
+
+from django.db import migrations
+from django.db.models import Min
+from django.utils import timezone
+
+# Appartenance sans aucune activité connue : antérieure à tout l'historique
+UNKNOWN_JOINED_AT = date(2000, 1, 1)
+
+
+def _first_work_dates(apps):
+    """
+    Premier jour pointé par utilisateur, pointages courants et archivés.
+    """
+    first = {}
+    for model_name in ("Clock", "ClockArchive"):
+        model = apps.get_model("clocks", model_name)
+        rows = model.objects.values("user_id").annotate(first=Min("work_date"))
+        for row in rows:
+            user_id = row["user_id"]
+            first[user_id] = min(first.get(user_id, row["first"]), row["first"])
+    return first
+
+
+def backfill(apps, schema_editor):
+    """
+    Jusqu'ici, l'appartenance se déduisait des plannings rattachés à
+    l'équipe et du propriétaire : on la matérialise.
+
+    joined_at est daté de la première activité connue (planning dans
+    l'équipe ou pointage), sans quoi les rapports par équipe, qui lisent
+    l'appartenance au jour du pointage, perdraient tout l'historique.
+    """
+    Planning = apps.get_model("plannings", "Planning")
+    Teams = apps.get_model("teams", "Teams")
+    TeamMembership = apps.get_model("teams", "TeamMembership")
+
+    first_planned = {
+        (row["team_id"], row["user_id"]): timezone.localtime(row["first"]).date()
+        for row in Planning.objects.filter(team__isnull=False, user__isnull=False)
+        .values("team_id", "user_id")
+        .annotate(first=Min("start_datetime"))
+    }
+    first_worked = _first_work_dates(apps)
+    leads = set(
+        Teams.objects.filter(owner__isnull=False).values_list("id", "owner_id")
+    )
+
+    def joined_at(team_id, user_id):
+        candidates = [
+            day
+            for day in (
+                first_planned.get((team_id, user_id)),
+                first_worked.get(user_id),
+            )
+            if day is not None
+        ]
+        return min(candidates, default=UNKNOWN_JOINED_AT)
+
+    TeamMembership.objects.bulk_create(
+        [
+            TeamMembership(
+                team_id=team_id,
+                user_id=user_id,
+                role="LEAD" if (team_id, user_id) in leads else "MEMBER",
+                joined_at=joined_at(team_id, user_id),
+            )
+            for team_id, user_id in sorted(first_planned.keys() | leads)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0002_team_membership"),
+        ("plannings", "0002_alter_planning_options_remove_planning_team_id_and_more"),
+        ("clocks", "0008_clockarchive"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
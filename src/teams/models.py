@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Teams(models.Model):
@@ -32,3 +33,54 @@ class Teams(models.Model):
         verbose_name = "Team"
         verbose_name_plural = "Teams"
         ordering = ["-created_at"]
+
+
+class MembershipRole(models.TextChoices):
+    MEMBER = "MEMBER", "Member"
+    LEAD = "LEAD", "Lead"
+
+
+class TeamMembershipQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(left_at__isnull=True)
+
+
+class TeamMembership(models.Model):
+    """
+    Appartenance d'un utilisateur à une équipe. Un départ renseigne
+    `left_at` : l'historique est conservé.
+    """
+
+    team = models.ForeignKey(
+        Teams, on_delete=models.CASCADE, related_name="memberships"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="team_memberships",
+    )
+    role = models.CharField(
+        max_length=10, choices=MembershipRole.choices, default=MembershipRole.MEMBER
+    )
+    joined_at = models.DateField(default=timezone.localdate)
+    left_at = models.DateField(null=True, blank=True)
+
+    objects = TeamMembershipQuerySet.as_manager()
+
+    class Meta:
+        db_table = "team_memberships"
+        ordering = ["joined_at", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "user"],
+                condition=models.Q(left_at__isnull=True),
+                name="team_membership_one_active",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["team", "user"], name="membership_team_user_idx"),
+            models.Index(fields=["user", "team"], name="membership_user_team_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.team_id} ({self.role})"
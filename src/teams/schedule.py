@@ -0,0 +1,71 @@
+from django.db.models import Q
+
+from plannings.models import Planning
+from plannings.recurrence import expand_window
+
+from .membership import member_ids_query
+from .models import TeamMembership
+
+
+def team_plannings(team):
+    """
+    Plannings rattachés à l'équipe ou à l'un de ses membres.
+    """
+    return Planning.objects.filter(Q(team=team) | Q(user_id__in=member_ids_query(team)))
+
+
+def department_plannings(department_id):
+    """
+    Plannings rattachés aux équipes du département ou à leurs membres.
+    """
+    members = (
+        TeamMembership.objects.active()
+        .filter(team__department_id=department_id)
+        .values("user_id")
+    )
+    return Planning.objects.filter(
+        Q(team__department_id=department_id) | Q(user_id__in=members)
+    )
+
+
+def team_schedule(team, start, end):
+    """
+    Plannings de l'équipe et de ses membres sur [start, end[, groupés par
+    utilisateur. Nombre de requêtes constant : plannings (membres résolus en
+    sous-requête, utilisateurs joints) puis exceptions de récurrence.
+    """
+    queryset = team_plannings(team).select_related("user")
+
+    users = {}
+    unassigned = []
+    for occurrence in expand_window(queryset, start, end):
+        planning = occurrence.planning
+        entry = {
+            "id": planning.pk,
+            "title": planning.title,
+            "planning_type": planning.planning_type,
+            "work_mode": planning.work_mode,
+            "team": planning.team_id,
+            "start_datetime": occurrence.start_datetime,
+            "end_datetime": occurrence.end_datetime,
+        }
+
+        if planning.user is None:
+            unassigned.append(entry)
+            continue
+
+        if planning.user_id not in users:
+            users[planning.user_id] = {
+                "user": planning.user_id,
+                "name": f"{planning.user.first_name} {planning.user.last_name}".strip(),
+                "plannings": [],
+            }
+        users[planning.user_id]["plannings"].append(entry)
+
+    return {
+        "team": team.pk,
+        "from": start,
+        "to": end,
+        "users": sorted(users.values(), key=lambda row: row["user"]),
+        "unassigned": unassigned,
+    }
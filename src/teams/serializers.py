@@ -1,6 +1,7 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from .models import Teams
+from .models import MembershipRole, TeamMembership, Teams
 
 
 class TeamsSerializer(serializers.ModelSerializer):
@@ -34,3 +35,54 @@ class TeamsSerializer(serializers.ModelSerializer):
 
     def get_department_name(self, obj):
         return obj.department.name if obj.department else None
+
+
+class TeamMembershipSerializer(serializers.ModelSerializer):
+    user_email = serializers.EmailField(source="user.email", read_only=True)
+    user_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TeamMembership
+        fields = [
+            "id",
+            "team",
+            "user",
+            "user_email",
+            "user_name",
+            "role",
+            "joined_at",
+            "left_at",
+        ]
+        read_only_fields = fields
+
+    def get_user_name(self, obj):
+        return f"{obj.user.first_name} {obj.user.last_name}".strip()
+
+
+class TeamMembersQuerySerializer(serializers.Serializer):
+    include_left = serializers.BooleanField(default=False)
+
+
+class TeamMembersUpdateSerializer(serializers.Serializer):
+    """
+    Ajout / retrait groupé de membres.
+    """
+
+    users = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=1000
+    )
+    role = serializers.ChoiceField(
+        choices=MembershipRole.choices, default=MembershipRole.MEMBER
+    )
+
+    def validate_users(self, value):
+        value = sorted(set(value))
+        known = set(
+            get_user_model().objects.filter(id__in=value).values_list("id", flat=True)
+        )
+        unknown = [user_id for user_id in value if user_id not in known]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Utilisateurs inconnus : {', '.join(map(str, unknown))}."
+            )
+        return value
@@ -1,6 +1,15 @@
+from datetime import date
+from importlib import import_module
+
 import pytest
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.test import RequestFactory
 
-from teams.models import Teams
+from clocks.models import Clock
+from plannings.models import Planning
+from teams.membership import is_member, team_ids_of
+from teams.models import TeamMembership, Teams
 
 
 @pytest.mark.django_db
@@ -38,3 +47,54 @@ def test_team_department_can_be_null():
         description="Team without department",
     )
     assert team.department is None
+
+
+@pytest.mark.django_db
+def test_membership_is_unique_while_active(team, other_user):
+    first = TeamMembership.objects.create(team=team, user=other_user)
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        TeamMembership.objects.create(team=team, user=other_user)
+
+    first.left_at = date(2026, 1, 31)
+    first.save()
+    TeamMembership.objects.create(team=team, user=other_user)
+    assert TeamMembership.objects.active().filter(team=team).count() == 1
+
+
+@pytest.mark.django_db
+def test_team_ids_of_is_memoized_per_request(
+    team, other_team, other_user, django_assert_num_queries
+):
+    TeamMembership.objects.create(team=team, user=other_user)
+    request = RequestFactory().get("/")
+    request.user = other_user
+
+    with django_assert_num_queries(1):
+        assert team_ids_of(request) == {team.id, other_team.id}
+        assert is_member(team, request)
+        assert is_member(other_team, request)
+
+
+@pytest.mark.django_db
+def test_backfill_dates_memberships_from_first_activity(team, other_user, aware):
+    migration = import_module("teams.migrations.0003_backfill_memberships")
+    Planning.objects.create(
+        title="Shift",
+        start_datetime=aware(2026, 2, 2, 9),
+        end_datetime=aware(2026, 2, 2, 17),
+        user=other_user,
+        team=team,
+    )
+    Clock.objects.create(user=other_user, work_date="2026-01-15", clock_in="09:00")
+
+    migration.backfill(apps, None)
+
+    joined = dict(
+        TeamMembership.objects.filter(team=team).values_list("user_id", "joined_at")
+    )
+    # Premier pointage antérieur au premier planning ; chef sans activité
+    assert joined == {
+        other_user.id: date(2026, 1, 15),
+        team.owner_id: migration.UNKNOWN_JOINED_AT,
+    }
@@ -1,7 +1,13 @@
+from datetime import datetime, timedelta
+
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
+from plannings.models import Planning
+from teams.models import TeamMembership
+
 
 @pytest.mark.django_db
 def test_list_teams(api_client, normal_user, team, other_team):
@@ -93,3 +99,149 @@ def test_delete_team(api_client, normal_user, team):
     response = api_client.delete(url)
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_team_schedule_groups_plannings_per_user(
+    api_client, admin_user, normal_user, other_user, team, django_assert_max_num_queries
+):
+    TeamMembership.objects.create(team=team, user=other_user)
+    start = timezone.make_aware(datetime(2026, 3, 2, 9))
+    Planning.objects.bulk_create(
+        [
+            Planning(
+                title="Team shift",
+                start_datetime=start,
+                end_datetime=start + timedelta(hours=8),
+                user=other_user,
+                team=team,
+            ),
+            Planning(
+                title="Personal meeting",
+                start_datetime=start + timedelta(days=1),
+                end_datetime=start + timedelta(days=1, hours=1),
+                user=other_user,
+                planning_type="MEETING",
+            ),
+            Planning(
+                title="Open slot",
+                start_datetime=start + timedelta(days=2),
+                end_datetime=start + timedelta(days=2, hours=8),
+                team=team,
+            ),
+            Planning(
+                title="Outside window",
+                start_datetime=start + timedelta(days=30),
+                end_datetime=start + timedelta(days=30, hours=8),
+                user=other_user,
+                team=team,
+            ),
+        ]
+    )
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("teams-schedule", args=[team.id])
+
+    with django_assert_max_num_queries(4):
+        response = api_client.get(
+            url,
+            {"from": "2026-03-02T00:00:00+01:00", "to": "2026-03-09T00:00:00+01:00"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    users = {row["user"]: row for row in response.data["users"]}
+    assert [p["title"] for p in users[other_user.id]["plannings"]] == [
+        "Team shift",
+        "Personal meeting",
+    ]
+    assert [p["title"] for p in response.data["unassigned"]] == ["Open slot"]
+
+
+@pytest.mark.django_db
+def test_team_schedule_forbidden_for_non_member(api_client, other_user, team):
+    api_client.force_authenticate(user=other_user)
+
+    response = api_client.get(
+        reverse("teams-schedule", args=[team.id]),
+        {"from": "2026-03-02T00:00:00+01:00", "to": "2026-03-09T00:00:00+01:00"},
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_create_team_enrolls_owner_as_lead(api_client, normal_user):
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.post(
+        reverse("teams-list"), {"name": "Gamma", "description": "New"}, format="json"
+    )
+
+    membership = TeamMembership.objects.get(team_id=response.data["id"])
+    assert membership.user == normal_user
+    assert membership.role == "LEAD"
+
+
+@pytest.mark.django_db
+def test_add_list_and_remove_members(
+    api_client, admin_user, normal_user, other_user, team, django_assert_max_num_queries
+):
+    api_client.force_authenticate(user=normal_user)
+    add_url = reverse("teams-add-members", args=[team.id])
+
+    added = api_client.post(
+        add_url, {"users": [other_user.id, admin_user.id]}, format="json"
+    )
+    again = api_client.post(add_url, {"users": [other_user.id]}, format="json")
+    with django_assert_max_num_queries(3):
+        members = api_client.get(reverse("teams-members", args=[team.id]))
+    removed = api_client.post(
+        reverse("teams-remove-members", args=[team.id]),
+        {"users": [other_user.id]},
+        format="json",
+    )
+    history = api_client.get(
+        reverse("teams-members", args=[team.id]), {"include_left": True}
+    )
+
+    assert added.status_code == status.HTTP_201_CREATED
+    assert len(added.data) == 2
+    assert again.data == []
+    assert {m["user"] for m in members.data} == {other_user.id, admin_user.id}
+    assert removed.data == {"removed": 1}
+    assert [
+        m["left_at"] is not None for m in history.data if m["user"] == other_user.id
+    ] == [True]
+
+
+@pytest.mark.django_db
+def test_add_members_forbidden_for_non_owner(api_client, other_user, team):
+    api_client.force_authenticate(user=other_user)
+
+    response = api_client.post(
+        reverse("teams-add-members", args=[team.id]),
+        {"users": [other_user.id]},
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_add_members_rejects_unknown_users(api_client, admin_user, team):
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(
+        reverse("teams-add-members", args=[team.id]), {"users": [999999]}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_filter_teams_by_member(api_client, normal_user, other_user, team, other_team):
+    TeamMembership.objects.create(team=other_team, user=normal_user)
+    api_client.force_authenticate(user=normal_user)
+
+    response = api_client.get(reverse("teams-list"), {"member": normal_user.id})
+
+    assert [t["id"] for t in response.data] == [other_team.id]
@@ -1,11 +1,26 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from .models import Teams
-from .serializers import TeamsSerializer
+from plannings.serializers import PlanningWindowQuerySerializer
+from primeBank.exceptions import ConcurrentWriteConflict
+from users.permissions import is_manager_or_admin
+
+from .membership import check_team_access
+from .models import MembershipRole, TeamMembership, Teams
+from .schedule import team_schedule
+from .serializers import (
+    TeamMembershipSerializer,
+    TeamMembersQuerySerializer,
+    TeamMembersUpdateSerializer,
+    TeamsSerializer,
+)
 
 
 @extend_schema_view(
@@ -50,12 +65,19 @@ class TeamsViewSet(ModelViewSet):
     serializer_class = TeamsSerializer
     permission_classes = [IsAuthenticated]
 
+    @transaction.atomic
     def perform_create(self, serializer):
 
         if not serializer.validated_data.get("owner"):
-            serializer.save(owner=self.request.user)
+            team = serializer.save(owner=self.request.user)
         else:
-            serializer.save()
+            team = serializer.save()
+
+        # Le propriétaire est membre (LEAD) de son équipe
+        if team.owner_id:
+            TeamMembership.objects.create(
+                team=team, user_id=team.owner_id, role=MembershipRole.LEAD
+            )
 
     def get_queryset(self):
 
@@ -69,6 +91,12 @@ class TeamsViewSet(ModelViewSet):
         if owner_id:
             queryset = queryset.filter(owner_id=owner_id)
 
+        member_id = self.request.query_params.get("member")
+        if member_id:
+            queryset = queryset.filter(
+                memberships__user_id=member_id, memberships__left_at__isnull=True
+            )
+
         if self.request.query_params.get("my_teams"):
             queryset = queryset.filter(owner=self.request.user)
 
@@ -85,3 +113,131 @@ class TeamsViewSet(ModelViewSet):
         teams = self.get_queryset().filter(owner=request.user)
         serializer = self.get_serializer(teams, many=True)
         return Response(serializer.data)
+
+    @extend_schema(
+        tags=["Teams"],
+        summary="Planning de l'équipe",
+        description=(
+            "Plannings de l'équipe et de ses membres sur la fenêtre from/to, "
+            "récurrences dépliées, groupés par utilisateur. Réservé aux "
+            "ADMIN/MANAGER, au propriétaire et aux membres de l'équipe."
+        ),
+        parameters=[PlanningWindowQuerySerializer],
+    )
+    @action(detail=True, methods=["get"], url_path="schedule")
+    def schedule(self, request, pk=None):
+        team = self.get_object()
+        params = PlanningWindowQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        check_team_access(team, request)
+
+        return Response(
+            team_schedule(
+                team, params.validated_data["from"], params.validated_data["to"]
+            )
+        )
+
+    def _check_can_manage(self, request, team):
+        if is_manager_or_admin(request.user):
+            return
+        if team.owner_id == request.user.pk:
+            return
+        raise PermissionDenied(
+            "Seuls le propriétaire, un ADMIN ou un MANAGER gèrent les membres."
+        )
+
+    @extend_schema(
+        tags=["Teams"],
+        summary="Membres de l'équipe",
+        description=(
+            "Membres actifs de l'équipe (include_left=true pour l'historique). "
+            "Réservé aux ADMIN/MANAGER et aux membres de l'équipe."
+        ),
+        parameters=[TeamMembersQuerySerializer],
+        responses=TeamMembershipSerializer(many=True),
+    )
+    @action(detail=True, methods=["get"], url_path="members")
+    def members(self, request, pk=None):
+        team = self.get_object()
+        params = TeamMembersQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        check_team_access(team, request)
+
+        memberships = team.memberships.select_related("user")
+        if not params.validated_data["include_left"]:
+            memberships = memberships.active()
+        return Response(TeamMembershipSerializer(memberships, many=True).data)
+
+    @extend_schema(
+        tags=["Teams"],
+        summary="Ajouter des membres",
+        description=(
+            "Ajoute en une fois les utilisateurs donnés ; ceux déjà membres "
+            "sont ignorés."
+        ),
+        request=TeamMembersUpdateSerializer,
+        responses=TeamMembershipSerializer(many=True),
+    )
+    @action(detail=True, methods=["post"], url_path="add-members")
+    def add_members(self, request, pk=None):
+        team = self.get_object()
+        self._check_can_manage(request, team)
+        params = TeamMembersUpdateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        current = set(
+            team.memberships.active()
+            .filter(user_id__in=params.validated_data["users"])
+            .values_list("user_id", flat=True)
+        )
+        try:
+            with transaction.atomic():
+                created = TeamMembership.objects.bulk_create(
+                    [
+                        TeamMembership(
+                            team=team,
+                            user_id=user_id,
+                            role=params.validated_data["role"],
+                        )
+                        for user_id in params.validated_data["users"]
+                        if user_id not in current
+                    ]
+                )
+        except IntegrityError:
+            # Ajout concurrent des mêmes membres
+            raise ConcurrentWriteConflict()
+
+        return Response(
+            TeamMembershipSerializer(
+                team.memberships.select_related("user").filter(
+                    pk__in=[membership.pk for membership in created]
+                ),
+                many=True,
+            ).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        tags=["Teams"],
+        summary="Retirer des membres",
+        description=(
+            "Clôt en une requête l'appartenance des utilisateurs donnés "
+            "(left_at = aujourd'hui)."
+        ),
+        request=TeamMembersUpdateSerializer,
+    )
+    @action(detail=True, methods=["post"], url_path="remove-members")
+    def remove_members(self, request, pk=None):
+        team = self.get_object()
+        self._check_can_manage(request, team)
+        params = TeamMembersUpdateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        removed = (
+            team.memberships.active()
+            .filter(user_id__in=params.validated_data["users"])
+            .update(left_at=timezone.localdate())
+        )
+        return Response({"removed": removed})
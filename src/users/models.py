@@ -26,6 +26,20 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def id_chunks(self, chunk_size):
+        """
+        Itère sur les ids utilisateurs par lots triés (pagination keyset),
+        pour les traitements de masse à mémoire bornée.
+        """
+        ids = self.order_by("id").values_list("id", flat=True)
+        last_id = 0
+        while True:
+            chunk = list(ids.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(
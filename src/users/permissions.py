@@ -21,3 +21,20 @@ class IsAdminForCreateOtherwiseReadOnly(BasePermission):
             and request.user.is_authenticated
             and request.user.role == UserRole.ADMIN
         )
+
+
+def is_manager_or_admin(user):
+    return bool(
+        user
+        and user.is_authenticated
+        and user.role in (UserRole.ADMIN, UserRole.MANAGER)
+    )
+
+
+class IsManagerOrAdmin(BasePermission):
+    """
+    Validations, rapports et vues d'ensemble : MANAGER ou ADMIN uniquement.
+    """
+
+    def has_permission(self, request, view):
+        return is_manager_or_admin(request.user)